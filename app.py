@@ -1,7 +1,13 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError, HTTPException
+from pymongo import monitoring
 
+from metrics.mongometrics import MongoMetricsListener
+
+monitoring.register(MongoMetricsListener())
+
+from config_loader import ConfigLoader
 from error.expectionhandler import ExpectionHandler, expection_handler, validation_exception_handler, http_exception_handler
 from ratelimit.ratelimit import RateLimitMiddleware
 from user.usercontroller import router as user_router
@@ -9,7 +15,7 @@ from auth.authcontroller import router as auth_router
 from user.utility.failedloginattempt_service import FailedLoginAttemptService
 from utility.client_ip_middleware import ClientIPMiddleware
 from workspace.workspacecontroller import router as workspace_router
-from dataset_builder.dataset_builder_controller import router as dataset_router
+from dataset_builder.dataset_builder_controller import router as dataset_router, service as dataset_service
 from template.templatecontroller import router as template_router
 from data_scraper.scrapper_controller import router as scrapper_router
 from auditmanager.auditlog_controller import router as audit_router
@@ -21,10 +27,40 @@ from trainer.finetune_trainer.finetune_trainer_controller import router as finet
 from huggingface.huggingface_controller import router as hf_router
 from corpusmanagement.corpus_controller import router as corpus_router
 from profanity.profanitycontroller import router  as profanity_router
+from metrics.metrics_controller import router as metrics_router
+from metrics.metrics_middleware import MetricsMiddleware
+from profiling.profiling_controller import router as profiling_router, profile_store, profiling_config
+from profiling.profiling_middleware import ProfilingMiddleware
+from jobs.jobs_controller import router as jobs_router, runner as job_runner
+
+config_loader = ConfigLoader("config.json")
+ratelimit_config = config_loader.get_ratelimit_config()
+network_config = config_loader.get_network_config()
 
 app = FastAPI()
-app.add_middleware(RateLimitMiddleware, max_requests=5, window_seconds=10)
-app.add_middleware(ClientIPMiddleware)
+app.add_middleware(
+    RateLimitMiddleware,
+    max_requests=ratelimit_config.get("max_requests", 5),
+    window_seconds=ratelimit_config.get("window_seconds", 10),
+    exempt_paths=ratelimit_config.get("exempt_paths", []),
+    route_costs=ratelimit_config.get("route_costs", {})
+)
+app.add_middleware(
+    ClientIPMiddleware,
+    trusted_proxies=network_config.get("trusted_proxies", ["127.0.0.1", "::1"])
+)
+if profiling_config.get("enabled", False):
+    app.add_middleware(
+        ProfilingMiddleware,
+        store=profile_store,
+        sample_rate=profiling_config.get("sample_rate", 0.0),
+        interval_ms=profiling_config.get("interval_ms", 5),
+        mode=profiling_config.get("mode", "wall"),
+        header=profiling_config.get("header", "x-aegis-profile"),
+        path_prefixes=profiling_config.get("path_prefixes", []),
+        max_concurrent=profiling_config.get("max_concurrent", 2)
+    )
+app.add_middleware(MetricsMiddleware)
 
 app.add_exception_handler(ExpectionHandler, expection_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -44,6 +80,9 @@ app.include_router(hf_router, prefix="/huggingface", tags=["huggingface"])
 app.include_router(corpus_router, prefix="/corpus", tags=["corpus"])
 
 app.include_router(profanity_router, prefix="/profanity", tags=["profanity"])
+app.include_router(metrics_router, tags=["metrics"])
+app.include_router(profiling_router, prefix="/profiling", tags=["profiling"])
+app.include_router(jobs_router, prefix="/jobs", tags=["jobs"])
 
 
 revoked_service = RevokedTokenService("config.json")
@@ -53,8 +92,12 @@ scheduler = BackgroundScheduler()
 def start_scheduler():
     scheduler.add_job(revoked_service.cleanup_expired, "interval", hours=1)
     scheduler.add_job(FailedLoginAttemptService.remove_expired_attempts_for_all_users,"interval", minutes=10)
+    scheduler.add_job(job_runner.fail_orphaned, "interval", seconds=job_runner.heartbeat_timeout)
     scheduler.start()
+    dataset_service.run_migrations()
+    job_runner.start()
 
 @app.on_event("shutdown")
 def shutdown_scheduler():
     scheduler.shutdown()
+    job_runner.stop()
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.benchsupport import (
+    asgi_client,
+    build_tiny_bert,
+    prepare_environment,
+    seed_workspace,
+    synthetic_turkish_texts,
+)
+
+BULK_SIZE = 32
+
+
+def measure(fn: Callable[[], object], repeats: int, min_time: float = 0.005) -> Dict[str, float]:
+    fn()
+
+    inner = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(inner):
+            fn()
+        if time.perf_counter() - start >= min_time or inner >= 1 << 20:
+            break
+        inner *= 2
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(inner):
+            fn()
+        timings.append((time.perf_counter() - start) / inner)
+
+    return summarize(timings, inner)
+
+
+def summarize(timings: List[float], inner: int = 1) -> Dict[str, float]:
+    timings = sorted(timings)
+    median = statistics.median(timings)
+    return {
+        "repeats": len(timings),
+        "inner_loops": inner,
+        "min_ms": round(timings[0] * 1e3, 4),
+        "median_ms": round(median * 1e3, 4),
+        "p95_ms": round(timings[min(int(len(timings) * 0.95), len(timings) - 1)] * 1e3, 4),
+        "mean_ms": round(statistics.fmean(timings) * 1e3, 4),
+        "ops_per_sec": round(1.0 / median, 2) if median else 0.0,
+    }
+
+
+def cycling(items: List):
+    state = {"i": 0}
+
+    def next_item():
+        item = items[state["i"] % len(items)]
+        state["i"] += 1
+        return item
+
+    return next_item
+
+
+def bench_preprocessing(texts: List[str], repeats: int) -> Dict[str, Dict[str, float]]:
+    from multilangsetup.multilang_serviceimpl import MultiLangServiceImpl
+    from multilangsetup.multilang_step import Step
+    from multilangsetup.normalizers.turkish_normalizer import TurkishNormalizer
+    from multilangsetup.obsfucationresolver.obsfucation_resolver import ObfuscationResolver
+
+    results = {}
+
+    next_text = cycling(texts)
+    results["obfuscation_resolver.resolve_all"] = measure(
+        lambda: ObfuscationResolver.resolve_all(next_text(), lang="tr"), repeats
+    )
+
+    next_text = cycling(texts)
+    results["turkish_normalizer.normalize_all"] = measure(
+        lambda: TurkishNormalizer.normalize_all(next_text()), repeats
+    )
+
+    service = MultiLangServiceImpl()
+    pipeline = [Step.NORMALIZE, Step.LANG_NORMALIZE, Step.ANALYZE]
+    uncached = cycling([f"{t} #{i}" for i, t in enumerate(texts * 4)])
+    results["multilang_service.prepare.uncached"] = measure(
+        lambda: service.prepare(text=uncached(), lang="tr", pipeline=pipeline), repeats
+    )
+
+    hot_text = texts[0]
+    results["multilang_service.prepare.cached"] = measure(
+        lambda: service.prepare(text=hot_text, lang="tr", pipeline=pipeline), repeats
+    )
+
+    return results
+
+
+def bench_inference(texts: List[str], seed: Dict[str, str], repeats: int) -> Dict[str, Dict[str, float]]:
+    from profanity.profanitycontroller import profanity_service
+
+    user_id = seed["user_id"]
+    workspace_id = seed["workspace_id"]
+    results = {}
+
+    next_text = cycling(texts)
+    results["profanity_service.detect.single"] = measure(
+        lambda: profanity_service.detect(text=next_text(), user_id=user_id, workspace_id=workspace_id), repeats
+    )
+
+    batches = [texts[i:i + BULK_SIZE] for i in range(0, len(texts) - BULK_SIZE + 1, BULK_SIZE)]
+    next_batch = cycling(batches)
+
+    def detect_batch():
+        for text in next_batch():
+            profanity_service.detect(text=text, user_id=user_id, workspace_id=workspace_id)
+
+    results[f"profanity_service.detect.batch{BULK_SIZE}"] = measure(detect_batch, max(repeats // 4, 3))
+    return results
+
+
+def bench_endpoints(texts: List[str], seed: Dict[str, str], repeats: int) -> Dict[str, Dict[str, float]]:
+    from app import app
+
+    headers = {"Authorization": f"Bearer {seed['token']}"}
+    batches = [texts[i:i + BULK_SIZE] for i in range(0, len(texts) - BULK_SIZE + 1, BULK_SIZE)]
+
+    async def run() -> Dict[str, Dict[str, float]]:
+        results = {}
+        async with asgi_client(app) as client:
+            cases = {
+                f"endpoint.profanity_bulk.{BULK_SIZE}": lambda batch: client.post(
+                    "/profanity/bulk", headers=headers,
+                    json={"texts": batch, "workspace_id": seed["workspace_id"]}
+                ),
+                f"endpoint.multilang_bulk.{BULK_SIZE}": lambda batch: client.post(
+                    "/multilang/bulk", headers=headers,
+                    json={"texts": batch}
+                ),
+            }
+            for name, call in cases.items():
+                next_batch = cycling(batches)
+                response = await call(next_batch())
+                if response.status_code != 200:
+                    raise RuntimeError(f"{name} returned {response.status_code}: {response.text[:300]}")
+                failed = [r for r in response.json().get("results", []) if "error" in r]
+                if failed:
+                    raise RuntimeError(f"{name} failed for {len(failed)} texts: {failed[0]['error']}")
+
+                timings = []
+                for _ in range(max(repeats // 4, 3)):
+                    start = time.perf_counter()
+                    await call(next_batch())
+                    timings.append(time.perf_counter() - start)
+
+                results[name] = summarize(timings)
+        return results
+
+    return asyncio.run(run())
+
+
+def environment_info() -> Dict[str, Optional[str]]:
+    info = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "git_commit": None,
+    }
+    try:
+        info["git_commit"] = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        pass
+    try:
+        import torch
+        info["torch"] = torch.__version__
+        info["torch_threads"] = torch.get_num_threads()
+    except ImportError:
+        pass
+    return info
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> Dict:
+    report = {}
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get("median_ms"):
+            report[name] = {"status": "new"}
+            continue
+        ratio = current["median_ms"] / previous["median_ms"]
+        status = "regressed" if ratio > 1 + threshold else "improved" if ratio < 1 - threshold else "unchanged"
+        if status == "regressed":
+            regressions.append(name)
+        report[name] = {
+            "status": status,
+            "baseline_median_ms": previous["median_ms"],
+            "current_median_ms": current["median_ms"],
+            "change_pct": round((ratio - 1) * 100, 2),
+        }
+    return {"threshold_pct": threshold * 100, "regressions": regressions, "benchmarks": report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AegisAI preprocessing and inference hot paths.")
+    parser.add_argument("--texts", type=int, default=512, help="Number of synthetic Turkish texts.")
+    parser.add_argument("--repeats", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--workdir", default=None, help="Directory for the tiny model and logs (reused if present).")
+    parser.add_argument("--only", choices=["preprocessing", "inference", "endpoints"], action="append")
+    parser.add_argument("--output", default=None, help="Write the JSON results to this file.")
+    parser.add_argument("--baseline", default=None, help="Compare against a stored results file.")
+    parser.add_argument("--save-baseline", default=None, help="Store these results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed median slowdown before failing.")
+    args = parser.parse_args()
+
+    bench_dir = prepare_environment(args.workdir)
+    texts = synthetic_turkish_texts(args.texts, seed=args.seed)
+    groups = set(args.only or ["preprocessing", "inference", "endpoints"])
+
+    results: Dict[str, Dict[str, float]] = {}
+    if "preprocessing" in groups:
+        results.update(bench_preprocessing(texts, args.repeats))
+
+    if groups & {"inference", "endpoints"}:
+        import torch
+        torch.manual_seed(args.seed)
+        seed = seed_workspace(build_tiny_bert(bench_dir, seed=args.seed))
+        if "inference" in groups:
+            results.update(bench_inference(texts, seed, args.repeats))
+        if "endpoints" in groups:
+            results.update(bench_endpoints(texts, seed, args.repeats))
+
+    output = {"environment": environment_info(), "config": vars(args), "results": results}
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        output["comparison"] = compare(results, baseline.get("results", {}), args.threshold)
+        exit_code = 1 if output["comparison"]["regressions"] else 0
+
+    rendered = json.dumps(output, indent=4, ensure_ascii=False)
+    print(rendered)
+
+    if args.output:
+        Path(args.output).write_text(rendered, encoding="utf-8")
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(rendered, encoding="utf-8")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
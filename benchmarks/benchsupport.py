@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+import os
+import random
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BENCH_PASSWORD = "BenchPass123"
+BENCH_EMAIL = "bench@aegisai.local"
+
+TR_WORDS = [
+    "merhaba", "nasılsın", "bugün", "hava", "çok", "güzel", "değil", "arkadaş", "şehir", "İstanbul",
+    "öğrenci", "çalışmak", "gerçekten", "yorum", "video", "kanal", "oyun", "maç", "takım", "hakem",
+    "salak", "aptal", "gerizekalı", "mal", "kötü", "berbat", "harika", "teşekkürler", "lütfen", "abi",
+    "kardeşim", "neden", "böyle", "şey", "ağır", "ılık", "IŞIK", "ÇOCUK", "Ülke", "Ğ", "sağol", "hadi",
+]
+
+OBFUSCATIONS = {"a": "4", "e": "3", "i": "1", "o": "0", "s": "$", "g": "9"}
+
+
+def synthetic_turkish_texts(count: int, seed: int = 1337, min_words: int = 4, max_words: int = 24) -> List[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(min_words, max_words)):
+            word = rng.choice(TR_WORDS)
+            roll = rng.random()
+            if roll < 0.1:
+                word = "".join(OBFUSCATIONS.get(c, c) for c in word)
+            elif roll < 0.15:
+                word = word.upper()
+            elif roll < 0.2:
+                word = word + rng.choice(["!!!", "???", "...", " ,", "“", "”"])
+            words.append(word)
+        texts.append(("  " if rng.random() < 0.2 else " ").join(words))
+    return texts
+
+
+def install_mongo_standin():
+    try:
+        import mongomock
+    except ImportError as e:
+        raise RuntimeError("mongomock is required for the in-process Mongo stand-in (pip install mongomock)") from e
+
+    import pymongo
+
+    if getattr(pymongo, "_aegis_standin", None) is not None:
+        return pymongo._aegis_standin
+
+    shared_client = mongomock.MongoClient()
+
+    def client_factory(*args, **kwargs):
+        return shared_client
+
+    pymongo.MongoClient = client_factory
+    pymongo._aegis_standin = shared_client
+    return shared_client
+
+
+def prepare_environment(workdir: Optional[str] = None, max_requests: int = 10 ** 9) -> Path:
+    os.environ.setdefault("JWT_SECRET_KEY", "aegis-bench-secret")
+    install_mongo_standin()
+
+    from config_loader import ConfigLoader
+
+    ratelimit_config = dict(ConfigLoader("config.json").get_ratelimit_config())
+    ratelimit_config["max_requests"] = max_requests
+    ConfigLoader.get_ratelimit_config = lambda self: ratelimit_config
+
+    bench_dir = Path(workdir or tempfile.mkdtemp(prefix="aegis-bench-"))
+    bench_dir.mkdir(parents=True, exist_ok=True)
+
+    from logs.predictionlogmanager import PredictionLogger
+    PredictionLogger.LOG_FILE = bench_dir / "prediction_logs.jsonl"
+
+    return bench_dir
+
+
+def build_tiny_bert(bench_dir: Path, seed: int = 1337, vocab_size: int = 4000) -> str:
+    import torch
+    from transformers import BertForSequenceClassification
+    from trainer.trainer_utils import train_tokenizer, load_hf_tokenizer, prepare_bert_config
+
+    model_dir = bench_dir / "tiny-bert"
+    if (model_dir / "config.json").exists():
+        return str(model_dir)
+
+    corpus_file = bench_dir / "tiny-corpus.txt"
+    corpus_file.write_text("\n".join(synthetic_turkish_texts(5000, seed=seed)), encoding="utf-8")
+
+    vocab_path = train_tokenizer([str(corpus_file)], str(bench_dir / "tokenizer"), vocab_size=vocab_size, min_frequency=1)
+    tokenizer = load_hf_tokenizer(vocab_path)
+
+    config = prepare_bert_config(vocab_size=len(tokenizer.get_vocab()), model_size="15M")
+    config.num_labels = 2
+    config.id2label = {0: "CLEAN", 1: "OFFENSIVE"}
+    config.label2id = {"CLEAN": 0, "OFFENSIVE": 1}
+
+    torch.manual_seed(seed)
+    model = BertForSequenceClassification(config)
+    model.eval()
+    model.save_pretrained(str(model_dir))
+    tokenizer.save_pretrained(str(model_dir))
+    return str(model_dir)
+
+
+def seed_workspace(model_path: str, model_name: str = "bench-model", model_version: str = "v1") -> Dict[str, str]:
+    from auth.authcontroller import hash_password, create_access_token
+    from trainer.modelregistry import ModelRegistry
+    from user.role import Role
+    from user.user import User
+    from user.userserviceimpl import UserServiceImpl
+    from user.workspace import Workspace
+
+    registry = ModelRegistry()
+    if not registry.get_model(model_name, model_version):
+        registry.save_model_info(model_name, model_version, model_path, None, {}, {})
+
+    user = User.create(
+        username="aegisbench",
+        email=BENCH_EMAIL,
+        password=BENCH_PASSWORD,
+        full_name="Aegis Bench",
+        birth_date=date(1990, 1, 1),
+        phone_number="+900000000000",
+        role=Role.ADMIN
+    )
+    user.password = hash_password(BENCH_PASSWORD)
+    user.mark_email_verified()
+    user.add_workspace(Workspace.create(
+        name="bench-workspace",
+        description="benchmark workspace",
+        language="tr",
+        model_name=model_name,
+        model_version=model_version
+    ))
+    UserServiceImpl("config.json").collection.insert_one(user.to_dict())
+
+    return {
+        "user_id": str(user.id),
+        "workspace_id": str(user.workspaces[0].id),
+        "token": create_access_token(data={"sub": str(user.id)}),
+        "email": BENCH_EMAIL,
+        "password": BENCH_PASSWORD
+    }
+
+
+def asgi_client(app, base_url: str = "http://bench.local"):
+    import httpx
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=base_url)
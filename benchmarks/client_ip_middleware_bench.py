@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import argparse
+import asyncio
+import json
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import Receive, Scope, Send
+
+from utility.client import ClientIPStorage
+from utility.client_ip_middleware import ClientIPMiddleware
+
+
+class LegacyClientIPMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        ip = request.headers.get("x-forwarded-for", request.client.host)
+        if ip and "," in ip:
+            ip = ip.split(",")[0].strip()
+
+        ClientIPStorage.set(ip)
+        response = await call_next(request)
+        return response
+
+
+async def endpoint(scope: Scope, receive: Receive, send: Send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": ClientIPStorage.get().encode("latin-1")})
+
+
+def make_scope(forwarded: bool) -> Scope:
+    headers = [(b"host", b"localhost"), (b"user-agent", b"bench")]
+    if forwarded:
+        headers.append((b"x-forwarded-for", b"203.0.113.7, 10.0.0.2"))
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+
+
+async def drive(app, requests: int, forwarded: bool) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(make_scope(forwarded), receive, send)
+    return time.perf_counter() - start
+
+
+async def run(requests: int, forwarded: bool):
+    candidates = {
+        "legacy_base_http_middleware": LegacyClientIPMiddleware(endpoint),
+        "asgi_client_ip_middleware": ClientIPMiddleware(endpoint, trusted_proxies=["127.0.0.1", "10.0.0.0/8"]),
+        "no_middleware": endpoint,
+    }
+
+    results = {}
+    for name, app in candidates.items():
+        await drive(app, min(requests, 1000), forwarded)
+        elapsed = await drive(app, requests, forwarded)
+        results[name] = {
+            "requests": requests,
+            "total_sec": round(elapsed, 4),
+            "us_per_request": round(elapsed / requests * 1e6, 2),
+        }
+
+    baseline = results["no_middleware"]["us_per_request"]
+    for name, res in results.items():
+        res["overhead_us"] = round(res["us_per_request"] - baseline, 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ClientIPMiddleware implementations.")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--no-forwarded", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.requests, not args.no_forwarded))
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.benchsupport import (
+    asgi_client,
+    build_tiny_bert,
+    prepare_environment,
+    seed_workspace,
+    synthetic_turkish_texts,
+)
+
+DEFAULT_MIX = {
+    "profanity.detect": 70,
+    "profanity.bulk": 10,
+    "auth.login": 10,
+    "workspace.crud": 10,
+}
+
+ID_SEGMENT = re.compile(r"/(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{24}|\d+)(?=/|$)")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(int(round(pct / 100.0 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[idx]
+
+
+class RouteStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.statuses: Dict[str, int] = {}
+
+    def record(self, latency: float, status: int):
+        self.latencies.append(latency)
+        key = str(status)
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+        if status == 0 or status >= 400:
+            self.errors += 1
+
+    def summary(self, duration: float) -> Dict:
+        values = sorted(self.latencies)
+        count = len(values)
+        return {
+            "requests": count,
+            "rps": round(count / duration, 2) if duration else 0.0,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1e3, 3),
+            "p90_ms": round(percentile(values, 90) * 1e3, 3),
+            "p99_ms": round(percentile(values, 99) * 1e3, 3),
+            "max_ms": round(values[-1] * 1e3, 3) if values else 0.0,
+            "statuses": self.statuses,
+        }
+
+
+class TrafficMix:
+    def __init__(self, seed: Dict[str, str], texts: List[str], mix: Dict[str, int], rng: random.Random,
+                 model_name: str, model_version: str):
+        self.seed = seed
+        self.texts = texts
+        self.rng = rng
+        self.names = list(mix.keys())
+        self.weights = list(mix.values())
+        self.model_name = model_name
+        self.model_version = model_version
+        self.workspace_pool: List[str] = []
+        self.headers = {"Authorization": f"Bearer {seed['token']}"}
+
+    async def next_request(self, client) -> Tuple[str, int]:
+        name = self.rng.choices(self.names, weights=self.weights)[0]
+        return await getattr(self, "_" + name.replace(".", "_"))(client)
+
+    async def _profanity_detect(self, client):
+        response = await client.post("/profanity/detect", headers=self.headers, json={
+            "text": self.rng.choice(self.texts),
+            "workspace_id": self.seed["workspace_id"]
+        })
+        return "POST /profanity/detect", response.status_code
+
+    async def _profanity_bulk(self, client):
+        response = await client.post("/profanity/bulk", headers=self.headers, json={
+            "texts": self.rng.sample(self.texts, min(16, len(self.texts))),
+            "workspace_id": self.seed["workspace_id"]
+        })
+        return "POST /profanity/bulk", response.status_code
+
+    async def _auth_login(self, client):
+        response = await client.post("/auth/login", json={
+            "email": self.seed["email"],
+            "password": self.seed["password"]
+        })
+        return "POST /auth/login", response.status_code
+
+    async def _workspace_crud(self, client):
+        user_id = self.seed["user_id"]
+        op = self.rng.choice(["list", "add", "update", "delete"])
+
+        if op == "list":
+            response = await client.get(f"/workspaces/{user_id}/workspaces", headers=self.headers)
+            return "GET /workspaces/{user_id}/workspaces", response.status_code
+
+        if op == "add" or not self.workspace_pool:
+            response = await client.post(f"/workspaces/{user_id}/add", headers=self.headers, json={
+                "name": f"load-{self.rng.randint(0, 10 ** 9)}",
+                "description": "load test workspace",
+                "model_name": self.model_name,
+                "model_version": self.model_version
+            })
+            if response.status_code == 200:
+                self.workspace_pool.append(response.json()["id"])
+            return "POST /workspaces/{user_id}/add", response.status_code
+
+        if op == "update":
+            workspace_id = self.rng.choice(self.workspace_pool)
+            response = await client.put(f"/workspaces/{user_id}/update/{workspace_id}", headers=self.headers, json={
+                "name": f"load-{self.rng.randint(0, 10 ** 9)}",
+                "description": f"updated {time.time()}"
+            })
+            return "PUT /workspaces/{user_id}/update/{workspace_id}", response.status_code
+
+        workspace_id = self.workspace_pool.pop(self.rng.randrange(len(self.workspace_pool)))
+        response = await client.delete(f"/workspaces/{user_id}/delete/{workspace_id}", headers=self.headers)
+        return "DELETE /workspaces/{user_id}/delete/{workspace_id}", response.status_code
+
+
+class ReplayTraffic:
+    def __init__(self, path: str, seed: Optional[Dict[str, str]]):
+        self.records = []
+        self.skipped = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    self.skipped += 1
+                    continue
+                if not isinstance(record, dict) or "method" not in record or "path" not in record:
+                    self.skipped += 1
+                    continue
+                self.records.append(record)
+
+        if not self.records:
+            raise ValueError(f"No replayable records in {path} (expected JSON lines with 'method' and 'path').")
+
+        self.position = 0
+        self.auth = {"Authorization": f"Bearer {seed['token']}"} if seed else {}
+
+    async def next_request(self, client) -> Tuple[str, int]:
+        record = self.records[self.position % len(self.records)]
+        self.position += 1
+
+        headers = dict(self.auth)
+        headers.update(record.get("headers") or {})
+        method = record["method"].upper()
+        response = await client.request(
+            method,
+            record["path"],
+            params=record.get("query"),
+            json=record.get("json"),
+            content=record.get("body").encode("utf-8") if isinstance(record.get("body"), str) else None,
+            headers=headers
+        )
+        return f"{method} {ID_SEGMENT.sub('/{id}', record['path'].split('?', 1)[0])}", response.status_code
+
+
+async def run_level(client, traffic, concurrency: int, duration: float) -> Dict:
+    stats: Dict[str, RouteStats] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                route, status = await traffic.next_request(client)
+            except Exception:
+                route, status = "client_error", 0
+            stats.setdefault(route, RouteStats()).record(time.perf_counter() - start, status)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    overall = RouteStats()
+    for route_stats in stats.values():
+        overall.latencies.extend(route_stats.latencies)
+        overall.errors += route_stats.errors
+        for status, count in route_stats.statuses.items():
+            overall.statuses[status] = overall.statuses.get(status, 0) + count
+
+    return {
+        "concurrency": concurrency,
+        "duration_sec": round(elapsed, 3),
+        "overall": overall.summary(elapsed),
+        "routes": {route: s.summary(elapsed) for route, s in sorted(stats.items())},
+    }
+
+
+def find_knee(levels: List[Dict], min_gain: float) -> Optional[Dict]:
+    for previous, current in zip(levels, levels[1:]):
+        prev_rps = previous["overall"]["rps"]
+        if prev_rps and (current["overall"]["rps"] - prev_rps) / prev_rps < min_gain:
+            return {
+                "concurrency": previous["concurrency"],
+                "rps": prev_rps,
+                "p99_ms": previous["overall"]["p99_ms"],
+                "next_level_p99_ms": current["overall"]["p99_ms"],
+            }
+    return None
+
+
+def parse_mix(value: Optional[str]) -> Dict[str, int]:
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise ValueError(f"Unknown scenario '{name}'. Available: {', '.join(DEFAULT_MIX)}")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+async def run(args) -> Dict:
+    rng = random.Random(args.seed)
+    texts = synthetic_turkish_texts(args.texts, seed=args.seed)
+
+    if args.url:
+        import httpx
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        seed = None
+        if args.token:
+            seed = {
+                "token": args.token,
+                "user_id": args.user_id,
+                "workspace_id": args.workspace_id,
+                "email": args.email,
+                "password": args.password,
+            }
+    else:
+        bench_dir = prepare_environment(args.workdir)
+        seed = seed_workspace(build_tiny_bert(bench_dir, seed=args.seed), args.model_name, args.model_version)
+        from app import app
+        client = asgi_client(app)
+
+    if args.replay:
+        traffic = ReplayTraffic(args.replay, seed)
+    else:
+        if not seed:
+            raise ValueError("--token, --user-id and --workspace-id are required for the mixed scenario against --url")
+        traffic = TrafficMix(seed, texts, parse_mix(args.mix), rng, args.model_name, args.model_version)
+
+    levels = []
+    async with client:
+        if args.warmup:
+            await run_level(client, traffic, 1, args.warmup)
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            level = await run_level(client, traffic, concurrency, args.duration)
+            levels.append(level)
+            print(
+                f"[loadtest] c={concurrency:<4} rps={level['overall']['rps']:<10} "
+                f"p50={level['overall']['p50_ms']}ms p99={level['overall']['p99_ms']}ms "
+                f"errors={level['overall']['error_rate']:.2%}",
+                file=sys.stderr
+            )
+
+    peak = max(levels, key=lambda lvl: lvl["overall"]["rps"]) if levels else None
+    return {
+        "target": args.url or "in-process",
+        "workers": args.workers,
+        "scenario": "replay" if args.replay else parse_mix(args.mix),
+        "replay_skipped_records": traffic.skipped if isinstance(traffic, ReplayTraffic) else 0,
+        "saturation_curve": [
+            {
+                "concurrency": lvl["concurrency"],
+                "rps": lvl["overall"]["rps"],
+                "p50_ms": lvl["overall"]["p50_ms"],
+                "p99_ms": lvl["overall"]["p99_ms"],
+                "error_rate": lvl["overall"]["error_rate"],
+            }
+            for lvl in levels
+        ],
+        "peak": {
+            "concurrency": peak["concurrency"],
+            "rps": peak["overall"]["rps"],
+            "rps_per_worker": round(peak["overall"]["rps"] / max(args.workers, 1), 2),
+        } if peak else None,
+        "knee": find_knee(levels, args.knee_gain),
+        "levels": levels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the AegisAI API with mixed or replayed traffic.")
+    parser.add_argument("--url", default=None, help="Target a running server instead of the in-process app.")
+    parser.add_argument("--workers", type=int, default=1, help="Server worker count, used for rps-per-worker.")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32", help="Comma-separated concurrency levels.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level.")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--mix", default=None, help="e.g. profanity.detect=70,profanity.bulk=10,auth.login=10")
+    parser.add_argument("--replay", default=None, help="JSONL of captured requests with method/path/json/query.")
+    parser.add_argument("--knee-gain", type=float, default=0.10, help="Throughput gain below which the knee is reached.")
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=1337)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--workdir", default=None)
+    parser.add_argument("--model-name", default="bench-model")
+    parser.add_argument("--model-version", default="v1")
+    parser.add_argument("--token", default=None)
+    parser.add_argument("--user-id", default=None)
+    parser.add_argument("--workspace-id", default=None)
+    parser.add_argument("--email", default=None)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    rendered = json.dumps(report, indent=4, ensure_ascii=False)
+    print(rendered)
+    if args.output:
+        Path(args.output).write_text(rendered, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import argparse
+import hashlib
+import html
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote_plus, urlsplit
+
+from benchmarks.benchsupport import synthetic_turkish_texts
+
+POSTS_PER_PAGE = 25
+
+
+class RedditFixtureHandler(BaseHTTPRequestHandler):
+    latency = 0.05
+    error_rate = 0.0
+    total_posts = 100
+    texts = synthetic_turkish_texts(512)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        segments = [s for s in parts.path.split("/") if s]
+        if len(segments) < 3 or segments[0] != "r" or segments[2] != "search":
+            self.send_error(404)
+            return
+
+        time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        subreddit = segments[1]
+        params = parse_qs(parts.query)
+        query = params.get("q", [""])[0]
+        after = params.get("after", [None])[0]
+        body = self.render_page(subreddit, query, after).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def render_page(self, subreddit: str, query: str, after: str = None) -> str:
+        start = 0
+        if after and after.startswith(f"t3_{subreddit}_"):
+            start = self.total_posts - int(after.rsplit("_", 1)[1])
+        end = min(start + POSTS_PER_PAGE, self.total_posts)
+
+        posts = []
+        for i in range(start, end):
+            post_number = self.total_posts - 1 - i
+            post_id = f"t3_{subreddit}_{post_number}"
+            rng = random.Random(f"{subreddit}:{query}:{post_number}")
+            text = html.escape(rng.choice(self.texts))
+            posts.append(
+                f'<div class="search-result" data-fullname="{post_id}">'
+                f'<a class="search-title" href="/r/{subreddit}/comments/{post_id}/">{text}</a>'
+                f'<div class="search-result-meta">{rng.randint(1, 500)} points {rng.randint(0, 90)} comments</div>'
+                f'</div>'
+            )
+        nav = ""
+        if end < self.total_posts:
+            last_id = f"t3_{subreddit}_{self.total_posts - end}"
+            nav = (f'<span class="nextprev"><a rel="nofollow next" '
+                   f'href="/r/{subreddit}/search/?q={quote_plus(query)}&amp;count={end}&amp;after={last_id}">next</a></span>')
+        return f"<html><body>{''.join(posts)}{nav}</body></html>"
+
+
+def start_fixture_server(port: int = 0, latency: float = 0.05, error_rate: float = 0.0,
+                         total_posts: int = 100) -> ThreadingHTTPServer:
+    RedditFixtureHandler.latency = latency
+    RedditFixtureHandler.total_posts = total_posts
+    RedditFixtureHandler.error_rate = error_rate
+    server = ThreadingHTTPServer(("127.0.0.1", port), RedditFixtureHandler)
+    threading.Thread(target=server.serve_forever, name="reddit-fixture", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape a local old-reddit fixture to measure scraper throughput.")
+    parser.add_argument("--subreddits", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=25, help="Posts per subreddit; values above 25 paginate.")
+    parser.add_argument("--total-posts", type=int, default=100, help="Search results available per subreddit.")
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated server latency per page (seconds).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429.")
+    parser.add_argument("--rps", type=float, default=10.0, help="Token-bucket requests per second per host.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent requests per host.")
+    args = parser.parse_args()
+
+    from data_scraper.sites.reddit_scrapper import RedditScrapper
+
+    server = start_fixture_server(latency=args.latency, error_rate=args.error_rate, total_posts=args.total_posts)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    scrapper = RedditScrapper(
+        user_agent="aegis-fixture-bench",
+        base_url=base_url,
+        http={"requests_per_second": args.rps, "burst": args.concurrency, "per_host_concurrency": args.concurrency}
+    )
+
+    subreddits = [f"sub{i}" for i in range(args.subreddits)]
+    start = time.perf_counter()
+    posts = scrapper.fetch("test", limit=args.limit, subreddits=subreddits)
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    json.dump({
+        "subreddits": args.subreddits,
+        "posts": len(posts),
+        "elapsed_sec": round(elapsed, 3),
+        "sequential_estimate_sec": round(args.subreddits * args.latency, 3),
+    }, sys.stdout, indent=4)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -41,6 +41,27 @@ class ConfigLoader:
         except Exception as e:
             raise RuntimeError(f"Error reading blocked domains: {e}")
 
+    def get_ratelimit_config(self) -> dict:
+        return self.config.get("ratelimit", {})
+
+    def get_network_config(self) -> dict:
+        return self.config.get("network", {})
+
+    def get_profiling_config(self) -> dict:
+        return self.config.get("profiling", {})
+
+    def get_dataset_builder_config(self) -> dict:
+        return self.config.get("dataset_builder", {})
+
+    def get_corpus_config(self) -> dict:
+        return self.config.get("corpus", {})
+
+    def get_jobs_config(self) -> dict:
+        return self.config.get("jobs", {})
+
+    def get_trainer_config(self) -> dict:
+        return self.config.get("trainer", {})
+
     def get_scrapper_config(self, site: str) -> dict:
         scrapper_cfg = self.config.get("scrapper", {})
         site_cfg = scrapper_cfg.get(site, {})
@@ -1,32 +1,65 @@
 # -*- coding: utf-8 -*-
-from fastapi import APIRouter, Depends
-from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from typing import Callable, Optional
 
+from config_loader import ConfigLoader
 from huggingface.huggingface_controller import hf
 from corpusmanagement.corpusmanager import CorpusManager
+from corpusmanagement.dedup import DEDUP_MODES
+from error.errortypes import ErrorType
+from error.expectionhandler import ExpectionHandler
+from jobs.jobs_controller import runner
 from permcontrol.permissionscontrol import require_perm
 from user.role import Role
 
 router = APIRouter()
-corpus = CorpusManager(hf_manager=hf)
+corpus_config = ConfigLoader("config.json").get_corpus_config()
+corpus = CorpusManager(
+    hf_manager=hf,
+    num_proc=corpus_config.get("num_proc"),
+    batch_size=corpus_config.get("batch_size", 1000),
+    dedup_max_memory_entries=corpus_config.get("dedup_max_memory_entries", 5_000_000)
+)
 
 
-@router.post("/build", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
-def build(
-        dataset_key: str,
-        output_name: str,
-        text_field: str = "text",
-        limit: Optional[int] = None
-):
-    result = corpus.build_corpus(
+def build_corpus(dataset_key: str, output_name: str, text_field: str = "text", limit: Optional[int] = None,
+                 shard_lines: Optional[int] = None, dedup: Optional[str] = None,
+                 on_batch: Optional[Callable[[int], None]] = None):
+    return corpus.build_corpus(
         dataset_key=dataset_key,
         output_name=output_name,
         text_field=text_field,
         limit=limit,
         filters=[lambda x: len(x) > 3],
-        transformers=[lambda x: x.lower()]
+        transformers=[lambda x: x.lower()],
+        shard_lines=shard_lines,
+        dedup=dedup,
+        on_batch=on_batch
     )
-    return result
+
+
+@router.post("/build", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
+def build(
+        dataset_key: str,
+        output_name: str,
+        text_field: str = "text",
+        limit: Optional[int] = None,
+        shard_lines: Optional[int] = Query(None, ge=1),
+        dedup: Optional[str] = Query(None),
+        background: bool = Query(False)
+):
+    if dedup and dedup not in DEDUP_MODES:
+        raise ExpectionHandler(
+            message=f"Unsupported dedup mode. Use one of: {', '.join(DEDUP_MODES)}.",
+            error_type=ErrorType.VALIDATION_ERROR
+        )
+    if background:
+        job = runner.submit("corpus_build", {
+            "dataset_key": dataset_key, "output_name": output_name, "text_field": text_field, "limit": limit,
+            "shard_lines": shard_lines, "dedup": dedup
+        })
+        return {"success": True, "status": "queued", "job_id": job["id"]}
+    return build_corpus(dataset_key, output_name, text_field, limit, shard_lines, dedup)
 
 
 @router.get("/list", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
@@ -45,8 +78,46 @@ def metadata(output_name: str):
 
 
 @router.get("/analyze", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
-def analyze(output_name: str):
-    return corpus.analyze(output_name)
+def analyze(output_name: str, mode: str = "exact", top_k: int = Query(20, ge=0, le=1000)):
+    try:
+        return corpus.analyze(output_name, mode=mode, top_k=top_k)
+    except ValueError as e:
+        raise ExpectionHandler(
+            message=str(e),
+            error_type=ErrorType.VALIDATION_ERROR
+        )
+
+
+@router.get("/sample", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
+def sample(output_name: str, n: int = Query(10, ge=1, le=10000), seed: Optional[int] = None):
+    return corpus.sample_lines(output_name, n, seed)
+
+
+@router.get("/lines", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
+def lines(output_name: str, start: int = Query(0, ge=0), count: int = Query(10, ge=1, le=10000)):
+    result = corpus.get_lines(output_name, start, count)
+    if not result:
+        raise ExpectionHandler(
+            message=f"Corpus '{output_name}' not found.",
+            error_type=ErrorType.NOT_FOUND
+        )
+    return result
+
+
+@router.get("/shards", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
+def shards(output_name: str, num_shards: int = Query(4, ge=1, le=1024)):
+    return corpus.shard_boundaries(output_name, num_shards)
+
+
+@router.post("/split", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
+def split(output_name: str, parts: int = Query(2, ge=1, le=1024), by: str = "lines"):
+    try:
+        return {"files": corpus.split_corpus(output_name, parts, by)}
+    except ValueError as e:
+        raise ExpectionHandler(
+            message=str(e),
+            error_type=ErrorType.VALIDATION_ERROR
+        )
 
 
 @router.delete("/delete", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
@@ -1,17 +1,100 @@
 # -*- coding: utf-8 -*-
+import heapq
+import itertools
+import os
 import re
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Callable, Dict, Any
+from collections import Counter
+from typing import List, Optional, Callable, Dict, Any, Iterator
+
+from corpusmanagement.corpusstats import RunningStats, SpillingCounter
+from corpusmanagement.dedup import CorpusDeduper, dedup_fields
+from corpusmanagement.lineindex import LineIndex, iter_chunks, open_mmap
 from huggingface.huggingfacemanager import HuggingFaceManager
+from utility.minhash import MinHasher
+from utility.sketches import CountMinSketch, HyperLogLog, TopK, hash64
+
+
+WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+DEFAULT_BATCH_SIZE = 1000
+PARALLEL_MIN_ROWS = 50000
+ANALYZE_MODES = ("exact", "approximate")
+SPLIT_MODES = ("lines", "bytes")
+WORD_RE = re.compile(r"\w+")
+
+
+def _process_batch(batch: Dict[str, list], text_field: str,
+                   filters: Optional[List[Callable[[str], bool]]],
+                   transformers: Optional[List[Callable[[str], str]]],
+                   dedup: bool = False, hasher: Optional[MinHasher] = None) -> Dict[str, list]:
+    out = []
+    for text in batch.get(text_field) or []:
+        text = CorpusManager.clean_text(text)
+        if not text:
+            continue
+        if filters and not all(f(text) for f in filters):
+            continue
+        if transformers:
+            for t in transformers:
+                text = t(text)
+        out.append(text)
+    if dedup:
+        return {"text": out, **dedup_fields(out, hasher)}
+    return {"text": out}
+
+
+class _CorpusWriter:
+    def __init__(self, corpus_dir: Path, output_name: str, mode: str, shard_lines: Optional[int]):
+        self.corpus_dir = corpus_dir
+        self.output_name = output_name
+        self.mode = mode
+        self.shard_lines = shard_lines
+        self.files: List[str] = []
+        self._handle = None
+        self._lines_in_shard = 0
+
+    def _open_next(self):
+        if self._handle:
+            self._handle.close()
+        if self.shard_lines:
+            name = f"{self.output_name}_shard{len(self.files):05d}.txt"
+        else:
+            name = f"{self.output_name}.txt"
+        self._handle = open(self.corpus_dir / name, self.mode, encoding="utf-8", buffering=WRITE_BUFFER_SIZE)
+        self._lines_in_shard = 0
+        self.files.append(name)
+
+    def write_lines(self, lines: List[str]):
+        if self._handle is None:
+            self._open_next()
+        while lines:
+            take = len(lines)
+            if self.shard_lines:
+                if self._lines_in_shard >= self.shard_lines:
+                    self._open_next()
+                take = min(take, self.shard_lines - self._lines_in_shard)
+            self._handle.write("\n".join(lines[:take]) + "\n")
+            self._lines_in_shard += take
+            lines = lines[take:]
+
+    def close(self):
+        if self._handle is None:
+            self._open_next()
+        self._handle.close()
 
 
 class CorpusManager:
-    def __init__(self, hf_manager: HuggingFaceManager, corpus_dir: str = "corpora"):
+    def __init__(self, hf_manager: HuggingFaceManager, corpus_dir: str = "corpora",
+                 num_proc: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 dedup_max_memory_entries: int = 5_000_000):
         self.hf_manager = hf_manager
         self.corpus_dir = Path(corpus_dir)
         self.corpus_dir.mkdir(parents=True, exist_ok=True)
+        self.num_proc = num_proc or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.dedup_max_memory_entries = dedup_max_memory_entries
 
     @staticmethod
     def clean_text(text: str) -> str:
@@ -30,50 +113,90 @@ class CorpusManager:
             filters: Optional[List[Callable[[str], bool]]] = None,
             transformers: Optional[List[Callable[[str], str]]] = None,
             append: bool = False,
+            num_proc: Optional[int] = None,
+            shard_lines: Optional[int] = None,
+            dedup: Optional[str] = None,
+            on_batch: Optional[Callable[[int], None]] = None,
     ) -> Dict[str, Any]:
 
         dataset = self.hf_manager.get(dataset_key)
-        if not dataset:
+        if dataset is None:
             return {"success": False, "error": f"Dataset not found: {dataset_key}"}
+        column_names = getattr(dataset, "column_names", None)
+        if column_names and text_field not in column_names:
+            return {"success": False, "error": f"Field '{text_field}' not found in dataset: {dataset_key}"}
 
-        output_file = self.corpus_dir / f"{output_name}.txt"
-        mode = "a" if append else "w"
-        written = 0
-        lengths = []
-
-        with open(output_file, mode, encoding="utf-8") as f:
-            for i, item in enumerate(dataset):
-                if limit and i >= limit:
-                    break
-                text = item.get(text_field, "")
-                text = self.clean_text(text)
-                if not text:
-                    continue
+        deduper = CorpusDeduper(dedup, self.dedup_max_memory_entries, str(self.corpus_dir)) if dedup else None
+        fn_kwargs = {
+            "text_field": text_field,
+            "filters": filters,
+            "transformers": transformers,
+            "dedup": deduper is not None,
+            "hasher": deduper.hasher if deduper else None,
+        }
+        writer = _CorpusWriter(self.corpus_dir, output_name, "a" if append and not shard_lines else "w", shard_lines)
+        stats = RunningStats()
 
-                if filters and not all(f(text) for f in filters):
+        try:
+            for batch in self._processed_batches(dataset, limit, num_proc or self.num_proc, fn_kwargs):
+                texts = batch["text"]
+                if deduper and texts:
+                    texts = deduper.filter(texts, batch["hash"], batch.get("bands"), batch.get("sigs"))
+                if not texts:
                     continue
-                if transformers:
-                    for t in transformers:
-                        text = t(text)
-
-                f.write(text + "\n")
-                written += 1
-                lengths.append(len(text))
-
-        avg_len = round(sum(lengths) / len(lengths), 2) if lengths else 0
+                writer.write_lines(texts)
+                stats.update_batch(len(t) for t in texts)
+                if on_batch:
+                    on_batch(stats.count)
+        finally:
+            writer.close()
+            if deduper:
+                deduper.close()
+        for file_name in writer.files:
+            self._line_index(Path(file_name).stem, rebuild=True)
 
         metadata = {
             "success": True,
             "dataset_key": dataset_key,
             "output_name": output_name,
-            "lines": written,
-            "avg_length": avg_len,
+            "lines": stats.count,
+            "avg_length": round(stats.mean, 2),
+            "length_stats": stats.to_dict(),
+            "files": writer.files,
+            "dedup": {**deduper.stats, "removed": deduper.removed} if deduper else None,
             "created": datetime.utcnow().isoformat() + "Z",
         }
 
         self._write_metadata(output_name, metadata)
         return metadata
 
+    def _processed_batches(self, dataset, limit: Optional[int], num_proc: int, fn_kwargs: dict) -> Iterator[Dict[str, list]]:
+        if hasattr(dataset, "select") and hasattr(dataset, "__len__"):
+            if limit:
+                dataset = dataset.select(range(min(limit, len(dataset))))
+            processed = dataset.map(
+                _process_batch,
+                batched=True,
+                batch_size=self.batch_size,
+                num_proc=num_proc if num_proc > 1 and len(dataset) >= PARALLEL_MIN_ROWS else None,
+                remove_columns=dataset.column_names,
+                fn_kwargs=fn_kwargs,
+                load_from_cache_file=False,
+                desc=f"Building corpus from {fn_kwargs['text_field']}"
+            )
+            yield from processed.iter(batch_size=self.batch_size * 10)
+            return
+
+        rows = iter(dataset)
+        if limit:
+            rows = itertools.islice(rows, limit)
+        while True:
+            chunk = list(itertools.islice(rows, self.batch_size))
+            if not chunk:
+                return
+            batch = {fn_kwargs["text_field"]: [row.get(fn_kwargs["text_field"], "") for row in chunk]}
+            yield _process_batch(batch, **fn_kwargs)
+
     def _metadata_path(self, output_name: str) -> Path:
         return self.corpus_dir / f"{output_name}.meta.json"
 
@@ -82,6 +205,22 @@ class CorpusManager:
         with open(path, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=4, ensure_ascii=False)
 
+    def _index_path(self, output_name: str) -> Path:
+        return self.corpus_dir / f"{output_name}.idx"
+
+    def _line_index(self, output_name: str, rebuild: bool = False) -> Optional[LineIndex]:
+        path = self.corpus_dir / f"{output_name}.txt"
+        if not path.exists():
+            return None
+        index_path = self._index_path(output_name)
+        if not rebuild:
+            index = LineIndex.load(index_path)
+            if index is not None and index.matches(path):
+                return index
+        index = LineIndex.build(path)
+        index.save(index_path)
+        return index
+
     def get_metadata(self, output_name: str) -> Optional[Dict[str, Any]]:
         path = self._metadata_path(output_name)
         if not path.exists():
@@ -102,6 +241,20 @@ class CorpusManager:
                     break
         return lines
 
+    def get_lines(self, output_name: str, start: int = 0, count: int = 10) -> Dict[str, Any]:
+        index = self._line_index(output_name)
+        if index is None:
+            return {}
+        with open_mmap(self.corpus_dir / f"{output_name}.txt") as mm:
+            lines = index.read_lines(mm, max(start, 0), count)
+        return {"start": start, "count": len(lines), "total_lines": len(index), "lines": lines}
+
+    def shard_boundaries(self, output_name: str, num_shards: int) -> List[Dict[str, int]]:
+        index = self._line_index(output_name)
+        if index is None:
+            return []
+        return index.shard_boundaries(num_shards)
+
     def list_corpora(self) -> List[str]:
         return [p.stem for p in self.corpus_dir.glob("*.txt")]
 
@@ -109,7 +262,7 @@ class CorpusManager:
         txt_path = self.corpus_dir / f"{output_name}.txt"
         meta_path = self._metadata_path(output_name)
         deleted = False
-        for p in [txt_path, meta_path]:
+        for p in [txt_path, meta_path, self._index_path(output_name)]:
             if p.exists():
                 p.unlink()
                 deleted = True
@@ -118,54 +271,114 @@ class CorpusManager:
     def merge_corpora(self, corpus_names: List[str], output_name: str) -> Dict[str, Any]:
         output_file = self.corpus_dir / f"{output_name}.txt"
         total = 0
-        for name in corpus_names:
-            path = self.corpus_dir / f"{name}.txt"
-            if not path.exists():
-                continue
-            with open(path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            total += len(lines)
-            with open(output_file, "a", encoding="utf-8") as out_f:
-                out_f.writelines(lines)
+        with open(output_file, "ab", buffering=WRITE_BUFFER_SIZE) as out_f:
+            for name in corpus_names:
+                path = self.corpus_dir / f"{name}.txt"
+                if not path.exists():
+                    continue
+                last = b""
+                for _, chunk in iter_chunks(path):
+                    out_f.write(chunk)
+                    total += chunk.count(b"\n")
+                    last = chunk
+                if last and not last.endswith(b"\n"):
+                    total += 1
 
         return {"output_name": output_name, "merged_from": corpus_names, "lines": total}
 
-    def split_corpus(self, output_name: str, parts: int = 2) -> List[str]:
+    def split_corpus(self, output_name: str, parts: int = 2, by: str = "lines") -> List[str]:
+        if by not in SPLIT_MODES:
+            raise ValueError(f"Unsupported split mode. Use one of: {', '.join(SPLIT_MODES)}.")
         src_path = self.corpus_dir / f"{output_name}.txt"
-        if not src_path.exists():
+        if not src_path.exists() or parts < 1:
             return []
 
-        with open(src_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        chunk_size = len(lines) // parts
+        index = self._line_index(output_name)
+        if by == "bytes":
+            ranges = [(s["start_byte"], s["end_byte"]) for s in index.shard_boundaries(parts)]
+        else:
+            chunk_size = len(index) // parts
+            ranges = []
+            for i in range(parts):
+                first = i * chunk_size
+                last = len(index) if i == parts - 1 else (i + 1) * chunk_size
+                begin = index.offsets[first] if first < len(index) else index.size
+                end = index.offsets[last] if last < len(index) else index.size
+                ranges.append((begin, end))
         out_files = []
 
-        for i in range(parts):
-            part_lines = lines[i * chunk_size: (i + 1) * chunk_size]
-            out_path = self.corpus_dir / f"{output_name}_part{i + 1}.txt"
-            with open(out_path, "w", encoding="utf-8") as out_f:
-                out_f.writelines(part_lines)
-            out_files.append(out_path.name)
+        with open_mmap(src_path) as mm:
+            for i, (begin, end) in enumerate(ranges):
+                out_path = self.corpus_dir / f"{output_name}_part{i + 1}.txt"
+                with open(out_path, "wb", buffering=WRITE_BUFFER_SIZE) as out_f:
+                    for offset in range(begin, end, WRITE_BUFFER_SIZE):
+                        out_f.write(mm[offset:min(offset + WRITE_BUFFER_SIZE, end)])
+                out_files.append(out_path.name)
 
         return out_files
 
-    def analyze(self, output_name: str) -> Dict[str, Any]:
+    def sample_lines(self, output_name: str, n: int = 10, seed: Optional[int] = None) -> List[str]:
+        index = self._line_index(output_name)
+        if index is None:
+            return []
+        with open_mmap(self.corpus_dir / f"{output_name}.txt") as mm:
+            return [index.read_line(mm, i) for i in index.sample(n, seed)]
+
+    def analyze(self, output_name: str, mode: str = "exact", top_k: int = 20,
+                max_vocab_entries: int = 2_000_000) -> Dict[str, Any]:
+        if mode not in ANALYZE_MODES:
+            raise ValueError(f"Unsupported analyze mode. Use one of: {', '.join(ANALYZE_MODES)}.")
+
         path = self.corpus_dir / f"{output_name}.txt"
         if not path.exists():
             return {}
 
-        with open(path, "r", encoding="utf-8") as f:
-            lines = [l.strip() for l in f if l.strip()]
+        lengths = RunningStats()
+        total_words = 0
+        exact = SpillingCounter(max_vocab_entries, spill_dir=str(self.corpus_dir)) if mode == "exact" else None
+        hll = HyperLogLog() if mode == "approximate" else None
+        cms = CountMinSketch() if mode == "approximate" else None
+        top = TopK(top_k) if mode == "approximate" else None
+
+        try:
+            for _, chunk in iter_chunks(path):
+                text = chunk.decode("utf-8", errors="replace")
+                lengths.update_batch(len(line) for line in (l.strip() for l in text.splitlines()) if line)
+
+                counts = Counter(WORD_RE.findall(text.lower()))
+                total_words += sum(counts.values())
+                if exact is not None:
+                    exact.update(counts)
+                else:
+                    for token, count in counts.items():
+                        h = hash64(token)
+                        hll.add_hash(h)
+                        top.offer(token, cms.add_hash(h, count))
 
-        words = []
-        for l in lines:
-            words.extend(re.findall(r"\w+", l.lower()))
+            if exact is not None:
+                vocab_size = 0
+                heap: List[tuple] = []
+                for token, count in exact.items():
+                    vocab_size += 1
+                    if len(heap) < top_k:
+                        heapq.heappush(heap, (count, token))
+                    elif count > heap[0][0]:
+                        heapq.heapreplace(heap, (count, token))
+                top_terms = sorted(((t, c) for c, t in heap), key=lambda kv: -kv[1])
+            else:
+                vocab_size = hll.count()
+                top_terms = top.items()
+        finally:
+            if exact is not None:
+                exact.close()
 
-        unique_words = set(words)
         return {
-            "lines": len(lines),
-            "avg_length": round(sum(len(l) for l in lines) / len(lines), 2) if lines else 0,
-            "vocab_size": len(unique_words),
-            "unique_ratio": round(len(unique_words) / len(words), 4) if words else 0,
+            "lines": lengths.count,
+            "avg_length": round(lengths.mean, 2),
+            "length_stats": lengths.to_dict(),
+            "words": total_words,
+            "vocab_size": vocab_size,
+            "unique_ratio": round(vocab_size / total_words, 4) if total_words else 0,
+            "top_terms": [{"term": t, "count": c} for t, c in top_terms],
+            "mode": mode,
         }
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import heapq
+import itertools
+import math
+import os
+import tempfile
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class RunningStats:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def update_batch(self, values: Iterable[float]):
+        values = list(values)
+        if not values:
+            return
+        n = len(values)
+        mean = sum(values) / n
+        m2 = sum((v - mean) ** 2 for v in values)
+        self._combine(n, mean, m2, min(values), max(values))
+
+    def merge(self, other: "RunningStats"):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+
+    def _combine(self, n: int, mean: float, m2: float, lo: float, hi: float):
+        # Chan et al. parallel update: merges a batch's mean and M2 without keeping its values.
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": round(self.mean, 2),
+            "std": round(self.std, 2),
+            "min": self.min or 0,
+            "max": self.max or 0,
+        }
+
+
+class SpillingCounter:
+    def __init__(self, max_entries: int = 2_000_000, spill_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self.counts: Counter = Counter()
+        self.runs: List[str] = []
+
+    def update(self, counts: Dict[str, int]):
+        self.counts.update(counts)
+        if len(self.counts) > self.max_entries:
+            self._spill()
+
+    def _spill(self):
+        fd, path = tempfile.mkstemp(prefix="aegis-vocab-", suffix=".tsv", dir=self.spill_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for token in sorted(self.counts):
+                f.write(f"{token}\t{self.counts[token]}\n")
+        self.runs.append(path)
+        self.counts = Counter()
+
+    @staticmethod
+    def _read_run(path: str) -> Iterator[Tuple[str, int]]:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                token, count = line.rstrip("\n").rsplit("\t", 1)
+                yield token, int(count)
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        try:
+            memory_run = ((token, self.counts[token]) for token in sorted(self.counts))
+            merged = heapq.merge(memory_run, *(self._read_run(p) for p in self.runs), key=lambda kv: kv[0])
+            for token, group in itertools.groupby(merged, key=lambda kv: kv[0]):
+                yield token, sum(count for _, count in group)
+        finally:
+            self.close()
+
+    def close(self):
+        for path in self.runs:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.runs = []
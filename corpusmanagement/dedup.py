@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import sqlite3
+import struct
+import tempfile
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utility.minhash import MinHasher
+
+DEDUP_MODES = ("exact", "near")
+SQLITE_IN_CHUNK = 500
+NEAR_DUPLICATE_JACCARD = 0.8
+
+
+def text_hash(text: str) -> int:
+    # Signed so it fits an Arrow int64 column and a SQLite INTEGER key.
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+def dedup_fields(texts: List[str], hasher: Optional[MinHasher]) -> dict:
+    fields = {"hash": [text_hash(t) for t in texts]}
+    if hasher is not None:
+        sigs = [hasher.signature(t) for t in texts]
+        fields["bands"] = [[text_hash(key) for key in hasher.band_keys(sig)] for sig in sigs]
+        fields["sigs"] = [pack_signature(sig) for sig in sigs]
+    return fields
+
+
+def pack_signature(sig: List[int]) -> bytes:
+    return struct.pack(f"<{len(sig)}I", *sig)
+
+
+def unpack_signature(data: bytes) -> Tuple[int, ...]:
+    return struct.unpack(f"<{len(data) // 4}I", data)
+
+
+class SeenHashes:
+    def __init__(self, max_memory_entries: int = 5_000_000, spill_dir: Optional[str] = None):
+        self.max_memory_entries = max_memory_entries
+        self.spill_dir = spill_dir
+        self.memory: Set[int] = set()
+        self.db_path: Optional[str] = None
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def existing(self, hashes: Iterable[int]) -> Set[int]:
+        if self.conn is None:
+            return {h for h in hashes if h in self.memory}
+        hashes = list(set(hashes))
+        found = set()
+        for i in range(0, len(hashes), SQLITE_IN_CHUNK):
+            chunk = hashes[i:i + SQLITE_IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(row[0] for row in self.conn.execute(f"SELECT h FROM seen WHERE h IN ({placeholders})", chunk))
+        return found
+
+    def add(self, hashes: Iterable[int]):
+        if self.conn is None:
+            self.memory.update(hashes)
+            if len(self.memory) > self.max_memory_entries:
+                self._spill()
+            return
+        self.conn.executemany("INSERT OR IGNORE INTO seen (h) VALUES (?)", ((h,) for h in hashes))
+        self.conn.commit()
+
+    def _open_spill(self):
+        fd, self.db_path = tempfile.mkstemp(prefix="aegis-dedup-", suffix=".sqlite", dir=self.spill_dir)
+        os.close(fd)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        print(f"[INFO] Dedup set exceeded {self.max_memory_entries} entries, continuing on disk: {self.db_path}")
+
+    def _spill(self):
+        self._open_spill()
+        self.conn.execute("CREATE TABLE seen (h INTEGER PRIMARY KEY) WITHOUT ROWID")
+        self.conn.executemany("INSERT INTO seen (h) VALUES (?)", ((h,) for h in self.memory))
+        self.conn.commit()
+        self.memory = set()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.db_path:
+            try:
+                os.remove(self.db_path)
+            except OSError:
+                pass
+            self.db_path = None
+
+
+class BandSignatures(SeenHashes):
+    # Maps an LSH band to the signature of the first kept line in it, so band collisions can be verified.
+    def __init__(self, max_memory_entries: int = 5_000_000, spill_dir: Optional[str] = None):
+        super().__init__(max_memory_entries, spill_dir)
+        self.memory: Dict[int, bytes] = {}
+
+    def lookup(self, bands: Iterable[int]) -> Dict[int, bytes]:
+        if self.conn is None:
+            return {b: self.memory[b] for b in bands if b in self.memory}
+        bands = list(set(bands))
+        found = {}
+        for i in range(0, len(bands), SQLITE_IN_CHUNK):
+            chunk = bands[i:i + SQLITE_IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(self.conn.execute(f"SELECT h, sig FROM seen WHERE h IN ({placeholders})", chunk))
+        return found
+
+    def add(self, items: Iterable[Tuple[int, bytes]]):
+        if self.conn is None:
+            for band, sig in items:
+                self.memory.setdefault(band, sig)
+            if len(self.memory) > self.max_memory_entries:
+                self._spill()
+            return
+        self.conn.executemany("INSERT OR IGNORE INTO seen (h, sig) VALUES (?, ?)", items)
+        self.conn.commit()
+
+    def _spill(self):
+        self._open_spill()
+        self.conn.execute("CREATE TABLE seen (h INTEGER PRIMARY KEY, sig BLOB) WITHOUT ROWID")
+        self.conn.executemany("INSERT INTO seen (h, sig) VALUES (?, ?)", self.memory.items())
+        self.conn.commit()
+        self.memory = {}
+
+
+class CorpusDeduper:
+    def __init__(self, mode: str, max_memory_entries: int = 5_000_000, spill_dir: Optional[str] = None):
+        if mode not in DEDUP_MODES:
+            raise ValueError(f"Unsupported dedup mode. Use one of: {', '.join(DEDUP_MODES)}.")
+        self.mode = mode
+        self.hasher = MinHasher() if mode == "near" else None
+        self.hashes = SeenHashes(max_memory_entries, spill_dir)
+        self.bands = BandSignatures(max_memory_entries, spill_dir) if self.hasher else None
+        self.stats = {
+            "mode": mode,
+            "exact_duplicates": 0,
+            "near_duplicates": 0,
+            "near_duplicate_threshold": NEAR_DUPLICATE_JACCARD if self.hasher else None,
+        }
+
+    def filter(self, texts: List[str], hashes: List[int], bands: Optional[List[List[int]]] = None,
+               sigs: Optional[List[bytes]] = None) -> List[str]:
+        known = self.hashes.existing(hashes)
+        kept_idx = []
+        for i, h in enumerate(hashes):
+            if h in known:
+                self.stats["exact_duplicates"] += 1
+                continue
+            known.add(h)
+            kept_idx.append(i)
+        self.hashes.add(hashes[i] for i in kept_idx)
+
+        if self.bands is not None and bands is not None and sigs is not None and kept_idx:
+            # A shared band only makes a candidate; the line is dropped when its estimated Jaccard
+            # similarity with the band's kept line reaches NEAR_DUPLICATE_JACCARD.
+            stored = self.bands.lookup(b for i in kept_idx for b in bands[i])
+            new_bands = []
+            near_kept = []
+            for i in kept_idx:
+                sig = unpack_signature(sigs[i])
+                candidates = {stored[b] for b in bands[i] if b in stored}
+                if any(MinHasher.similarity(sig, unpack_signature(c)) >= NEAR_DUPLICATE_JACCARD for c in candidates):
+                    self.stats["near_duplicates"] += 1
+                    continue
+                for b in bands[i]:
+                    if b not in stored:
+                        stored[b] = sigs[i]
+                        new_bands.append((b, sigs[i]))
+                near_kept.append(i)
+            self.bands.add(new_bands)
+            kept_idx = near_kept
+
+        return [texts[i] for i in kept_idx]
+
+    @property
+    def removed(self) -> int:
+        return self.stats["exact_duplicates"] + self.stats["near_duplicates"]
+
+    def close(self):
+        self.hashes.close()
+        if self.bands is not None:
+            self.bands.close()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import itertools
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 16 * 1024 * 1024
+INDEX_MAGIC = b"AEGISIDX"
+# Index file: magic, corpus size, corpus mtime_ns, line count, then one little-endian uint64 start offset per line.
+INDEX_HEADER = struct.Struct("<8sQQQ")
+
+
+@contextmanager
+def open_mmap(path: Path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+def iter_chunks(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, bytes]]:
+    with open_mmap(path) as mm:
+        size = len(mm)
+        start = 0
+        while start < size:
+            end = min(start + chunk_size, size)
+            if end < size:
+                newline = mm.rfind(b"\n", start, end)
+                end = newline + 1 if newline >= start else (mm.find(b"\n", end) + 1 or size)
+            yield start, mm[start:end]
+            start = end
+
+
+class LineIndex:
+    def __init__(self, offsets, size: int, mtime_ns: int = 0):
+        self.offsets = offsets
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    @classmethod
+    def build(cls, path: Path, chunk_size: int = CHUNK_SIZE) -> "LineIndex":
+        offsets = array("Q")
+        size = 0
+        for start, chunk in iter_chunks(path, chunk_size):
+            lines = chunk.split(b"\n")
+            if lines and lines[-1] == b"":
+                lines.pop()
+            line_starts = itertools.accumulate((len(line) + 1 for line in lines), initial=start)
+            offsets.extend(itertools.islice(line_starts, len(lines)))
+            size = start + len(chunk)
+        return cls(offsets, size, os.stat(path).st_mtime_ns)
+
+    def matches(self, path: Path) -> bool:
+        stat = os.stat(path)
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+    def save(self, index_path: Path):
+        offsets = self.offsets if isinstance(self.offsets, array) else array("Q", self.offsets)
+        if sys.byteorder != "little":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+        tmp_path = Path(str(index_path) + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, self.size, self.mtime_ns, len(offsets)))
+            offsets.tofile(f)
+        os.replace(tmp_path, index_path)
+
+    @classmethod
+    def load(cls, index_path: Path) -> Optional["LineIndex"]:
+        try:
+            with open(index_path, "rb") as f:
+                header = f.read(INDEX_HEADER.size)
+                if len(header) < INDEX_HEADER.size:
+                    return None
+                magic, size, mtime_ns, count = INDEX_HEADER.unpack(header)
+                if magic != INDEX_MAGIC:
+                    return None
+                if count == 0:
+                    return cls(array("Q"), size, mtime_ns)
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(mm) != INDEX_HEADER.size + count * 8:
+            mm.close()
+            return None
+        if sys.byteorder != "little":
+            offsets = array("Q", mm[INDEX_HEADER.size:])
+            offsets.byteswap()
+            mm.close()
+        else:
+            offsets = memoryview(mm)[INDEX_HEADER.size:].cast("Q")
+        return cls(offsets, size, mtime_ns)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def span(self, line: int) -> Tuple[int, int]:
+        start = self.offsets[line]
+        end = self.offsets[line + 1] if line + 1 < len(self.offsets) else self.size
+        return start, end
+
+    def read_lines(self, mm, start: int, count: int) -> List[str]:
+        if start >= len(self) or count <= 0:
+            return []
+        stop = min(start + count, len(self))
+        begin = self.offsets[start]
+        end = self.offsets[stop] if stop < len(self) else self.size
+        return mm[begin:end].decode("utf-8", errors="replace").splitlines()
+
+    def read_line(self, mm, line: int) -> str:
+        start, end = self.span(line)
+        return mm[start:end].decode("utf-8", errors="replace").rstrip("\r\n")
+
+    def sample(self, n: int, seed: Optional[int] = None) -> List[int]:
+        n = min(n, len(self))
+        return sorted(random.Random(seed).sample(range(len(self)), n))
+
+    def byte_to_line(self, offset: int) -> int:
+        return bisect_left(self.offsets, offset)
+
+    def shard_boundaries(self, num_shards: int) -> List[dict]:
+        num_shards = max(1, min(num_shards, len(self) or 1))
+        starts = [0]
+        for i in range(1, num_shards):
+            line = self.byte_to_line(self.size * i // num_shards)
+            if line > starts[-1] and line < len(self):
+                starts.append(line)
+        starts.append(len(self))
+
+        shards = []
+        for i, (first, last) in enumerate(zip(starts, starts[1:])):
+            start_byte = self.offsets[first] if first < len(self) else self.size
+            end_byte = self.offsets[last] if last < len(self) else self.size
+            shards.append({
+                "shard": i,
+                "start_line": first,
+                "end_line": last,
+                "start_byte": start_byte,
+                "end_byte": end_byte,
+            })
+        return shards
@@ -1,27 +1,219 @@
 # -*- coding: utf-8 -*-
+import json
+import sqlite3
+import threading
 import time
 import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
 from typing import Any, Dict, Optional
 
 
+@dataclass
+class CacheEntry:
+    value: Any
+    expires: float
+    stale_until: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires > time.time()
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class _MemoryBackend:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry.stale_until <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CacheEntry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def touch(self, key: str, expires: float, stale_until: float):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry.expires = expires
+                entry.stale_until = max(entry.stale_until, stale_until)
+                self.entries.move_to_end(key)
+
+    def sweep(self) -> int:
+        now = time.time()
+        with self.lock:
+            expired = [k for k, e in self.entries.items() if e.stale_until <= now]
+            for k in expired:
+                del self.entries[k]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def close(self):
+        pass
+
+
+class _SqliteBackend:
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS scrapper_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, stale_until REAL NOT NULL,"
+            " etag TEXT, last_modified TEXT, accessed REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS scrapper_cache_accessed ON scrapper_cache (accessed)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS scrapper_cache_stale ON scrapper_cache (stale_until)")
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, expires, stale_until, etag, last_modified FROM scrapper_cache"
+                " WHERE key = ? AND stale_until > ?",
+                (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE scrapper_cache SET accessed = ? WHERE key = ?", (now, key))
+        return CacheEntry(json.loads(row[0]), row[1], row[2], row[3], row[4])
+
+    def put(self, key: str, entry: CacheEntry):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO scrapper_cache"
+                " (key, value, expires, stale_until, etag, last_modified, accessed) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(entry.value, ensure_ascii=False), entry.expires, entry.stale_until,
+                 entry.etag, entry.last_modified, time.time())
+            )
+            self.conn.execute(
+                "DELETE FROM scrapper_cache WHERE key IN ("
+                " SELECT key FROM scrapper_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def touch(self, key: str, expires: float, stale_until: float):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE scrapper_cache SET expires = ?, stale_until = MAX(stale_until, ?), accessed = ? WHERE key = ?",
+                (expires, stale_until, time.time(), key)
+            )
+
+    def sweep(self) -> int:
+        with self.lock:
+            return self.conn.execute("DELETE FROM scrapper_cache WHERE stale_until <= ?", (time.time(),)).rowcount
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM scrapper_cache").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
 class ScrapperCache:
-    def __init__(self, ttl: int = 3600):
+    def __init__(
+            self,
+            ttl: int = 3600,
+            max_entries: int = 1024,
+            backend: str = "memory",
+            path: str = "cache/scrapper_cache.sqlite3",
+            stale_ttl: int = 86400,
+            sweep_interval: float = 60.0
+    ):
         self.ttl = ttl
-        self.cache: Dict[str, Dict[str, Any]] = {}
+        self.stale_ttl = stale_ttl
+        if backend == "sqlite":
+            self.backend = _SqliteBackend(path, max_entries)
+        elif backend == "memory":
+            self.backend = _MemoryBackend(max_entries)
+        else:
+            raise ValueError(f"Unknown scrapper cache backend: {backend}")
+
+        self._stop = threading.Event()
+        self._sweeper = None
+        if sweep_interval and sweep_interval > 0:
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop, args=(sweep_interval,), name="scrapper-cache-sweeper", daemon=True
+            )
+            self._sweeper.start()
 
     def _make_key(self, query: str, limit: int, subreddits: Optional[list]) -> str:
         raw_key = f"{query}:{limit}:{','.join(subreddits or [])}"
         return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
 
     def get(self, query: str, limit: int, subreddits: Optional[list]) -> Optional[Any]:
-        key = self._make_key(query, limit, subreddits)
-        entry = self.cache.get(key)
-        if entry and entry["expires"] > time.time():
-            return entry["value"]
-        if key in self.cache:
-            del self.cache[key]
+        entry = self.backend.get(self._make_key(query, limit, subreddits))
+        if entry and entry.fresh:
+            return entry.value
         return None
 
     def set(self, query: str, limit: int, subreddits: Optional[list], value: Any):
+        now = time.time()
         key = self._make_key(query, limit, subreddits)
-        self.cache[key] = {"value": value, "expires": time.time() + self.ttl}
+        self.backend.put(key, CacheEntry(value, now + self.ttl, now + self.ttl))
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        return self.backend.get(key)
+
+    def put(self, key: str, value: Any, etag: Optional[str] = None, last_modified: Optional[str] = None,
+            ttl: Optional[int] = None):
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        stale_until = expires + self.stale_ttl if (etag or last_modified) else expires
+        self.backend.put(key, CacheEntry(value, expires, stale_until, etag, last_modified))
+
+    def touch(self, key: str, ttl: Optional[int] = None):
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        self.backend.touch(key, expires, expires + self.stale_ttl)
+
+    def sweep(self) -> int:
+        return self.backend.sweep()
+
+    def _sweep_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                removed = self.sweep()
+                if removed:
+                    print(f"[ScrapperCache] Swept {removed} expired entries")
+            except Exception as e:
+                print(f"[ScrapperCache] Sweep failed: {e}")
+
+    def __len__(self) -> int:
+        return len(self.backend)
+
+    def close(self):
+        self._stop.set()
+        self.backend.close()
@@ -1,6 +1,7 @@
 import json
 
 from fastapi import APIRouter, Query, Depends
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 
 from config_loader import ConfigLoader
@@ -8,12 +9,66 @@ from data_scraper.scrapper_dataset_integrator import ScrapperDatasetIntegrator
 from data_scraper.scrapper_serviceimpl import ScrapperServiceImpl
 from error.expectionhandler import ExpectionHandler
 from error.errortypes import ErrorType
+from jobs.jobs_controller import runner
 from permcontrol.permissionscontrol import require_perm
 from user.role import Role
 
 router = APIRouter()
 config = ConfigLoader("config.json").get_scrapper_config("reddit")
 service = ScrapperServiceImpl(config)
+_integrator: Optional[ScrapperDatasetIntegrator] = None
+
+
+def get_integrator() -> ScrapperDatasetIntegrator:
+    global _integrator
+    if _integrator is None:
+        _integrator = ScrapperDatasetIntegrator("config.json")
+    return _integrator
+
+
+def integrate_scraped(
+        data: List[dict],
+        query: str,
+        auto_dataset: bool = True,
+        dataset_id: Optional[str] = None,
+        label: Optional[str] = None,
+        entry_type: Optional[str] = "MANUAL",
+        template_id: Optional[str] = None,
+        values: Optional[str] = None,
+) -> dict:
+    if not dataset_id:
+        raise ValueError("dataset_id is required when auto_dataset=True")
+
+    from dataset_builder.entrytype import EntryType
+    selected_type = EntryType((entry_type or "MANUAL").upper())
+
+    parsed_values = None
+    if values:
+        try:
+            parsed_values = json.loads(values)
+        except Exception:
+            raise ValueError("Invalid JSON in 'values'")
+
+    final_label = label or f"REDDIT_{query.upper().replace(' ', '_')}"
+
+    added_entries = get_integrator().integrate(
+        dataset_id=dataset_id,
+        scrapped_data=data,
+        entry_type=selected_type,
+        label=final_label,
+        template_id=template_id,
+        values=parsed_values
+    )
+
+    return {
+        "status": "success",
+        "auto_dataset": True,
+        "dataset_id": dataset_id,
+        "entry_type": selected_type,
+        "label_used": final_label,
+        "added_count": len(added_entries),
+        "entries": added_entries
+    }
 
 
 @router.get(
@@ -30,57 +85,37 @@ async def scrape_reddit(
         entry_type: Optional[str] = Query("MANUAL"),
         template_id: Optional[str] = Query(None),
         values: Optional[str] = Query(None),
+        incremental: bool = Query(False),
+        background: bool = Query(False),
 ):
     try:
-        data = service.scrape_reddit(query=query, limit=limit, subreddits=subreddits)
+        if auto_dataset and not dataset_id:
+            raise ExpectionHandler(
+                message="dataset_id is required when auto_dataset=True",
+                error_type=ErrorType.VALIDATION_ERROR
+            )
+
+        if background:
+            job = runner.submit("scrape_reddit", {
+                "query": query, "limit": limit, "subreddits": subreddits, "incremental": incremental,
+                "auto_dataset": auto_dataset, "dataset_id": dataset_id, "label": label,
+                "entry_type": entry_type, "template_id": template_id, "values": values
+            })
+            return {"status": "queued", "job_id": job["id"]}
+
+        data = await service.scrape_reddit_async(
+            query=query, limit=limit, subreddits=subreddits, incremental=incremental
+        )
 
         if auto_dataset:
-            if not dataset_id:
-                raise ExpectionHandler(
-                    message="dataset_id is required when auto_dataset=True",
-                    error_type=ErrorType.VALIDATION_ERROR
-                )
-
-            data = data[:limit]
-
-            integrator = ScrapperDatasetIntegrator("config.json")
-
-            from dataset_builder.entrytype import EntryType
-            selected_type = EntryType(entry_type.upper())
-
-            parsed_values = None
-            if values:
-                try:
-                    parsed_values = json.loads(values)
-                except Exception:
-                    raise ExpectionHandler(
-                        message="Invalid JSON in 'values'",
-                        error_type=ErrorType.VALIDATION_ERROR
-                    )
-
-            final_label = label or f"REDDIT_{query.upper().replace(' ', '_')}"
-
-            added_entries = integrator.integrate(
-                dataset_id=dataset_id,
-                scrapped_data=data,
-                entry_type=selected_type,
-                label=final_label,
-                template_id=template_id,
-                values=parsed_values
+            return await run_in_threadpool(
+                integrate_scraped, data[:limit], query, dataset_id=dataset_id, label=label, entry_type=entry_type,
+                template_id=template_id, values=values
             )
 
-            return {
-                "status": "success",
-                "auto_dataset": True,
-                "dataset_id": dataset_id,
-                "entry_type": selected_type,
-                "label_used": final_label,
-                "added_count": len(added_entries),
-                "entries": added_entries
-            }
-
         return {
             "status": "success",
+            "incremental": incremental,
             "count": len(data),
             "data": data
         }
@@ -93,3 +128,26 @@ async def scrape_reddit(
             error_type=ErrorType.VALIDATION_ERROR,
             detail=str(e)
         )
+
+
+@router.get(
+    "/reddit/state",
+    dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))]
+)
+def get_reddit_crawl_state(
+        query: str = Query(...),
+        subreddit: Optional[str] = Query(None),
+):
+    return {"query": query, "states": service.get_crawl_state(query, subreddit)}
+
+
+@router.delete(
+    "/reddit/state",
+    dependencies=[Depends(require_perm([Role.ADMIN]))]
+)
+def reset_reddit_crawl_state(
+        query: str = Query(...),
+        subreddit: Optional[str] = Query(None),
+):
+    deleted = service.reset_crawl_state(query, subreddit)
+    return {"status": "success", "query": query, "reset_count": deleted}
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pymongo import MongoClient, ASCENDING
+from config_loader import ConfigLoader
+
+MAX_SEEN_IDS = 500
+
+
+class CrawlStateStore:
+    def __init__(self, config_file: str = "config.json", platform: str = "reddit", max_seen_ids: int = MAX_SEEN_IDS):
+        cfg = ConfigLoader(config_file).get_database_config()
+        uri = f"mongodb://{cfg['username']}:{cfg['password']}@{cfg['host']}:{cfg['port']}/{cfg['authSource']}"
+
+        self.client = MongoClient(uri)
+        self.db = self.client[cfg["name"]]
+        self.collection = self.db["scrape_crawl_state"]
+        self.collection.create_index(
+            [("platform", ASCENDING), ("query", ASCENDING), ("subreddit", ASCENDING)],
+            unique=True
+        )
+        self.platform = platform
+        self.max_seen_ids = max_seen_ids
+
+    def _key(self, query: str, subreddit: str) -> dict:
+        return {"platform": self.platform, "query": query.strip().lower(), "subreddit": subreddit.lower()}
+
+    def load(self, query: str, subreddits: List[str]) -> Dict[str, dict]:
+        key = self._key(query, "")
+        cursor = self.collection.find(
+            {
+                "platform": key["platform"],
+                "query": key["query"],
+                "subreddit": {"$in": [s.lower() for s in subreddits]}
+            },
+            {"_id": 0, "subreddit": 1, "seen_ids": 1, "pending_ids": 1, "resume_after": 1}
+        )
+        states = {doc["subreddit"]: doc for doc in cursor}
+        return {
+            s: {
+                "seen_ids": set(states.get(s.lower(), {}).get("seen_ids", [])),
+                "pending_ids": states.get(s.lower(), {}).get("pending_ids", []),
+                "resume_after": states.get(s.lower(), {}).get("resume_after"),
+            }
+            for s in subreddits
+        }
+
+    def record(self, query: str, subreddit: str, new_ids: List[str], complete: bool = True,
+               pending_ids: Optional[List[str]] = None):
+        # new_ids are newest first. seen_ids (the stop boundary) only moves once a crawl reaches it;
+        # until then the newest ids wait in pending_ids and the next run resumes after the oldest fetched id.
+        pending_ids = pending_ids or []
+        update = {
+            "$set": {"last_run_at": datetime.utcnow()},
+            "$inc": {"runs": 1, "total_new": len(new_ids)}
+        }
+        if complete:
+            boundary = pending_ids + new_ids
+            if boundary:
+                update["$set"]["newest_id"] = boundary[0]
+                update["$push"] = {"seen_ids": {"$each": boundary, "$position": 0, "$slice": self.max_seen_ids}}
+            update["$unset"] = {"pending_ids": "", "resume_after": ""}
+        elif new_ids:
+            if not pending_ids:
+                update["$set"]["pending_ids"] = new_ids[:self.max_seen_ids]
+            update["$set"]["resume_after"] = new_ids[-1]
+        self.collection.update_one(self._key(query, subreddit), update, upsert=True)
+
+    def get_state(self, query: str, subreddit: Optional[str] = None) -> List[dict]:
+        key = self._key(query, subreddit or "")
+        flt = {"platform": key["platform"], "query": key["query"]}
+        if subreddit:
+            flt["subreddit"] = key["subreddit"]
+        return list(self.collection.find(flt, {"_id": 0, "seen_ids": 0, "pending_ids": 0}))
+
+    def reset(self, query: str, subreddit: Optional[str] = None) -> int:
+        key = self._key(query, subreddit or "")
+        flt = {"platform": key["platform"], "query": key["query"]}
+        if subreddit:
+            flt["subreddit"] = key["subreddit"]
+        return self.collection.delete_many(flt).deleted_count
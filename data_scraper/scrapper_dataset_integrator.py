@@ -1,8 +1,45 @@
 # -*- coding: utf-8 -*-
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from dataset_builder.dataset_builder_serviceimpl import DatasetBuilderServiceImpl
 from dataset_builder.entrytype import EntryType
-from template.utils.extract_placeholders import extract_placeholders
+from template.utils.templategenerator import TemplateGenerator
+from utility.ahocorasick import AhoCorasick
+
+
+class PlaceholderMatcher:
+    def __init__(self, placeholders: List[str], user_values: Dict[str, List[str]], word_boundary: bool = True):
+        self.placeholders = list(dict.fromkeys(placeholders))
+        self.valid = all(ph in user_values for ph in self.placeholders)
+
+        pattern_ids: Dict[str, int] = {}
+        self._payloads: List[List[Tuple[str, int, str]]] = []
+        for ph in self.placeholders if self.valid else []:
+            possible_values = user_values[ph]
+            if isinstance(possible_values, str):
+                possible_values = [possible_values]
+            for priority, value in enumerate(v for v in possible_values if v):
+                key = value.lower()
+                if key not in pattern_ids:
+                    pattern_ids[key] = len(self._payloads)
+                    self._payloads.append([])
+                self._payloads[pattern_ids[key]].append((ph, priority, value))
+
+        self.automaton = AhoCorasick(pattern_ids, word_boundary=word_boundary)
+
+    def match(self, text: str) -> Optional[Dict[str, str]]:
+        if not self.valid:
+            return None
+
+        best: Dict[str, Tuple[int, str]] = {}
+        for _, _, index in self.automaton.iter_matches(text):
+            for ph, priority, value in self._payloads[index]:
+                current = best.get(ph)
+                if current is None or priority < current[0]:
+                    best[ph] = (priority, value)
+
+        if len(best) < len(self.placeholders):
+            return None
+        return {ph: best[ph][1] for ph in self.placeholders}
 
 
 class ScrapperDatasetIntegrator:
@@ -22,83 +59,53 @@ class ScrapperDatasetIntegrator:
         if not scrapped_data:
             return []
 
-        added_entries = []
-
         if entry_type == EntryType.MANUAL:
-            for post in scrapped_data:
-                entry = self.dataset_service.add_entry(
-                    dataset_id=dataset_id,
-                    text=post.get("text", ""),
-                    label=label or "SCRAPPED_MANUAL",
-                    entry_type=EntryType.MANUAL
-                )
-                if entry:
-                    added_entries.append(entry.to_dict())
+            rows = [
+                {
+                    "text": post.get("text", ""),
+                    "label": label or "SCRAPPED_MANUAL",
+                    "entry_type": EntryType.MANUAL.value
+                }
+                for post in scrapped_data
+                if post.get("text")
+            ]
 
         elif entry_type == EntryType.TEMPLATE:
-            for post in scrapped_data:
+            if not template_id:
+                raise ValueError("template_id is required for TEMPLATE entry type")
+
+            template = self.dataset_service.template_service.get_template(template_id)
+            if not template:
+                return []
+
+            generator = TemplateGenerator(template.pattern)
+            matcher = PlaceholderMatcher(generator.extract_placeholders(), values or {})
+            if not matcher.valid:
+                return []
 
+            rows = []
+            for post in scrapped_data:
                 scraped_text = post.get("text", "")
                 if not scraped_text:
                     continue
 
-                template = self.dataset_service.template_service.get_template(template_id)
-                pattern = template.pattern
-
-                placeholders = extract_placeholders(pattern)
-
-                user_values = values or {}
-
-                matched_values = {}
-
-                for ph in placeholders:
-
-                    if ph in user_values:
-
-                        possible_values = user_values[ph]
-
-                        if isinstance(possible_values, list):
-                            matched = None
-                            for v in possible_values:
-                                if v.lower() in scraped_text.lower():
-                                    matched = v
-                                    break
-
-                            if matched:
-                                matched_values[ph] = matched
-                            else:
-                                matched_values = None
-                                break
-                        else:
-                            if possible_values.lower() in scraped_text.lower():
-                                matched_values[ph] = possible_values
-                            else:
-                                matched_values = None
-                                break
-
-                    else:
-                        matched_values = None
-                        break
-
+                matched_values = matcher.match(scraped_text)
                 if matched_values is None:
                     continue
 
-                entry = self.dataset_service.add_entry(
-                    dataset_id=dataset_id,
-                    text=scraped_text,
-                    label=label or "SCRAPPED_TEMPLATE",
-                    entry_type=EntryType.TEMPLATE,
-                    template_id=template_id,
-                    values=matched_values
-                )
-
-                if entry:
-                    if isinstance(entry, list):
-                        for e in entry:
-                            added_entries.append(e.to_dict())
-                    else:
-                        added_entries.append(entry.to_dict())
+                rows.append({
+                    "text": generator.render(matched_values),
+                    "label": label or "SCRAPPED_TEMPLATE",
+                    "entry_type": EntryType.TEMPLATE.value,
+                    "template_id": template_id,
+                    "values": matched_values
+                })
 
+        else:
+            return []
 
+        if not rows:
+            return []
 
-        return added_entries
+        added = self.dataset_service.add_entries_bulk(dataset_id, rows)
+        return [entry.to_dict() for entry in added]
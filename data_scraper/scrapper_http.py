@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import random
+import time
+import weakref
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _LoopState:
+    def __init__(self, pool: "AsyncHttpPool"):
+        self.client = httpx.AsyncClient(
+            headers=pool.headers,
+            timeout=pool.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=pool.max_connections,
+                max_keepalive_connections=pool.max_connections
+            )
+        )
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.buckets: Dict[str, TokenBucket] = {}
+
+
+class AsyncHttpPool:
+    def __init__(
+            self,
+            headers: Optional[dict] = None,
+            timeout: float = 10.0,
+            max_connections: int = 20,
+            per_host_concurrency: int = 4,
+            requests_per_second: float = 2.0,
+            burst: int = 4,
+            max_retries: int = 3,
+            backoff_base: float = 0.5,
+            backoff_max: float = 30.0
+    ):
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.per_host_concurrency = per_host_concurrency
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState(self)
+        return state
+
+    async def get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None) -> httpx.Response:
+        state = self._state()
+        host = urlsplit(url).netloc
+        semaphore = state.semaphores.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        bucket = state.buckets.setdefault(host, TokenBucket(self.requests_per_second, self.burst))
+
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            try:
+                async with semaphore:
+                    response = await state.client.get(url, params=params, headers=headers)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                retry_after = self._retry_after(response)
+                if retry_after is not None:
+                    await asyncio.sleep(min(retry_after, self.backoff_max))
+                    attempt += 1
+                    continue
+
+            await asyncio.sleep(min(self.backoff_base * (2 ** attempt), self.backoff_max) * random.uniform(0.5, 1.5))
+            attempt += 1
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        value = response.headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            return None
+
+    async def aclose(self):
+        try:
+            state = self._states.pop(asyncio.get_running_loop(), None)
+        except RuntimeError:
+            return
+        if state is not None:
+            await state.client.aclose()
+
+    def run(self, coro):
+        # Sync callers get a fresh loop per asyncio.run, so close that loop's client before it goes away.
+        async def runner():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+        return asyncio.run(runner())
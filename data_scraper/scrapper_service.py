@@ -1,8 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class ScrapperService(ABC):
     @abstractmethod
-    def scrape_reddit(self, query: str, limit: int, subreddits: List[str]) -> List[Dict[str, str]]:
+    def scrape_reddit(self, query: str, limit: int, subreddits: List[str], incremental: bool = False) -> List[Dict[str, str]]:
         pass
 
+    @abstractmethod
+    async def scrape_reddit_async(self, query: str, limit: int, subreddits: List[str], incremental: bool = False) -> List[Dict[str, str]]:
+        pass
+
+    @abstractmethod
+    def get_crawl_state(self, query: str, subreddit: Optional[str] = None) -> List[dict]:
+        pass
+
+    @abstractmethod
+    def reset_crawl_state(self, query: str, subreddit: Optional[str] = None) -> int:
+        pass
@@ -1,22 +1,47 @@
 # -*- coding: utf-8 -*-
-from typing import List, Dict
+from typing import List, Dict, Optional
 import time
 
+from data_scraper.scrapper_crawlstate import CrawlStateStore
 from data_scraper.scrapper_logging import ScrapeLogger
 from data_scraper.scrapper_service import ScrapperService
-from data_scraper.sites.reddit_scrapper import RedditScrapper
+from data_scraper.sites.reddit_scrapper import RedditScrapper, DEFAULT_BASE_URL, DEFAULT_MAX_PAGES, DEFAULT_PAGE_TTL
 from data_scraper.scrapper_cache import ScrapperCache
 
 
 class ScrapperServiceImpl(ScrapperService):
-    def __init__(self, reddit_config: dict):
+    def __init__(self, reddit_config: dict, config_file: str = "config.json"):
+        cache_cfg = dict(reddit_config.get("cache", {}))
+        page_ttl = cache_cfg.pop("page_ttl", DEFAULT_PAGE_TTL)
+        self.cache = ScrapperCache(**cache_cfg)
         self.reddit_scrapper = RedditScrapper(
-            user_agent=reddit_config["user_agent"]
+            user_agent=reddit_config["user_agent"],
+            base_url=reddit_config.get("base_url", DEFAULT_BASE_URL),
+            http=reddit_config.get("http", {}),
+            max_pages=reddit_config.get("max_pages", DEFAULT_MAX_PAGES),
+            page_cache=self.cache,
+            page_ttl=page_ttl
         )
-        self.cache = ScrapperCache(ttl=3600)
         self.logger = ScrapeLogger()
+        self.config_file = config_file
+        self._crawl_state: Optional[CrawlStateStore] = None
+
+    @property
+    def crawl_state(self) -> CrawlStateStore:
+        if self._crawl_state is None:
+            self._crawl_state = CrawlStateStore(self.config_file, platform="reddit")
+        return self._crawl_state
+
+    def scrape_reddit(self, query: str, limit: int = 50, subreddits: List[str] = None,
+                      incremental: bool = False) -> List[Dict[str, str]]:
+        return self.reddit_scrapper.http.run(self.scrape_reddit_async(query=query, limit=limit, subreddits=subreddits,
+                                                                      incremental=incremental))
+
+    async def scrape_reddit_async(self, query: str, limit: int = 50, subreddits: List[str] = None,
+                                  incremental: bool = False) -> List[Dict[str, str]]:
+        if incremental:
+            return await self._scrape_reddit_incremental(query, limit, subreddits or ["all"])
 
-    def scrape_reddit(self, query: str, limit: int = 50, subreddits: List[str] = None) -> List[Dict[str, str]]:
         start_time = time.time()
 
         cached = self.cache.get(query, limit, subreddits)
@@ -31,7 +56,7 @@ class ScrapperServiceImpl(ScrapperService):
             return cached
 
         try:
-            data = self.reddit_scrapper.fetch(query=query, limit=limit, subreddits=subreddits)
+            data = await self.reddit_scrapper.fetch_async(query=query, limit=limit, subreddits=subreddits)
             duration = round(time.time() - start_time, 2)
             self.logger.log_success(query, "reddit", len(data), duration)
 
@@ -41,3 +66,39 @@ class ScrapperServiceImpl(ScrapperService):
         except Exception as e:
             self.logger.log_error(query, "reddit", str(e))
             raise
+
+    async def _scrape_reddit_incremental(self, query: str, limit: int, subreddits: List[str]) -> List[Dict[str, str]]:
+        start_time = time.time()
+        try:
+            cursors = self.crawl_state.load(query, subreddits)
+            results = await self.reddit_scrapper.fetch_new_async(
+                query=query, limit=limit, subreddits=subreddits,
+                stop_ids={s: c["seen_ids"] for s, c in cursors.items()},
+                resume_after={s: c["resume_after"] for s, c in cursors.items()}
+            )
+
+            data = []
+            for subreddit, (posts, complete) in results.items():
+                self.crawl_state.record(query, subreddit, [p["id"] for p in posts], complete,
+                                        cursors[subreddit]["pending_ids"])
+                data.extend(posts)
+
+            duration = round(time.time() - start_time, 2)
+            self.logger.log({
+                "status": "success",
+                "platform": "reddit",
+                "query": query,
+                "result_count": len(data),
+                "duration_sec": duration,
+                "mode": "incremental"
+            })
+            return data
+        except Exception as e:
+            self.logger.log_error(query, "reddit", str(e))
+            raise
+
+    def get_crawl_state(self, query: str, subreddit: Optional[str] = None) -> List[dict]:
+        return self.crawl_state.get_state(query, subreddit)
+
+    def reset_crawl_state(self, query: str, subreddit: Optional[str] = None) -> int:
+        return self.crawl_state.reset(query, subreddit)
@@ -1,19 +1,33 @@
 # -*- coding: utf-8 -*-
-import time
-import requests
+import asyncio
+import hashlib
 from bs4 import BeautifulSoup
-from typing import List, Dict
+from typing import List, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
 
+from data_scraper.scrapper_cache import ScrapperCache
+from data_scraper.scrapper_http import AsyncHttpPool
 from data_scraper.scrapperbase import ScrapperBase
 
+DEFAULT_BASE_URL = "https://old.reddit.com"
+DEFAULT_MAX_PAGES = 40
+DEFAULT_PAGE_TTL = 300
+
 
 class RedditScrapper(ScrapperBase):
-    def __init__(self, user_agent: str):
+    def __init__(self, user_agent: str, base_url: str = DEFAULT_BASE_URL, http: dict = None,
+                 max_pages: int = DEFAULT_MAX_PAGES, page_cache: Optional[ScrapperCache] = None,
+                 page_ttl: int = DEFAULT_PAGE_TTL):
         super().__init__("reddit")
 
         self.headers = {
             "User-Agent": user_agent
         }
+        self.base_url = base_url.rstrip("/")
+        self.max_pages = max_pages
+        self.page_cache = page_cache
+        self.page_ttl = page_ttl
+        self.http = AsyncHttpPool(headers=self.headers, **(http or {}))
 
     def clean_reddit_text(self, text: str) -> str:
         import re, html, unicodedata
@@ -38,63 +52,143 @@ class RedditScrapper(ScrapperBase):
 
         return text.strip()
 
-    def fetch(self, query: str, limit: int = 50, subreddits: List[str] = None) -> List[Dict[str, str]]:
+    def fetch(self, query: str, limit: int = 50, subreddits: List[str] = None,
+              sort: str = "relevance", stop_ids: Dict[str, Set[str]] = None) -> List[Dict[str, str]]:
+        return self.http.run(self.fetch_async(query=query, limit=limit, subreddits=subreddits,
+                                              sort=sort, stop_ids=stop_ids))
+
+    async def fetch_async(self, query: str, limit: int = 50, subreddits: List[str] = None,
+                          sort: str = "relevance", stop_ids: Dict[str, Set[str]] = None) -> List[Dict[str, str]]:
         if not subreddits:
             subreddits = ["all"]
-
-        results = []
-
-        for subreddit_name in subreddits:
-
-            search_url = (
-                f"https://old.reddit.com/r/{subreddit_name}/search/"
-                f"?q={query}&restrict_sr=1&sort=relevance"
-            )
-
-            print("[INFO] Scraping:", search_url)
+        stop_ids = stop_ids or {}
+
+        batches = await asyncio.gather(*(
+            self._fetch_subreddit(query, limit, subreddit_name, sort, stop_ids.get(subreddit_name))
+            for subreddit_name in subreddits
+        ))
+        return [post for batch, _ in batches for post in batch]
+
+    async def fetch_new_async(self, query: str, limit: int, subreddits: List[str],
+                              stop_ids: Dict[str, Set[str]],
+                              resume_after: Dict[str, Optional[str]]) -> Dict[str, Tuple[List[Dict[str, str]], bool]]:
+        # complete=False means the limit or an error stopped the crawl before a known post or the end of the listing.
+        batches = await asyncio.gather(*(
+            self._fetch_subreddit(query, limit, subreddit_name, "new", stop_ids.get(subreddit_name),
+                                  resume_after.get(subreddit_name))
+            for subreddit_name in subreddits
+        ))
+        return dict(zip(subreddits, batches))
+
+    async def _fetch_subreddit(self, query: str, limit: int, subreddit_name: str, sort: str,
+                               stop_ids: Optional[Set[str]] = None,
+                               start_after: Optional[str] = None) -> Tuple[List[Dict[str, str]], bool]:
+        search_url = f"{self.base_url}/r/{subreddit_name}/search/"
+        results: List[Dict[str, str]] = []
+        seen: Set[str] = set()
+        after = start_after
+
+        for page in range(self.max_pages):
+            params = {"q": query, "restrict_sr": 1, "sort": sort}
+            if after:
+                params["after"] = after
+                params["count"] = len(results)
+
+            print("[INFO] Scraping:", search_url, params)
 
             try:
-                response = requests.get(search_url, headers=self.headers, timeout=10)
-                soup = BeautifulSoup(response.text, "html.parser")
-
-                posts = soup.select("div.search-result")
-                count = 0
-
-                for post in posts:
-                    if count >= limit:
-                        break
-
-                    title_tag = post.select_one("a.search-title")
-                    if not title_tag:
-                        continue
-
-                    title = title_tag.text.strip()
-                    url = title_tag["href"]
-
-                    snippet_tag = post.select_one("div.search-result-meta")
-                    snippet = snippet_tag.text.strip() if snippet_tag else ""
-
-                    raw = f"{title}\n{snippet}"
-
-                    base_clean = self.clean_text(raw)
-                    clean_text = self.clean_reddit_text(base_clean)
-
-
-                    results.append({
-                        "source": "reddit",
-                        "subreddit": subreddit_name,
-                        "title": title,
-                        "text": clean_text,
-                        "url": url,
-                        "score": None,
-                        "num_comments": None,
-                        "created_utc": None
-                    })
-
-                    count += 1
-                    time.sleep(0.2)
-
+                body = await self._get_page(search_url, params, revalidate=sort == "new")
             except Exception as e:
-                print(f"[ERROR] Failed to scrape r/{subreddit_name}: {e}")
+                print(f"[ERROR] Failed to scrape r/{subreddit_name} (page {page + 1}): {e}")
+                break
+
+            posts, after = self.parse_search_page(body, subreddit_name)
+            reached_known = False
+            for post in posts:
+                if stop_ids and post["id"] in stop_ids:
+                    reached_known = True
+                    break
+                if post["id"] in seen:
+                    continue
+                seen.add(post["id"])
+                results.append(post)
+                if len(results) >= limit:
+                    return results, False
+
+            if reached_known or not after or not posts:
+                return results, True
+
+        return results, False
+
+    async def _get_page(self, url: str, params: dict, revalidate: bool = False) -> str:
+        if self.page_cache is None:
+            response = await self.http.get(url, params=params)
+            response.raise_for_status()
+            return response.text
+
+        raw_key = f"{url}?{urlencode(sorted(params.items()))}"
+        key = "page:" + hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+        entry = self.page_cache.get_entry(key)
+        if entry is not None and entry.fresh and not revalidate:
+            return entry.value
+
+        response = await self.http.get(url, params=params, headers=entry.validators if entry else None)
+        if response.status_code == 304 and entry is not None:
+            self.page_cache.touch(key, self.page_ttl)
+            return entry.value
+
+        response.raise_for_status()
+        self.page_cache.put(
+            key,
+            response.text,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            ttl=self.page_ttl
+        )
+        return response.text
+
+    def parse_search_page(self, page: str, subreddit_name: str) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        soup = BeautifulSoup(page, "html.parser")
+        results = []
 
-        return results
+        for post in soup.select("div.search-result"):
+            title_tag = post.select_one("a.search-title")
+            if not title_tag:
+                continue
+
+            title = title_tag.text.strip()
+            url = title_tag["href"]
+            post_id = post.get("data-fullname") or url
+
+            snippet_tag = post.select_one("div.search-result-meta")
+            snippet = snippet_tag.text.strip() if snippet_tag else ""
+
+            raw = f"{title}\n{snippet}"
+
+            base_clean = self.clean_text(raw)
+            clean_text = self.clean_reddit_text(base_clean)
+
+            results.append({
+                "id": post_id,
+                "source": "reddit",
+                "subreddit": subreddit_name,
+                "title": title,
+                "text": clean_text,
+                "url": url,
+                "score": None,
+                "num_comments": None,
+                "created_utc": None
+            })
+
+        return results, self._next_cursor(soup)
+
+    @staticmethod
+    def _next_cursor(soup: BeautifulSoup) -> Optional[str]:
+        for link in soup.select("span.nextprev a, .nav-buttons a"):
+            rel = link.get("rel") or []
+            if "next" not in rel and "next" not in link.text.lower():
+                continue
+            after = parse_qs(urlsplit(link.get("href", "")).query).get("after")
+            if after:
+                return after[0]
+        return None
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
+import hashlib
 import uuid
 from typing import Optional, List, Dict
 
@@ -8,6 +9,8 @@ from bson import ObjectId
 from dataset_builder.datasettype import DatasetType
 from dataset_builder.entrytype import EntryType
 
+MAX_INDEXED_TRIGRAMS = 128
+
 
 @dataclass
 class DatasetEntry:
@@ -31,16 +34,63 @@ class DatasetEntry:
             entry_type=entry_type
         )
 
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        return (text or "").strip().lower()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha1(DatasetEntry.normalize_text(text).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def trigrams(text_norm: str) -> List[str]:
+        return sorted({text_norm[i:i + 3] for i in range(len(text_norm) - 2)})
+
+    @staticmethod
+    def search_fields(text: str, label: str) -> dict:
+        text_norm = DatasetEntry.normalize_text(text)
+        fields = {
+            "text_norm": text_norm,
+            "label_norm": (label or "").lower(),
+        }
+        grams = DatasetEntry.trigrams(text_norm)
+        # Long texts would add hundreds of multikey index entries each; they are flagged and matched by regex only.
+        if len(grams) > MAX_INDEXED_TRIGRAMS:
+            fields["ngrams_capped"] = True
+        else:
+            fields["ngrams"] = grams
+        return fields
+
+    @staticmethod
+    def from_document(doc: dict) -> "DatasetEntry":
+        return DatasetEntry(
+            id=uuid.UUID(doc["id"]),
+            text=doc["text"],
+            label=doc["label"],
+            entry_type=EntryType(doc["entry_type"]) if doc.get("entry_type") else None,
+            template_id=doc.get("template_id"),
+            values=doc.get("values"),
+            created_at=datetime.fromisoformat(doc["created_at"]) if doc.get("created_at") else datetime.utcnow()
+        )
+
     def to_dict(self) -> dict:
         return {
             "id": str(self.id),
             "text": self.text,
             "label": self.label,
+            "entry_type": EntryType(self.entry_type).value if self.entry_type else None,
             "template_id": self.template_id,
             "values": self.values,
             "created_at": self.created_at.isoformat()
         }
 
+    def to_document(self, dataset_id: str) -> dict:
+        doc = self.to_dict()
+        doc["dataset_id"] = dataset_id
+        doc["text_hash"] = self.hash_text(self.text)
+        doc.update(self.search_fields(self.text, self.label))
+        return doc
+
 
 @dataclass
 class DatasetBuilder:
@@ -51,6 +101,9 @@ class DatasetBuilder:
     created_at: datetime
     updated_at: datetime
     entries: List[DatasetEntry] = field(default_factory=list)
+    entry_count: int = 0
+    last_merge: Optional[dict] = None
+    stats: Optional[dict] = None
     _id: str = field(default_factory=lambda: str(ObjectId()))
 
     @staticmethod
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 
 from dataset_builder.dataset_builder_serviceimpl import DatasetBuilderServiceImpl
 from dataset_builder.entrytype import EntryType
 from dataset_builder.create.create import DatasetCreate
 from dataset_builder.response.response import DatasetResponse
+from dataset_builder.utils.exportstreams import EXPORT_MEDIA_TYPES
 from error.errortypes import ErrorType
 from error.expectionhandler import ExpectionHandler
+from jobs.jobs_controller import runner
 from permcontrol.permissionscontrol import require_perm
 from user.role import Role
 
@@ -54,6 +57,22 @@ async def list_datasets():
         )
 
 
+@router.get(
+    "/summary",
+    response_model=List[dict],
+    dependencies=[Depends(require_perm([Role.DEVELOPER, Role.ADMIN]))]
+)
+async def list_dataset_summaries():
+    try:
+        return service.list_dataset_summaries()
+    except Exception as e:
+        raise ExpectionHandler(
+            message="Error while listing dataset summaries.",
+            error_type=ErrorType.DATABASE_ERROR,
+            detail=str(e)
+        )
+
+
 @router.get(
     "/{dataset_id}",
     response_model=DatasetResponse,
@@ -89,7 +108,10 @@ async def add_entry(
         label: Optional[str] = None,
         entry_type: EntryType = EntryType.MANUAL,
         template_id: Optional[str] = None,
-        values: Optional[dict] = None
+        values: Optional[dict] = None,
+        sample_size: Optional[int] = Query(None, ge=1),
+        stratify: bool = False,
+        seed: Optional[int] = None
 ):
     try:
         entry = service.add_entry(
@@ -98,7 +120,10 @@ async def add_entry(
             label=label,
             entry_type=entry_type,
             template_id=template_id,
-            values=values
+            values=values,
+            sample_size=sample_size,
+            stratify=stratify,
+            seed=seed
         )
 
         if not entry:
@@ -107,17 +132,26 @@ async def add_entry(
                 error_type=ErrorType.NOT_FOUND
             )
 
-        if isinstance(entry, list):
+        if isinstance(entry, dict):
             return {
                 "status": "success",
-                "count": len(entry),
-                "entries": [e.to_dict() for e in entry]
+                "count": entry["inserted"],
+                "total_combinations": entry["total_combinations"],
+                "requested": entry["requested"],
+                "chunks": entry["chunks"],
+                "sample_entries": [e.to_dict() for e in entry["sample_entries"]]
             }
 
         return entry.to_dict()
 
     except ExpectionHandler:
         raise
+    except ValueError as e:
+        raise ExpectionHandler(
+            message="Invalid template expansion request.",
+            error_type=ErrorType.VALIDATION_ERROR,
+            detail=str(e)
+        )
     except Exception as e:
         raise ExpectionHandler(
             message="Failed to add entry to dataset.",
@@ -126,6 +160,43 @@ async def add_entry(
         )
 
 
+@router.get(
+    "/{dataset_id}/entries",
+    response_model=dict,
+    dependencies=[Depends(require_perm([Role.DEVELOPER, Role.ADMIN]))]
+)
+async def list_entries(
+        dataset_id: str,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=1000),
+        label: Optional[str] = None
+):
+    try:
+        ds = service.get_dataset(dataset_id)
+        if not ds:
+            raise ExpectionHandler(
+                message=f"Dataset with ID '{dataset_id}' not found.",
+                error_type=ErrorType.NOT_FOUND
+            )
+
+        entries = service.get_entries(dataset_id, skip=skip, limit=limit, label=label)
+        return {
+            "total": service.count_entries(dataset_id, label=label),
+            "skip": skip,
+            "limit": limit,
+            "entries": [e.to_dict() for e in entries]
+        }
+
+    except ExpectionHandler:
+        raise
+    except Exception as e:
+        raise ExpectionHandler(
+            message="Failed to list dataset entries.",
+            error_type=ErrorType.DATABASE_ERROR,
+            detail=str(e)
+        )
+
+
 @router.delete(
     "/{dataset_id}/entries/{entry_id}",
     response_model=dict,
@@ -140,21 +211,13 @@ async def remove_entry(dataset_id: str, entry_id: str):
                 error_type=ErrorType.NOT_FOUND
             )
 
-        ok = ds.remove_entry(entry_id)
+        ok = service.remove_entry(dataset_id, entry_id)
         if not ok:
             raise ExpectionHandler(
                 message=f"Entry with ID '{entry_id}' not found.",
                 error_type=ErrorType.NOT_FOUND
             )
 
-        service.collection.update_one(
-            {"id": dataset_id},
-            {"$set": {
-                "entries": [e.to_dict() for e in ds.entries],
-                "updated_at": ds.updated_at.isoformat()
-            }}
-        )
-
         return {
             "status": "success",
             "message": f"Entry {entry_id} removed successfully."
@@ -170,6 +233,30 @@ async def remove_entry(dataset_id: str, entry_id: str):
         )
 
 
+@router.post(
+    "/{dataset_id}/stats/recompute",
+    response_model=dict,
+    dependencies=[Depends(require_perm([Role.DEVELOPER, Role.ADMIN]))]
+)
+async def recompute_stats(dataset_id: str):
+    try:
+        stats = service.recompute_stats(dataset_id)
+        if stats is None:
+            raise ExpectionHandler(
+                message=f"Dataset with ID '{dataset_id}' not found.",
+                error_type=ErrorType.NOT_FOUND
+            )
+        return stats
+    except ExpectionHandler:
+        raise
+    except Exception as e:
+        raise ExpectionHandler(
+            message="Failed to recompute dataset statistics.",
+            error_type=ErrorType.DATABASE_ERROR,
+            detail=str(e)
+        )
+
+
 @router.delete(
     "/{dataset_id}",
     response_model=dict,
@@ -198,29 +285,43 @@ async def delete_dataset(dataset_id: str):
     "/{dataset_id}/export/{export_type}",
     dependencies=[Depends(require_perm([Role.DEVELOPER, Role.ADMIN]))]
 )
-async def export_dataset(dataset_id: str, export_type: str):
+async def export_dataset(dataset_id: str, export_type: str, gzip: bool = False, background: bool = False):
     try:
-        data = service.export_format(dataset_id, export_type)
-        if not data:
+        if background:
+            if export_type.lower().strip() not in EXPORT_MEDIA_TYPES:
+                raise ValueError(f"Unsupported export type: {export_type}")
+            job = runner.submit("dataset_export", {
+                "dataset_id": dataset_id, "export_type": export_type, "compress": gzip
+            })
+            return {"success": True, "status": "queued", "job_id": job["id"]}
+
+        stream = service.stream_export(dataset_id, export_type, compress=gzip)
+        if stream is None:
             raise ExpectionHandler(
                 message=f"Dataset with ID '{dataset_id}' not found.",
                 error_type=ErrorType.NOT_FOUND
             )
 
-        media_types = {
-            "json": "application/json",
-            "csv": "text/csv",
-            "txt": "text/plain"
-        }
+        media_type, extension = EXPORT_MEDIA_TYPES[export_type.lower().strip()]
+        filename = f"{dataset_id}.{extension}"
+        if gzip:
+            media_type = "application/gzip"
+            filename += ".gz"
 
-        return Response(
-            content=data,
-            media_type=media_types.get(export_type.lower(), "application/octet-stream"),
+        return StreamingResponse(
+            stream,
+            media_type=media_type,
             headers={
-                "Content-Disposition": f'attachment; filename="{dataset_id}.{export_type}"'
+                "Content-Disposition": f'attachment; filename="{filename}"'
             }
         )
 
+    except ValueError as e:
+        raise ExpectionHandler(
+            message=f"Cannot export dataset as {export_type}.",
+            error_type=ErrorType.VALIDATION_ERROR,
+            detail=str(e)
+        )
     except ExpectionHandler:
         raise
     except Exception as e:
@@ -266,13 +367,30 @@ async def add_entries_bulk(dataset_id: str, entries: List[dict]):
 
 @router.get(
     "/{dataset_id}/entries/search",
-    response_model=List[dict],
+    response_model=dict,
     dependencies=[Depends(require_perm([Role.DEVELOPER, Role.ADMIN]))]
 )
-async def search_entries(dataset_id: str, query: Optional[str] = None, label: Optional[str] = None):
+async def search_entries(
+        dataset_id: str,
+        query: Optional[str] = None,
+        label: Optional[str] = None,
+        mode: str = "substring",
+        skip: int = Query(0, ge=0),
+        limit: int = Query(50, ge=1, le=1000),
+        facets: bool = True
+):
     try:
-        results = service.search_entries(dataset_id, query=query, label=label)
-        return [e.to_dict() for e in results]
+        results = service.search_entries(
+            dataset_id, query=query, label=label, mode=mode, skip=skip, limit=limit, facets=facets
+        )
+        results["entries"] = [e.to_dict() for e in results["entries"]]
+        return results
+    except ValueError as e:
+        raise ExpectionHandler(
+            message="Invalid search request.",
+            error_type=ErrorType.VALIDATION_ERROR,
+            detail=str(e)
+        )
     except Exception as e:
         raise ExpectionHandler(
             message="Failed to search entries.",
@@ -290,13 +408,14 @@ async def merge_datasets(
         secondary_id: str,
         remove_dupes: bool,
         new_dataset: bool,
-        new_dataset_info: Optional[DatasetCreate] = None
+        new_dataset_info: Optional[DatasetCreate] = None,
+        near_dupes: bool = False
 ):
     try:
-        if new_dataset and new_dataset_info:
-            service.temp_new_dataset_info = new_dataset_info
-
-        merged = service.merge_datasets(primary_id, secondary_id, remove_dupes, new_dataset)
+        merged = service.merge_datasets(
+            primary_id, secondary_id, remove_dupes, new_dataset,
+            near_dupes=near_dupes, new_dataset_info=new_dataset_info
+        )
 
         if not merged:
             raise ExpectionHandler(
@@ -308,6 +427,12 @@ async def merge_datasets(
 
     except ExpectionHandler:
         raise
+    except ValueError as e:
+        raise ExpectionHandler(
+            message="Invalid merge request.",
+            error_type=ErrorType.VALIDATION_ERROR,
+            detail=str(e)
+        )
     except Exception as e:
         raise ExpectionHandler(
             message="Failed to merge datasets.",
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from dataset_builder.dataset_builder import DatasetBuilder, DatasetEntry, DatasetType
 
 
@@ -14,7 +14,20 @@ class DatasetBuilderService(ABC):
         pass
 
     @abstractmethod
-    def remove_entry(self, dataset_id: str, index: int) -> bool:
+    def remove_entry(self, dataset_id: str, entry_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def get_entries(self, dataset_id: str, skip: int = 0, limit: int = 100,
+                    label: Optional[str] = None) -> List[DatasetEntry]:
+        pass
+
+    @abstractmethod
+    def count_entries(self, dataset_id: str, label: Optional[str] = None) -> int:
+        pass
+
+    @abstractmethod
+    def iter_entries(self, dataset_id: str, batch_size: int = 1000) -> Iterator[DatasetEntry]:
         pass
 
     @abstractmethod
@@ -25,6 +38,14 @@ class DatasetBuilderService(ABC):
     def list_datasets(self) -> List[DatasetBuilder]:
         pass
 
+    @abstractmethod
+    def list_dataset_summaries(self) -> List[dict]:
+        pass
+
+    @abstractmethod
+    def recompute_stats(self, dataset_id: str) -> Optional[dict]:
+        pass
+
     @abstractmethod
     def delete_dataset(self, dataset_id: str) -> bool:
         pass
@@ -33,15 +54,21 @@ class DatasetBuilderService(ABC):
     def export_format(self, dataset_id: str, export_type: str) -> Optional[bytes]:
         pass
 
+    @abstractmethod
+    def stream_export(self, dataset_id: str, export_type: str, compress: bool = False) -> Optional[Iterator[bytes]]:
+        pass
+
     @abstractmethod
     def add_entries_bulk(self, dataset_id: str, entries: List[dict]) -> List[DatasetEntry]:
         pass
 
     @abstractmethod
     def search_entries(self, dataset_id: str, query: Optional[str] = None,
-                       label: Optional[str] = None) -> List[DatasetEntry]:
+                       label: Optional[str] = None, mode: str = "substring",
+                       skip: int = 0, limit: int = 50, facets: bool = True) -> dict:
         pass
 
     @abstractmethod
-    def merge_datasets(self, primary_id: str, secondary_id: str, remove_dupes: bool,new_dataset: bool) -> Optional[DatasetBuilder]:
+    def merge_datasets(self, primary_id: str, secondary_id: str, remove_dupes: bool, new_dataset: bool,
+                       near_dupes: bool = False, new_dataset_info=None) -> Optional[DatasetBuilder]:
         pass
@@ -1,33 +1,70 @@
-import io
-import csv
-import json
+import os
+import re
 import uuid
-from typing import List, Optional
-from datetime import datetime
-from pymongo import MongoClient
+from typing import Callable, Dict, Iterator, List, Optional
+from datetime import datetime, timedelta
+from pymongo import MongoClient, ASCENDING, TEXT, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from dataset_builder.dataset_builder import DatasetBuilder, DatasetEntry, DatasetType
 from dataset_builder.dataset_builder_service import DatasetBuilderService
 from dataset_builder.entrytype import EntryType
+from dataset_builder.utils import exportstreams
+from dataset_builder.utils.exportstreams import EXPORT_MEDIA_TYPES, batched
+from multilangsetup.obsfucationresolver.obsfucation_resolver import ObfuscationResolver
+from utility.minhash import MinHasher
 from config_loader import ConfigLoader
 from template.templateserviceimpl import TemplateServiceImpl
 from template.utils.templategenerator import TemplateGenerator
 
+MAX_PAGE_SIZE = 1000
+EXPANSION_PREVIEW_SIZE = 20
+INSERT_BATCH_SIZE = 1000
+MERGE_BATCH_SIZE = 1000
+DUPLICATE_KEY_ERROR = 11000
+SEARCH_FIELDS_VERSION = 2
+SCHEMA_VERSION = 2
+SEARCH_MODES = ("substring", "prefix", "text")
+ENTRY_PROJECTION = {
+    "_id": 0, "text_norm": 0, "label_norm": 0, "ngrams": 0, "ngrams_capped": 0, "minhash_bands": 0, "minhash_sig": 0,
+    "merge_copy": 0
+}
+NEAR_DUPLICATE_JACCARD = 0.8
+MERGE_STALE_SECONDS = 600
+EMPTY_STATS = {"labels": {}, "text_length_sum": 0, "duplicate_count": 0}
+
+
+def _escape_stat_key(label: str) -> str:
+    return (label or "").replace("~", "~0").replace(".", "~1").replace("$", "~2")
+
+
+def _unescape_stat_key(key: str) -> str:
+    return key.replace("~2", "$").replace("~1", ".").replace("~0", "~")
+
 
 class DatasetBuilderServiceImpl(DatasetBuilderService):
     def __init__(self, config_file: str = "config.json"):
-        cfg = ConfigLoader(config_file).get_database_config()
+        config = ConfigLoader(config_file)
+        cfg = config.get_database_config()
         uri = f"mongodb://{cfg['username']}:{cfg['password']}@{cfg['host']}:{cfg['port']}/{cfg['authSource']}"
 
         self.client = MongoClient(uri)
         self.db = self.client[cfg["name"]]
         self.collection = self.db["datasets"]
+        self.entries = self.db["dataset_entries"]
+        self.schema = self.db["schema_versions"]
         self.template_service = TemplateServiceImpl()
+        builder_cfg = config.get_dataset_builder_config()
+        self.max_template_combinations = builder_cfg.get("max_template_combinations", 250000)
+        self.template_chunk_size = builder_cfg.get("template_chunk_size", INSERT_BATCH_SIZE)
         self.temp_new_dataset_info = None
 
 
     def create_dataset(self, name: str, description: str, dataset_type: DatasetType) -> DatasetBuilder:
         ds = DatasetBuilder.create(name, description, dataset_type)
         doc = ds.to_dict()
+        doc.pop("entries", None)
+        doc["search_version"] = SEARCH_FIELDS_VERSION
+        doc["stats"] = dict(EMPTY_STATS)
         result = self.collection.insert_one(doc)
         ds._id = str(result.inserted_id)
         return ds
@@ -36,7 +73,11 @@ class DatasetBuilderServiceImpl(DatasetBuilderService):
     def add_entry(self, dataset_id: str, text: Optional[str], label: str,
                   entry_type: EntryType = EntryType.MANUAL,
                   template_id: Optional[str] = None,
-                  values: Optional[dict] = None):
+                  values: Optional[dict] = None,
+                  progress_callback: Optional[Callable[[int, int], None]] = None,
+                  sample_size: Optional[int] = None,
+                  stratify: bool = False,
+                  seed: Optional[int] = None):
 
         dataset = self.get_dataset(dataset_id)
         if not dataset:
@@ -61,44 +102,17 @@ class DatasetBuilderServiceImpl(DatasetBuilderService):
                     values=values
                 )
 
-                self.collection.update_one(
-                    {"id": dataset_id},
-                    {"$push": {"entries": entry.to_dict()},
-                     "$set": {"updated_at": datetime.utcnow().isoformat()}}
-                )
-
+                self._insert_entries(dataset_id, [entry])
                 return entry
 
-            dataset_values = {}
-            for e in dataset.entries:
-                if e.values:
-                    for k, v in e.values.items():
-                        dataset_values.setdefault(k, set()).add(v)
-            dataset_values = {k: list(v) for k, v in dataset_values.items()}
-
             generator = TemplateGenerator(tpl.pattern)
             input_values = values.get("values") if values and "values" in values else values
 
-            variations = generator.generate_from_dataset_values(input_values or dataset_values)
-
-
-            added_entries = []
-            for var in variations:
-                entry = DatasetEntry.create(
-                    text=var["text"],
-                    label=label,
-                    entry_type=EntryType.TEMPLATE,
-                    template_id=template_id,
-                    values=var["values"]
-                )
-                self.collection.update_one(
-                    {"id": dataset_id},
-                    {"$push": {"entries": entry.to_dict()},
-                     "$set": {"updated_at": datetime.utcnow().isoformat()}}
-                )
-                added_entries.append(entry)
-
-            return added_entries
+            return self._expand_template(
+                dataset_id, generator, input_values or self._dataset_values(dataset_id),
+                label, template_id, progress_callback,
+                sample_size=sample_size, stratify=stratify, seed=seed
+            )
 
         if not text and values and "text" in values:
             text = values["text"]
@@ -111,120 +125,194 @@ class DatasetBuilderServiceImpl(DatasetBuilderService):
             values={}
         )
 
-        update_result = self.collection.update_one(
-            {"id": dataset_id},
-            {"$push": {"entries": entry.to_dict()},
-             "$set": {"updated_at": datetime.utcnow().isoformat()}}
-        )
-
-        if update_result.matched_count == 0:
-            return None
-
+        self._insert_entries(dataset_id, [entry])
         return entry
 
 
     def remove_entry(self, dataset_id: str, entry_id: str) -> bool:
-        dataset = self.get_dataset(dataset_id)
-        if not dataset:
-            return False
-        ok = dataset.remove_entry(entry_id)
-        if not ok:
+        doc = self.entries.find_one_and_delete(
+            {"dataset_id": dataset_id, "id": entry_id},
+            projection={"_id": 0, "text": 1, "label": 1, "text_hash": 1, "merge_copy": 1}
+        )
+        if not doc:
             return False
+        if doc.get("merge_copy"):
+            # Already copied by an in-place merge; drop the staged copy so the swap does not bring it back.
+            self.entries.delete_one({"dataset_id": doc["merge_copy"], "id": entry_id})
+
+        inc = {
+            "entry_count": -1,
+            f"stats.labels.{_escape_stat_key(doc['label'])}": -1,
+            "stats.text_length_sum": -len(doc["text"] or ""),
+        }
+        if self.entries.count_documents({"dataset_id": dataset_id, "text_hash": doc.get("text_hash")}, limit=1):
+            inc["stats.duplicate_count"] = -1
+
         self.collection.update_one(
             {"id": dataset_id},
-            {"$set": {
-                "entries": [e.to_dict() for e in dataset.entries],
-                "updated_at": datetime.utcnow().isoformat()
-            }}
+            {"$inc": inc,
+             "$set": {"updated_at": datetime.utcnow().isoformat()}}
         )
         return True
 
 
     def get_dataset(self, dataset_id: str) -> Optional[DatasetBuilder]:
-        doc = self.collection.find_one({"id": dataset_id})
+        doc = self.collection.find_one({"id": dataset_id}, {"entries": 0})
         if not doc:
             return None
-        return DatasetBuilder(
-            id=uuid.UUID(doc["id"]),
-            name=doc["name"],
-            description=doc["description"],
-            dataset_type=DatasetType(doc["dataset_type"]),
-            created_at=datetime.fromisoformat(doc["created_at"]),
-            updated_at=datetime.fromisoformat(doc["updated_at"]),
-            entries=[
-                DatasetEntry(
-                    id=uuid.UUID(e["id"]),
-                    text=e["text"],
-                    label=e["label"],
-                    entry_type=e.get("entry_type"),
-                    template_id=e.get("template_id"),
-                    values=e.get("values"),
-                    created_at=datetime.fromisoformat(e["created_at"]) if e.get("created_at") else datetime.utcnow()
-                ) for e in doc.get("entries", [])
-            ],
-            _id=str(doc["_id"])
-        )
+        return self._from_document(doc)
 
     def list_datasets(self) -> List[DatasetBuilder]:
-        datasets = []
-        for doc in self.collection.find():
-            datasets.append(
-                DatasetBuilder(
-                    id=uuid.UUID(doc["id"]),
-                    name=doc["name"],
-                    description=doc["description"],
-                    dataset_type=DatasetType(doc["dataset_type"]),
-                    created_at=datetime.fromisoformat(doc["created_at"]),
-                    updated_at=datetime.fromisoformat(doc["updated_at"]),
-                    entries=[
-                        DatasetEntry(
-                            id=uuid.UUID(e["id"]),
-                            text=e["text"],
-                            label=e["label"],
-                            template_id=e.get("template_id"),
-                            values=e.get("values"),
-                            created_at=datetime.fromisoformat(e["created_at"]) if e.get("created_at") else datetime.utcnow()
-                        ) for e in doc.get("entries", [])
-                    ],
-                    _id=str(doc["_id"])
-                )
-            )
-        return datasets
+        return [self._from_document(doc) for doc in self.collection.find({}, {"entries": 0})]
+
+    def list_dataset_summaries(self) -> List[dict]:
+        projection = {
+            "_id": 0, "id": 1, "name": 1, "description": 1, "dataset_type": 1,
+            "created_at": 1, "updated_at": 1, "entry_count": 1, "stats": 1
+        }
+        return [
+            {
+                "id": doc["id"],
+                "name": doc["name"],
+                "description": doc["description"],
+                "dataset_type": doc["dataset_type"],
+                "created_at": doc["created_at"],
+                "updated_at": doc["updated_at"],
+                "stats": self._stats_view(doc)
+            }
+            for doc in self.collection.find({}, projection).sort([("updated_at", -1)])
+        ]
+
+    def recompute_stats(self, dataset_id: str) -> Optional[dict]:
+        pipeline = [
+            {"$match": {"dataset_id": dataset_id}},
+            {"$facet": {
+                "labels": [{"$group": {"_id": "$label", "count": {"$sum": 1}}}],
+                "totals": [{"$group": {"_id": None, "count": {"$sum": 1}, "length": {"$sum": {"$strLenCP": {"$ifNull": ["$text", ""]}}}}}],
+                "duplicates": [
+                    {"$group": {"_id": "$text_hash", "count": {"$sum": 1}}},
+                    {"$match": {"count": {"$gt": 1}}},
+                    {"$group": {"_id": None, "extra": {"$sum": {"$subtract": ["$count", 1]}}}},
+                ],
+            }},
+        ]
+        result = next(self.entries.aggregate(pipeline, allowDiskUse=True), {})
+        totals = (result.get("totals") or [{"count": 0, "length": 0}])[0]
+        duplicates = (result.get("duplicates") or [{"extra": 0}])[0]
+
+        update = self.collection.find_one_and_update(
+            {"id": dataset_id},
+            {"$set": {
+                "entry_count": totals["count"],
+                "stats": {
+                    "labels": {_escape_stat_key(doc["_id"]): doc["count"] for doc in result.get("labels", [])},
+                    "text_length_sum": totals["length"],
+                    "duplicate_count": duplicates["extra"],
+                },
+            }},
+            projection={"_id": 0, "entry_count": 1, "stats": 1, "updated_at": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return self._stats_view(update) if update else None
+
+    def get_entries(self, dataset_id: str, skip: int = 0, limit: int = 100,
+                    label: Optional[str] = None) -> List[DatasetEntry]:
+        query = {"dataset_id": dataset_id}
+        if label:
+            query["label"] = label
+
+        cursor = self.entries.find(query, ENTRY_PROJECTION) \
+            .sort([("created_at", ASCENDING), ("id", ASCENDING)]) \
+            .skip(max(skip, 0)) \
+            .limit(min(max(limit, 1), MAX_PAGE_SIZE))
+        return [DatasetEntry.from_document(doc) for doc in cursor]
+
+    def count_entries(self, dataset_id: str, label: Optional[str] = None) -> int:
+        query = {"dataset_id": dataset_id}
+        if label:
+            query["label"] = label
+        return self.entries.count_documents(query)
+
+    def iter_entries(self, dataset_id: str, batch_size: int = 1000) -> Iterator[DatasetEntry]:
+        cursor = self.entries.find({"dataset_id": dataset_id}, ENTRY_PROJECTION) \
+            .sort([("created_at", ASCENDING)]) \
+            .batch_size(batch_size)
+        for doc in cursor:
+            yield DatasetEntry.from_document(doc)
 
     def delete_dataset(self, dataset_id: str) -> bool:
         result = self.collection.delete_one({"id": dataset_id})
-        return result.deleted_count > 0
+        if result.deleted_count == 0:
+            return False
+        self.entries.delete_many({"dataset_id": dataset_id})
+        return True
 
 
     def export_format(self, dataset_id: str, export_type: str) -> Optional[bytes]:
+        stream = self.stream_export(dataset_id, export_type)
+        if stream is None:
+            return None
+        return b"".join(stream)
+
+    def stream_export(self, dataset_id: str, export_type: str, compress: bool = False) -> Optional[Iterator[bytes]]:
         dataset = self.get_dataset(dataset_id)
         if not dataset:
             return None
 
         export_type = export_type.lower().strip()
-        buffer = io.BytesIO()
+        if export_type not in EXPORT_MEDIA_TYPES:
+            raise ValueError(f"Unsupported export type. Use one of: {', '.join(EXPORT_MEDIA_TYPES)}.")
 
-        if export_type == "json":
-            data = json.dumps(dataset.to_dict(), ensure_ascii=False, indent=4)
-            buffer.write(data.encode("utf-8"))
+        if export_type in ("parquet", "arrow"):
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ValueError(f"Export type '{export_type}' requires pyarrow to be installed.")
 
-        elif export_type == "csv":
-            text_stream = io.StringIO()
-            writer = csv.writer(text_stream)
-            writer.writerow(["id", "text", "label"])
-            for e in dataset.entries:
-                writer.writerow([e.id, e.text, e.label])
-            buffer.write(text_stream.getvalue().encode("utf-8"))
+        entries = self.iter_entries(dataset_id)
 
+        if export_type == "json":
+            metadata = dataset.to_dict()
+            metadata.pop("entries", None)
+            stream = exportstreams.stream_json(metadata, entries)
+        elif export_type == "jsonl":
+            stream = exportstreams.stream_jsonl(entries)
+        elif export_type == "csv":
+            stream = exportstreams.stream_csv(entries)
         elif export_type == "txt":
-            content = "\n".join([f"[{e.label}] {e.text}" for e in dataset.entries])
-            buffer.write(content.encode("utf-8"))
-
+            stream = exportstreams.stream_txt(entries)
+        elif export_type == "parquet":
+            stream = exportstreams.stream_parquet(entries)
+        elif export_type == "arrow":
+            stream = exportstreams.stream_arrow(entries)
         else:
-            raise ValueError("Unsupported export type. Use 'json', 'csv', or 'txt'.")
+            stream = exportstreams.stream_hf(dataset.name, dataset.description, self.distinct_labels(dataset_id), entries)
 
-        buffer.seek(0)
-        return buffer.read()
+        if compress:
+            stream = exportstreams.gzip_stream(stream)
+        return exportstreams.skip_empty(stream)
+
+    def export_to_file(self, dataset_id: str, export_type: str, path: str, compress: bool = False,
+                       on_chunk: Optional[Callable[[int], None]] = None) -> Optional[str]:
+        stream = self.stream_export(dataset_id, export_type, compress)
+        if stream is None:
+            return None
+        written = 0
+        try:
+            with open(path, "wb") as f:
+                for chunk in stream:
+                    f.write(chunk)
+                    written += len(chunk)
+                    if on_chunk:
+                        on_chunk(written)
+        except BaseException:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+        return path
+
+    def distinct_labels(self, dataset_id: str) -> List[str]:
+        return sorted(self.entries.distinct("label", {"dataset_id": dataset_id}))
 
     def add_entries_bulk(self, dataset_id: str, entries: List[dict]) -> List[DatasetEntry]:
         dataset = self.get_dataset(dataset_id)
@@ -232,7 +320,6 @@ class DatasetBuilderServiceImpl(DatasetBuilderService):
             return []
 
         added_entries = []
-        now = datetime.utcnow()
 
         for entry_data in entries:
             text = entry_data.get("text")
@@ -253,30 +340,76 @@ class DatasetBuilderServiceImpl(DatasetBuilderService):
             )
             added_entries.append(entry)
 
-        self.collection.update_one(
-            {"id": dataset_id},
-            {
-                "$push": {"entries": {"$each": [e.to_dict() for e in added_entries]}},
-                "$set": {"updated_at": now.isoformat()}
-            }
-        )
+        self._insert_entries(dataset_id, added_entries)
         return added_entries
 
 
     def search_entries(self, dataset_id: str, query: Optional[str] = None,
-                       label: Optional[str] = None) -> List[DatasetEntry]:
-        dataset = self.get_dataset(dataset_id)
-        if not dataset:
-            return []
+                       label: Optional[str] = None, mode: str = "substring",
+                       skip: int = 0, limit: int = 50, facets: bool = True) -> dict:
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unsupported search mode. Use one of: {', '.join(SEARCH_MODES)}.")
+
+        skip = max(skip, 0)
+        limit = min(max(limit, 1), MAX_PAGE_SIZE)
+        match = {"dataset_id": dataset_id}
+        if label:
+            match["label_norm"] = label.lower()
+
+        query_norm = DatasetEntry.normalize_text(query)
+        if not query_norm:
+            cursor = self.entries.find(match, ENTRY_PROJECTION) \
+                .sort([("created_at", ASCENDING)]) \
+                .skip(skip) \
+                .limit(limit)
+            return {
+                "total": self.entries.count_documents(match),
+                "skip": skip,
+                "limit": limit,
+                "entries": [DatasetEntry.from_document(doc) for doc in cursor],
+                "labels": self._label_counts(match) if facets else None
+            }
 
-        results = []
-        for entry in dataset.entries:
-            if query and query.lower() not in entry.text.lower():
-                continue
-            if label and entry.label.lower() != label.lower():
-                continue
-            results.append(entry)
-        return results
+        if mode == "text":
+            match["$text"] = {"$search": query}
+            sort = {"score": -1, "created_at": 1}
+        else:
+            pattern = re.escape(query_norm)
+            match["text_norm"] = {"$regex": "^" + pattern if mode == "prefix" else pattern}
+            grams = DatasetEntry.trigrams(query_norm)
+            if mode == "substring" and grams:
+                match["$or"] = [{"ngrams": {"$all": grams}}, {"ngrams_capped": True}]
+            sort = {"created_at": 1}
+
+        pipeline = [{"$match": match}]
+        if mode == "text":
+            pipeline.append({"$addFields": {"score": {"$meta": "textScore"}}})
+
+        facet = {
+            "entries": [{"$sort": sort}, {"$skip": skip}, {"$limit": limit}, {"$project": {**ENTRY_PROJECTION, "score": 0}}],
+            "total": [{"$count": "count"}],
+        }
+        if facets:
+            facet["labels"] = [{"$group": {"_id": "$label", "count": {"$sum": 1}}}, {"$sort": {"count": -1}}]
+        pipeline.append({"$facet": facet})
+
+        result = next(self.entries.aggregate(pipeline, allowDiskUse=True), {})
+        total = result.get("total") or [{"count": 0}]
+        return {
+            "total": total[0]["count"],
+            "skip": skip,
+            "limit": limit,
+            "entries": [DatasetEntry.from_document(doc) for doc in result.get("entries", [])],
+            "labels": {doc["_id"]: doc["count"] for doc in result.get("labels", [])} if facets else None
+        }
+
+    def _label_counts(self, match: dict) -> dict:
+        pipeline = [
+            {"$match": match},
+            {"$group": {"_id": "$label", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}},
+        ]
+        return {doc["_id"]: doc["count"] for doc in self.entries.aggregate(pipeline)}
 
 
     def merge_datasets(
@@ -284,7 +417,9 @@ class DatasetBuilderServiceImpl(DatasetBuilderService):
             primary_id: str,
             secondary_id: str,
             remove_dupes: bool,
-            new_dataset: bool
+            new_dataset: bool,
+            near_dupes: bool = False,
+            new_dataset_info=None
     ) -> Optional[DatasetBuilder]:
         primary = self.get_dataset(primary_id)
         secondary = self.get_dataset(secondary_id)
@@ -292,55 +427,416 @@ class DatasetBuilderServiceImpl(DatasetBuilderService):
         if not primary or not secondary:
             return None
 
-        all_entries = primary.entries + secondary.entries
-
-        for e in all_entries:
-            if e.values is None:
-                e.values = {}
-
-        if remove_dupes:
-            unique_map = {}
-            for e in all_entries:
-                key = (e.text.strip().lower(), e.label.lower())
-                if key not in unique_map:
-                    unique_map[key] = e
-            merged_entries = list(unique_map.values())
-        else:
-            merged_entries = all_entries
-
+        self.recover_interrupted_merges()
         if new_dataset:
-            info = getattr(self, "temp_new_dataset_info", None)
+            info = new_dataset_info or getattr(self, "temp_new_dataset_info", None)
             if not info:
                 raise ValueError("new_dataset=True but no dataset info provided.")
+            target_id = str(self.create_dataset(info.name, info.description, info.dataset_type).id)
+            self.temp_new_dataset_info = None
+            journal_id = target_id
+        else:
+            target_id = f"merge-staging-{uuid.uuid4()}"
+            journal_id = primary_id
+        self._set_merge_journal(journal_id, {"staging_id": target_id, "state": "staging"})
+
+        hasher = MinHasher() if remove_dupes and near_dupes else None
+        stats = {
+            "primary_entries": 0,
+            "secondary_entries": 0,
+            "inserted": 0,
+            "exact_duplicates": 0,
+            "near_duplicates": 0,
+            "near_duplicate_threshold": NEAR_DUPLICATE_JACCARD if hasher else None,
+        }
+
+        # In-place merges mark each primary row once it is copied, so the swap retires only copied rows.
+        mark = None if new_dataset else target_id
+        try:
+            self._copy_merge_entries(journal_id, target_id, {"dataset_id": primary_id}, "primary_entries", True,
+                                     remove_dupes, hasher, stats, mark)
+            self._copy_merge_entries(journal_id, target_id, {"dataset_id": secondary_id}, "secondary_entries", False,
+                                     remove_dupes, hasher, stats)
+            if mark:
+                # Rows added to the primary while the copy ran; anything later is left in place by the swap.
+                late = {"dataset_id": primary_id, "merge_copy": {"$ne": mark}}
+                self._copy_merge_entries(journal_id, target_id, late, "primary_entries", True,
+                                         remove_dupes, hasher, stats, mark)
+        except Exception:
+            self._rollback_merge(journal_id, target_id)
+            raise
+
+        if new_dataset:
+            self.collection.update_one({"id": target_id}, {"$unset": {"pending_merge": ""}})
+        else:
+            self._swap_merged_entries(primary_id, {
+                "staging_id": target_id, "retired_id": f"merge-retired-{uuid.uuid4()}", "state": "retiring"
+            })
+            target_id = primary_id
 
-            new_id = uuid.uuid4()
-            new_dataset_obj = DatasetBuilder(
-                id=new_id,
-                name=info.name,
-                description=info.description,
-                dataset_type=info.dataset_type,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-                entries=merged_entries,
+        self.collection.update_one(
+            {"id": target_id},
+            {"$set": {
+                "updated_at": datetime.utcnow().isoformat(),
+                "last_merge": {"primary_id": primary_id, "secondary_id": secondary_id, **stats}
+            }}
+        )
+        self.recompute_stats(target_id)
+        return self.get_dataset(target_id)
+
+    def _copy_merge_entries(self, journal_id: str, target_id: str, query: dict, counter: str, keep_ids: bool,
+                            remove_dupes: bool, hasher: Optional[MinHasher], stats: dict, mark: Optional[str] = None):
+        cursor = self.entries.find(query, {"_id": 0, "merge_copy": 0}) \
+            .sort([("created_at", ASCENDING)]) \
+            .batch_size(MERGE_BATCH_SIZE)
+        for batch in batched(cursor, MERGE_BATCH_SIZE):
+            stats[counter] += len(batch)
+            ids = [doc["id"] for doc in batch]
+            docs = self._merge_batch(target_id, batch, keep_ids, remove_dupes, hasher, stats)
+            stats["inserted"] += len(self._bulk_insert(docs))
+            if mark:
+                self.entries.update_many({"dataset_id": query["dataset_id"], "id": {"$in": ids}},
+                                         {"$set": {"merge_copy": mark}})
+            self._touch_merge_journal(journal_id)
+
+    def _set_merge_journal(self, dataset_id: str, journal: dict):
+        journal["updated_at"] = datetime.utcnow()
+        self.collection.update_one({"id": dataset_id}, {"$set": {"pending_merge": journal}})
+
+    def _touch_merge_journal(self, dataset_id: str):
+        self.collection.update_one({"id": dataset_id}, {"$set": {"pending_merge.updated_at": datetime.utcnow()}})
+
+    def _rollback_merge(self, dataset_id: str, staging_id: str):
+        if staging_id == dataset_id:
+            self.delete_dataset(dataset_id)
+            return
+        self.entries.delete_many({"dataset_id": staging_id})
+        self.entries.update_many({"dataset_id": dataset_id, "merge_copy": staging_id}, {"$unset": {"merge_copy": ""}})
+        self.collection.update_one({"id": dataset_id}, {"$unset": {"pending_merge": ""}})
+
+    def _swap_merged_entries(self, primary_id: str, journal: dict):
+        # Each step is idempotent and recorded before it runs, so an interrupted swap can be rolled forward:
+        # retire the old rows, promote the staged rows, then drop the retired ones.
+        if journal["state"] == "retiring":
+            self._set_merge_journal(primary_id, journal)
+            self.entries.update_many({"dataset_id": primary_id, "merge_copy": journal["staging_id"]},
+                                     {"$set": {"dataset_id": journal["retired_id"]}})
+            journal["state"] = "promoting"
+        if journal["state"] == "promoting":
+            self._set_merge_journal(primary_id, journal)
+            self.entries.update_many({"dataset_id": journal["staging_id"]}, {"$set": {"dataset_id": primary_id}})
+            journal["state"] = "cleanup"
+        self._set_merge_journal(primary_id, journal)
+        self.entries.delete_many({"dataset_id": journal["retired_id"]})
+        self.collection.update_one({"id": primary_id}, {"$unset": {"pending_merge": ""}})
+
+    def recover_interrupted_merges(self, stale_seconds: int = MERGE_STALE_SECONDS) -> int:
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+        recovered = 0
+        for doc in self.collection.find(
+                {"pending_merge.updated_at": {"$lt": cutoff}}, {"_id": 0, "id": 1, "pending_merge": 1}
+        ):
+            journal = doc["pending_merge"]
+            if journal["state"] == "staging":
+                self._rollback_merge(doc["id"], journal["staging_id"])
+            else:
+                self._swap_merged_entries(doc["id"], journal)
+            recovered += 1
+
+        active = {
+            doc["pending_merge"]["staging_id"]
+            for doc in self.collection.find({"pending_merge": {"$exists": True}}, {"_id": 0, "pending_merge": 1})
+        }
+        stale = [
+            dataset_id for dataset_id in self.entries.distinct("dataset_id", {"dataset_id": {"$regex": "^merge-staging-"}})
+            if dataset_id not in active
+        ]
+        if stale:
+            self.entries.delete_many({"dataset_id": {"$in": stale}})
+        if recovered or stale:
+            print(f"[INFO] Recovered {recovered} interrupted merges, removed {len(stale)} orphaned staging sets")
+        return recovered
+
+    def _merge_batch(self, target_id: str, batch: List[dict], keep_ids: bool, remove_dupes: bool,
+                     hasher: Optional[MinHasher], stats: dict) -> List[dict]:
+        docs = []
+        for doc in batch:
+            doc["dataset_id"] = target_id
+            if not keep_ids:
+                doc["id"] = str(uuid.uuid4())
+            if "text_hash" not in doc:
+                doc["text_hash"] = DatasetEntry.hash_text(doc["text"])
+            if "label_norm" not in doc:
+                doc.update(DatasetEntry.search_fields(doc["text"], doc["label"]))
+            docs.append(doc)
+
+        if not remove_dupes:
+            return docs
+
+        seen = {
+            (d["text_hash"], d.get("label_norm"))
+            for d in self.entries.find(
+                {"dataset_id": target_id, "text_hash": {"$in": list({d["text_hash"] for d in docs})}},
+                {"_id": 0, "text_hash": 1, "label_norm": 1}
+            )
+        }
+        unique = []
+        for d in docs:
+            key = (d["text_hash"], d["label_norm"])
+            if key in seen:
+                stats["exact_duplicates"] += 1
+                continue
+            seen.add(key)
+            unique.append(d)
+
+        if not hasher or not unique:
+            return unique
+
+        resolved = ObfuscationResolver.resolve_many([d["text"] for d in unique], lang="tr")
+        for d, text in zip(unique, resolved):
+            d["minhash_sig"] = hasher.signature(text or d["text_norm"])
+            d["minhash_bands"] = hasher.band_keys(d["minhash_sig"])
+
+        # Band collisions are only candidates; an entry is dropped when the estimated Jaccard similarity
+        # with a kept entry of the same label reaches NEAR_DUPLICATE_JACCARD.
+        batch_bands = list({b for d in unique for b in d["minhash_bands"]})
+        candidates: Dict[tuple, List[List[int]]] = {}
+        for d in self.entries.find(
+                {"dataset_id": target_id, "minhash_bands": {"$in": batch_bands}},
+                {"_id": 0, "minhash_bands": 1, "minhash_sig": 1, "label_norm": 1, "text": 1, "text_norm": 1}
+        ):
+            sig = d.get("minhash_sig") or hasher.signature(
+                ObfuscationResolver.resolve_all(d["text"], lang="tr") or d.get("text_norm", "")
             )
+            for b in d["minhash_bands"]:
+                candidates.setdefault((b, d["label_norm"]), []).append(sig)
+
+        kept = []
+        for d in unique:
+            keys = [(b, d["label_norm"]) for b in d["minhash_bands"]]
+            if any(MinHasher.similarity(d["minhash_sig"], sig) >= NEAR_DUPLICATE_JACCARD
+                   for k in keys for sig in candidates.get(k, ())):
+                stats["near_duplicates"] += 1
+                continue
+            for k in keys:
+                candidates.setdefault(k, []).append(d["minhash_sig"])
+            kept.append(d)
+        return kept
 
-            self.collection.insert_one(new_dataset_obj.to_dict())
-            self.temp_new_dataset_info = None
-            return new_dataset_obj
 
-        primary.entries = merged_entries
-        primary.updated_at = datetime.utcnow()
+    def run_migrations(self) -> bool:
+        # Called once from app startup; workers and job processes that construct the service skip all of this.
+        current = self.schema.find_one({"_id": "dataset_builder"}) or {}
+        if current.get("version", 0) >= SCHEMA_VERSION:
+            self.recover_interrupted_merges()
+            return False
 
-        self.collection.update_one(
-            {"id": primary_id},
-            {
-                "$set": {
-                    "entries": [e.to_dict() for e in merged_entries],
-                    "updated_at": primary.updated_at.isoformat(),
-                }
-            }
+        print(f"[INFO] Migrating dataset schema {current.get('version', 0)} -> {SCHEMA_VERSION}")
+        self._ensure_indexes()
+        self.migrate_embedded_entries()
+        self.backfill_search_fields()
+        self.backfill_stats()
+        self.recover_interrupted_merges()
+        self.schema.update_one(
+            {"_id": "dataset_builder"},
+            {"$set": {"version": SCHEMA_VERSION, "migrated_at": datetime.utcnow()}},
+            upsert=True
+        )
+        return True
+
+    def _ensure_indexes(self):
+        self.entries.create_index([("dataset_id", ASCENDING), ("id", ASCENDING)], unique=True)
+        self.entries.create_index([("dataset_id", ASCENDING), ("label", ASCENDING)])
+        self.entries.create_index([("dataset_id", ASCENDING), ("created_at", ASCENDING)])
+        self.entries.create_index([("dataset_id", ASCENDING), ("text_hash", ASCENDING)])
+        self.entries.create_index([("dataset_id", ASCENDING), ("label_norm", ASCENDING)])
+        self.entries.create_index([("dataset_id", ASCENDING), ("text_norm", ASCENDING)])
+        self.entries.create_index([("dataset_id", ASCENDING), ("ngrams", ASCENDING)])
+        self.entries.create_index(
+            [("dataset_id", ASCENDING), ("ngrams_capped", ASCENDING)],
+            partialFilterExpression={"ngrams_capped": True},
+            name="dataset_entries_ngrams_capped"
+        )
+        self.entries.create_index([("dataset_id", ASCENDING), ("minhash_bands", ASCENDING)])
+        self.entries.create_index(
+            [("dataset_id", ASCENDING), ("text", TEXT), ("label", TEXT)],
+            default_language="none",
+            name="dataset_entries_text"
         )
 
-        return primary
+    def migrate_embedded_entries(self) -> int:
+        migrated = 0
+        for doc in self.collection.find({"entries.0": {"$exists": True}}, {"id": 1, "entries": 1}):
+            entries = [DatasetEntry.from_document(e) for e in doc["entries"]]
+            self._bulk_insert([e.to_document(doc["id"]) for e in entries])
+            self.collection.update_one({"id": doc["id"]}, {"$unset": {"entries": ""}})
+            self.recompute_stats(doc["id"])
+            migrated += len(entries)
+        return migrated
+
+
+    def backfill_stats(self) -> int:
+        dataset_ids = [doc["id"] for doc in self.collection.find({"stats": {"$exists": False}}, {"id": 1})]
+        for dataset_id in dataset_ids:
+            self.recompute_stats(dataset_id)
+        return len(dataset_ids)
+
+
+    def backfill_search_fields(self) -> int:
+        updated = 0
+        for ds in self.collection.find({"search_version": {"$ne": SEARCH_FIELDS_VERSION}}, {"id": 1}):
+            ops = []
+            for doc in self.entries.find({"dataset_id": ds["id"]}, {"_id": 1, "text": 1, "label": 1}):
+                fields = DatasetEntry.search_fields(doc["text"], doc["label"])
+                stale = "ngrams" if fields.get("ngrams_capped") else "ngrams_capped"
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields, "$unset": {stale: ""}}))
+                if len(ops) >= INSERT_BATCH_SIZE:
+                    updated += self.entries.bulk_write(ops, ordered=False).modified_count
+                    ops = []
+            if ops:
+                updated += self.entries.bulk_write(ops, ordered=False).modified_count
+            self.collection.update_one({"id": ds["id"]}, {"$set": {"search_version": SEARCH_FIELDS_VERSION}})
+        return updated
+
+
+    def _expand_template(self, dataset_id: str, generator: TemplateGenerator, dataset_values: Dict[str, List[str]],
+                         label: str, template_id: str,
+                         progress_callback: Optional[Callable[[int, int], None]] = None,
+                         sample_size: Optional[int] = None,
+                         stratify: bool = False,
+                         seed: Optional[int] = None) -> dict:
+        space = generator.count_combinations(dataset_values)
+        if sample_size:
+            total = min(sample_size, space)
+            sampler = generator.stratified_sample if stratify else generator.sample
+            variations = sampler(dataset_values, sample_size, seed=seed)
+        else:
+            total = space
+            variations = generator.iter_from_dataset_values(dataset_values, dedup=True)
 
+        if total > self.max_template_combinations:
+            raise ValueError(
+                f"Template expands to {total} combinations, above the limit of {self.max_template_combinations}. "
+                f"Pass sample_size to draw a random subset instead."
+            )
 
+        inserted = 0
+        chunks = 0
+        preview = []
+        chunk = []
+
+        def flush():
+            nonlocal inserted, chunks
+            inserted += self._insert_entries(dataset_id, chunk, {
+                "template_expansion": {"template_id": template_id, "done": inserted + len(chunk), "total": total}
+            })
+            chunks += 1
+            chunk.clear()
+            if progress_callback:
+                progress_callback(inserted, total)
+
+        for var in variations:
+            entry = DatasetEntry.create(
+                text=var["text"],
+                label=label,
+                entry_type=EntryType.TEMPLATE,
+                template_id=template_id,
+                values=var["values"]
+            )
+            if len(preview) < EXPANSION_PREVIEW_SIZE:
+                preview.append(entry)
+            chunk.append(entry)
+            if len(chunk) >= self.template_chunk_size:
+                flush()
+
+        if chunk:
+            flush()
+
+        return {
+            "template_id": template_id,
+            "total_combinations": space,
+            "requested": total,
+            "inserted": inserted,
+            "chunks": chunks,
+            "sample_entries": preview
+        }
+
+    def _dataset_values(self, dataset_id: str) -> Dict[str, List[str]]:
+        pipeline = [
+            {"$match": {"dataset_id": dataset_id, "values": {"$nin": [None, {}]}}},
+            {"$project": {"kv": {"$objectToArray": "$values"}}},
+            {"$unwind": "$kv"},
+            {"$group": {"_id": "$kv.k", "values": {"$addToSet": "$kv.v"}}},
+        ]
+        return {doc["_id"]: doc["values"] for doc in self.entries.aggregate(pipeline)}
+
+    def _insert_entries(self, dataset_id: str, entries: List[DatasetEntry], extra_set: Optional[dict] = None) -> int:
+        if not entries:
+            return 0
+
+        docs = [e.to_document(dataset_id) for e in entries]
+        hashes = list({doc["text_hash"] for doc in docs})
+        seen = set(self.entries.distinct("text_hash", {"dataset_id": dataset_id, "text_hash": {"$in": hashes}}))
+        inserted = self._bulk_insert(docs)
+        inc = self._stats_increment(inserted, seen)
+        inc["entry_count"] = len(inserted)
+        self.collection.update_one(
+            {"id": dataset_id},
+            {"$inc": inc,
+             "$set": {"updated_at": datetime.utcnow().isoformat(), **(extra_set or {})}}
+        )
+        return inc["entry_count"]
+
+    @staticmethod
+    def _stats_increment(docs: List[dict], seen: set) -> dict:
+        inc = {"stats.text_length_sum": 0, "stats.duplicate_count": 0}
+        for doc in docs:
+            key = f"stats.labels.{_escape_stat_key(doc['label'])}"
+            inc[key] = inc.get(key, 0) + 1
+            inc["stats.text_length_sum"] += len(doc["text"] or "")
+            if doc["text_hash"] in seen:
+                inc["stats.duplicate_count"] += 1
+            seen.add(doc["text_hash"])
+        return inc
+
+    def _bulk_insert(self, docs: List[dict]) -> List[dict]:
+        inserted = []
+        for start in range(0, len(docs), INSERT_BATCH_SIZE):
+            batch = docs[start:start + INSERT_BATCH_SIZE]
+            try:
+                self.entries.insert_many(batch, ordered=False)
+                inserted.extend(batch)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(err.get("code") != DUPLICATE_KEY_ERROR for err in errors):
+                    raise
+                skipped = {err["index"] for err in errors}
+                inserted.extend(doc for i, doc in enumerate(batch) if i not in skipped)
+        return inserted
+
+    @staticmethod
+    def _stats_view(doc: dict) -> dict:
+        raw = doc.get("stats") or EMPTY_STATS
+        count = doc.get("entry_count", 0)
+        return {
+            "entry_count": count,
+            "labels": {_unescape_stat_key(k): v for k, v in raw.get("labels", {}).items() if v > 0},
+            "avg_text_length": round(raw.get("text_length_sum", 0) / count, 2) if count else 0.0,
+            "duplicate_count": raw.get("duplicate_count", 0),
+            "last_updated": doc.get("updated_at")
+        }
+
+    @staticmethod
+    def _from_document(doc: dict) -> DatasetBuilder:
+        return DatasetBuilder(
+            id=uuid.UUID(doc["id"]),
+            name=doc["name"],
+            description=doc["description"],
+            dataset_type=DatasetType(doc["dataset_type"]),
+            created_at=datetime.fromisoformat(doc["created_at"]),
+            updated_at=datetime.fromisoformat(doc["updated_at"]),
+            entry_count=doc.get("entry_count", 0),
+            last_merge=doc.get("last_merge"),
+            stats=DatasetBuilderServiceImpl._stats_view(doc),
+            _id=str(doc["_id"])
+        )
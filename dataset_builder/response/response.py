@@ -9,6 +9,9 @@ class DatasetResponse(BaseModel):
     description: str
     dataset_type: DatasetType
     entries: List[dict] = []
+    entry_count: int = 0
+    last_merge: Optional[dict] = None
+    stats: Optional[dict] = None
     created_at: datetime
     updated_at: datetime
     _id: Optional[str] = None
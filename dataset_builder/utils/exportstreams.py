@@ -0,0 +1,229 @@
+import csv
+import io
+import json
+import zipfile
+import zlib
+from typing import Callable, Iterable, Iterator, List
+
+from dataset_builder.dataset_builder import DatasetEntry
+
+ROW_BATCH_SIZE = 1000
+HF_SHARD_SIZE = 100000
+
+EXPORT_MEDIA_TYPES = {
+    "json": ("application/json", "json"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "csv": ("text/csv", "csv"),
+    "txt": ("text/plain", "txt"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "hf": ("application/zip", "zip"),
+}
+
+
+class ChunkSink:
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def batched(entries: Iterable[DatasetEntry], size: int = ROW_BATCH_SIZE) -> Iterator[List[DatasetEntry]]:
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_json(metadata: dict, entries: Iterable[DatasetEntry]) -> Iterator[bytes]:
+    head = json.dumps(metadata, ensure_ascii=False)
+    yield (head[:-1] + (", " if len(metadata) else "") + '"entries": [').encode("utf-8")
+    first = True
+    for batch in batched(entries):
+        parts = [json.dumps(e.to_dict(), ensure_ascii=False) for e in batch]
+        prefix = "" if first else ", "
+        first = False
+        yield (prefix + ", ".join(parts)).encode("utf-8")
+    yield b"]}"
+
+
+def stream_jsonl(entries: Iterable[DatasetEntry], row: Callable[[DatasetEntry], dict] = None) -> Iterator[bytes]:
+    row = row or (lambda e: e.to_dict())
+    for batch in batched(entries):
+        yield "".join(json.dumps(row(e), ensure_ascii=False) + "\n" for e in batch).encode("utf-8")
+
+
+def stream_csv(entries: Iterable[DatasetEntry]) -> Iterator[bytes]:
+    text_stream = io.StringIO()
+    writer = csv.writer(text_stream)
+    writer.writerow(["id", "text", "label"])
+    for batch in batched(entries):
+        for e in batch:
+            writer.writerow([e.id, e.text, e.label])
+        yield text_stream.getvalue().encode("utf-8")
+        text_stream.seek(0)
+        text_stream.truncate(0)
+    if text_stream.tell():
+        yield text_stream.getvalue().encode("utf-8")
+
+
+def stream_txt(entries: Iterable[DatasetEntry]) -> Iterator[bytes]:
+    first = True
+    for batch in batched(entries):
+        content = "\n".join(f"[{e.label}] {e.text}" for e in batch)
+        yield (content if first else "\n" + content).encode("utf-8")
+        first = False
+
+
+def _arrow_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("id", pa.string()),
+        ("text", pa.string()),
+        ("label", pa.string()),
+        ("entry_type", pa.string()),
+        ("template_id", pa.string()),
+        ("values", pa.string()),
+        ("created_at", pa.string()),
+    ])
+
+
+def _record_batch(batch: List[DatasetEntry], schema):
+    import pyarrow as pa
+    rows = [e.to_dict() for e in batch]
+    return pa.RecordBatch.from_pydict({
+        "id": [r["id"] for r in rows],
+        "text": [r["text"] for r in rows],
+        "label": [r["label"] for r in rows],
+        "entry_type": [r["entry_type"] for r in rows],
+        "template_id": [r["template_id"] for r in rows],
+        "values": [json.dumps(r["values"], ensure_ascii=False) if r["values"] else None for r in rows],
+        "created_at": [r["created_at"] for r in rows],
+    }, schema=schema)
+
+
+def stream_parquet(entries: Iterable[DatasetEntry]) -> Iterator[bytes]:
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema()
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    for batch in batched(entries, ROW_BATCH_SIZE * 10):
+        writer.write_batch(_record_batch(batch, schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def stream_arrow(entries: Iterable[DatasetEntry]) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    schema = _arrow_schema()
+    sink = ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    for batch in batched(entries):
+        writer.write_batch(_record_batch(batch, schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def hf_readme(name: str, description: str, labels: List[str]) -> str:
+    names = "\n".join(f"          '{i}': {json.dumps(label, ensure_ascii=False)}" for i, label in enumerate(labels))
+    return (
+        "---\n"
+        "configs:\n"
+        "- config_name: default\n"
+        "  data_files:\n"
+        "  - split: train\n"
+        "    path: data/train-*.jsonl\n"
+        "dataset_info:\n"
+        "  features:\n"
+        "  - name: id\n"
+        "    dtype: string\n"
+        "  - name: text\n"
+        "    dtype: string\n"
+        "  - name: label\n"
+        "    dtype:\n"
+        "      class_label:\n"
+        "        names:\n"
+        f"{names}\n"
+        "---\n\n"
+        f"# {name}\n\n{description}\n\n"
+        "Load with `datasets.load_dataset(\"<unzipped dir>\")`.\n"
+    )
+
+
+def stream_hf(name: str, description: str, labels: List[str], entries: Iterable[DatasetEntry]) -> Iterator[bytes]:
+    label2id = {label: i for i, label in enumerate(labels)}
+    sink = ChunkSink()
+
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        shard = None
+        shard_index = 0
+        shard_rows = 0
+        for batch in batched(entries):
+            for e in batch:
+                if shard is None:
+                    shard = zf.open(f"data/train-{shard_index:05d}.jsonl", "w", force_zip64=True)
+                shard.write((json.dumps(
+                    {"id": str(e.id), "text": e.text, "label": label2id.setdefault(e.label, len(label2id))},
+                    ensure_ascii=False
+                ) + "\n").encode("utf-8"))
+                shard_rows += 1
+                if shard_rows >= HF_SHARD_SIZE:
+                    shard.close()
+                    shard, shard_index, shard_rows = None, shard_index + 1, 0
+            yield sink.drain()
+
+        if shard is not None:
+            shard.close()
+        # Written last so labels added to the dataset while streaming still get a class name.
+        zf.writestr("README.md", hf_readme(name, description, list(label2id)))
+
+    yield sink.drain()
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def skip_empty(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    for chunk in chunks:
+        if chunk:
+            yield chunk
@@ -9,6 +9,7 @@ class ErrorCode(Enum):
     EXTERNAL_SERVICE_ERROR = 502
     INTERNAL_SERVER_ERROR = 500
     RATE_LIMIT_EXCEEDED = 429
+    PAYLOAD_TOO_LARGE = 413
 
     @classmethod
     def get_code(cls, error_type: str) -> int:
@@ -1,20 +1,25 @@
 # -*- coding: utf-8 -*-
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from typing import Optional
 from huggingface.huggingfacemanager import HuggingFaceManager
 from permcontrol.permissionscontrol import require_perm
 from user.role import Role
 from error.expectionhandler import ExpectionHandler
 from error.errortypes import ErrorType
+from jobs.jobs_controller import runner
 
 router = APIRouter()
 hf = HuggingFaceManager()
 
 
 @router.post("/load", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
-def load_dataset(name: str, subset: Optional[str] = None, split: str = "train"):
+def load_dataset(name: str, subset: Optional[str] = None, split: str = "train", streaming: bool = Query(False),
+                 background: bool = Query(False)):
     try:
-        hf.load(name, subset, split)
+        if background:
+            job = runner.submit("hf_load", {"name": name, "subset": subset, "split": split, "streaming": streaming})
+            return {"success": True, "status": "queued", "job_id": job["id"]}
+        hf.load(name, subset, split, streaming)
         return {"success": True, "datasets": hf.list()}
     except Exception as e:
         raise ExpectionHandler(
@@ -57,10 +62,22 @@ def preview_dataset(key: str, n: int = 5):
 
 
 @router.post("/save", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
-def save_dataset(key: str, output_dir: str = "saved_datasets"):
+def save_dataset(key: str, output_dir: str = "saved_datasets", format: str = "parquet"):
     try:
-        hf.save(key, output_dir)
-        return {"success": True, "saved_to": output_dir}
+        saved_to = hf.save(key, output_dir, format)
+        if saved_to is None:
+            raise ExpectionHandler(
+                message=f"Dataset '{key}' not found.",
+                error_type=ErrorType.NOT_FOUND
+            )
+        return {"success": True, "saved_to": saved_to}
+    except ExpectionHandler:
+        raise
+    except ValueError as e:
+        raise ExpectionHandler(
+            message=str(e),
+            error_type=ErrorType.VALIDATION_ERROR
+        )
     except Exception as e:
         raise ExpectionHandler(
             message="Failed to save dataset.",
@@ -1,53 +1,186 @@
 # -*- coding: utf-8 -*-
-from datasets import load_dataset
+import itertools
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from datasets import Dataset, concatenate_datasets, load_dataset, load_from_disk
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SAVE_FORMATS = ("parquet", "arrow", "json")
 
 
 class HuggingFaceManager:
     def __init__(self, cache_dir: str = "hf_cache"):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.registry_path = self.cache_dir / "registry.json"
+        self.lock_path = self.cache_dir / "registry.lock"
+        self.slices_dir = self.cache_dir / "slices"
         self.datasets: Dict[str, object] = {}
+        self.registry: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._read_registry()
+
+    def _read_registry(self):
+        if not self.registry_path.exists():
+            return
+        try:
+            with open(self.registry_path, "r", encoding="utf-8") as f:
+                self.registry = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[HF ERROR] Failed to read dataset registry → {e}")
+
+    @contextmanager
+    def _registry_lock(self):
+        # Several app and job processes share the registry, so writers re-read and merge under a file lock.
+        with self._lock, open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._read_registry()
+                yield
+                self._write_registry()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_registry(self):
+        tmp_path = self.registry_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.registry, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, self.registry_path)
 
-    def load(self, name: str, subset: Optional[str] = None, split: str = "train"):
+    def _load_dataset(self, name: str, subset: Optional[str], split: str, streaming: bool):
+        if subset:
+            return load_dataset(name, subset, split=split, cache_dir=str(self.cache_dir), streaming=streaming)
+        return load_dataset(name, split=split, cache_dir=str(self.cache_dir), streaming=streaming)
+
+    def load(self, name: str, subset: Optional[str] = None, split: str = "train", streaming: bool = False):
         key = f"{name}:{subset or 'default'}:{split}"
         try:
-            if subset:
-                dataset = load_dataset(name, subset, split=split, cache_dir=str(self.cache_dir))
+            dataset = self._load_dataset(name, subset, split, streaming)
+            saved_path = None
+            if not streaming and "[" in split:
+                # Sliced splits share the full split's cache files, so keep a copy of just the slice to reopen.
+                saved_path = self.slices_dir / key.replace('/', '_').replace(':', '_')
+                shutil.rmtree(saved_path, ignore_errors=True)
+                dataset.save_to_disk(str(saved_path))
+            entry = {
+                "name": name,
+                "subset": subset,
+                "split": split,
+                "streaming": streaming,
+                "num_rows": None if streaming else len(dataset),
+                "column_names": getattr(dataset, "column_names", None),
+                "cache_files": [] if streaming else [f["filename"] for f in dataset.cache_files],
+                "saved_path": str(saved_path) if saved_path else None,
+                "loaded_at": datetime.utcnow().isoformat() + "Z",
+            }
+            with self._registry_lock():
+                self.datasets[key] = dataset
+                self.registry[key] = entry
+            if streaming:
+                print(f"[HF] Opened streaming dataset → {key}")
             else:
-                dataset = load_dataset(name, split=split, cache_dir=str(self.cache_dir))
-
-            self.datasets[key] = dataset
-            print(f"[HF] Loaded dataset → {key} ({len(dataset)} records)")
+                print(f"[HF] Loaded dataset → {key} ({entry['num_rows']} records)")
         except Exception as e:
             print(f"[HF ERROR] Failed to load dataset ({name}, {subset}, {split}) → {e}")
 
+    def _reopen(self, key: str, entry: Dict[str, Any]) -> Optional[object]:
+        if entry.get("streaming"):
+            return self._load_dataset(entry["name"], entry.get("subset"), entry["split"], True)
+        if entry.get("saved_path"):
+            if not Path(entry["saved_path"]).exists():
+                print(f"[HF ERROR] Saved slice missing for {key}, reload the dataset")
+                return None
+            return load_from_disk(entry["saved_path"])
+        files = entry.get("cache_files") or []
+        if not files or not all(Path(f).exists() for f in files):
+            print(f"[HF ERROR] Cache files missing for {key}, reload the dataset")
+            return None
+        parts = [Dataset.from_file(f) for f in files]
+        return parts[0] if len(parts) == 1 else concatenate_datasets(parts)
+
     def get(self, key: str) -> Optional[object]:
-        return self.datasets.get(key)
+        dataset = self.datasets.get(key)
+        if dataset is not None:
+            return dataset
+        with self._lock:
+            if key not in self.registry:
+                self._read_registry()
+            entry = self.registry.get(key)
+            if entry is None:
+                return None
+            try:
+                dataset = self._reopen(key, entry)
+            except Exception as e:
+                print(f"[HF ERROR] Failed to reopen dataset {key} → {e}")
+                return None
+            if dataset is not None:
+                self.datasets[key] = dataset
+            return dataset
 
     def list(self):
-        return {name: len(ds) for name, ds in self.datasets.items()}
+        self._read_registry()
+        return {
+            key: {
+                "num_rows": entry.get("num_rows"),
+                "streaming": entry.get("streaming", False),
+                "column_names": entry.get("column_names"),
+                "loaded": key in self.datasets,
+            }
+            for key, entry in self.registry.items()
+        }
 
     def preview(self, key: str, n: int = 3):
         dataset = self.get(key)
-        if not dataset:
+        if dataset is None:
             print(f"[HF ERROR] Preview failed → Dataset not found → {key}")
             return None
-        return [dataset[i] for i in range(min(n, len(dataset)))]
+        if not hasattr(dataset, "__len__"):
+            return list(itertools.islice(iter(dataset), n))
+        return dataset.select(range(min(n, len(dataset)))).to_list()
 
-    def save(self, key: str, output_dir: str = "saved_datasets"):
+    def save(self, key: str, output_dir: str = "saved_datasets", fmt: str = "parquet") -> Optional[str]:
+        if fmt not in SAVE_FORMATS:
+            raise ValueError(f"Unsupported save format. Use one of: {', '.join(SAVE_FORMATS)}.")
         dataset = self.get(key)
-        if not dataset:
+        if dataset is None:
             print(f"[HF ERROR] Save failed → Dataset not found → {key}")
-            return
+            return None
+
+        if not hasattr(dataset, "__len__"):
+            def rows():
+                yield from dataset
+            dataset = Dataset.from_generator(rows, cache_dir=str(self.cache_dir))
 
         Path(output_dir).mkdir(parents=True, exist_ok=True)
-        out_file = Path(output_dir) / f"{key.replace('/', '_').replace(':', '_')}.json"
-        dataset.to_json(str(out_file))
+        base = key.replace('/', '_').replace(':', '_')
+        if fmt == "arrow":
+            out_file = Path(output_dir) / base
+            dataset.save_to_disk(str(out_file))
+        elif fmt == "parquet":
+            out_file = Path(output_dir) / f"{base}.parquet"
+            dataset.to_parquet(str(out_file))
+        else:
+            out_file = Path(output_dir) / f"{base}.json"
+            dataset.to_json(str(out_file))
 
         print(f"[HF] Saved dataset → {out_file}")
+        return str(out_file)
 
     def clear(self):
-        self.datasets.clear()
+        with self._registry_lock():
+            self.datasets.clear()
+            self.registry.clear()
+        shutil.rmtree(self.slices_dir, ignore_errors=True)
         print("[HF] Cleared all loaded datasets.")
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from enum import Enum
+
+
+class JobStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
+class JobPool(str, Enum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+TERMINAL_STATUSES = (JobStatus.SUCCEEDED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value)
+
+
+class JobCancelled(Exception):
+    pass
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from jobs.job import JobCancelled
+from jobs.jobstore import JobStore
+
+PROGRESS_INTERVAL = 1.0
+CANCEL_CHECK_INTERVAL = 1.0
+
+
+class JobContext:
+    def __init__(self, store: JobStore, job_id: str, artifact_dir: str):
+        self.store = store
+        self.job_id = job_id
+        self.artifact_dir = Path(artifact_dir) / job_id
+        self._last_progress = 0.0
+        self._last_cancel_check = 0.0
+        self._cancelled = False
+
+    def progress(self, current: float, total: Optional[float] = None, message: Optional[str] = None,
+                 force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_progress < PROGRESS_INTERVAL and (total is None or current < total):
+            return
+        self._last_progress = now
+        self.store.set_progress(self.job_id, current, total, message)
+
+    def log(self, message: str, level: str = "INFO"):
+        print(f"[Job {self.job_id}] {message}")
+        self.store.append_log(self.job_id, message, level)
+
+    def cancelled(self) -> bool:
+        if self._cancelled:
+            return True
+        now = time.monotonic()
+        if now - self._last_cancel_check >= CANCEL_CHECK_INTERVAL:
+            self._last_cancel_check = now
+            self._cancelled = self.store.is_cancel_requested(self.job_id)
+        return self._cancelled
+
+    def check_cancelled(self):
+        if self.cancelled():
+            raise JobCancelled(f"Job {self.job_id} was cancelled.")
+
+    def artifact_path(self, name: str) -> str:
+        self.artifact_dir.mkdir(parents=True, exist_ok=True)
+        return str(self.artifact_dir / os.path.basename(name))
+
+    def add_artifact(self, name: str, path: Optional[str] = None):
+        path = path or self.artifact_path(name)
+        is_dir = os.path.isdir(path)
+        self.store.add_artifact(self.job_id, {
+            "name": name,
+            "path": os.path.abspath(path),
+            "type": "directory" if is_dir else "file",
+            "size": None if is_dir else os.path.getsize(path)
+        })
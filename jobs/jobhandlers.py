@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from jobs.job import JobPool
+from jobs.jobcontext import JobContext
+
+
+def _training_callback(ctx: JobContext):
+    from transformers import TrainerCallback
+
+    class JobProgressCallback(TrainerCallback):
+        def on_step_end(self, args, state, control, **kwargs):
+            ctx.progress(state.global_step, state.max_steps, f"epoch {state.epoch or 0:.2f}")
+            if ctx.cancelled():
+                control.should_training_stop = True
+                control.should_save = False
+            return control
+
+        def on_log(self, args, state, control, logs=None, **kwargs):
+            if logs:
+                ctx.log(f"step {state.global_step}: {logs}")
+
+    return JobProgressCallback()
+
+
+def train_model(ctx: JobContext, corpus_files: List[str], output_dir: str, model_size: str) -> Dict[str, Any]:
+    from trainer.base_trainer.base_trainer import BaseTrainer
+
+    ctx.log(f"Training base model ({model_size}) on {len(corpus_files)} corpus files")
+    result = BaseTrainer().train(
+        corpus_files=corpus_files,
+        output_dir=output_dir,
+        model_size=model_size,
+        callbacks=[_training_callback(ctx)]
+    )
+    ctx.check_cancelled()
+    ctx.add_artifact("model", output_dir)
+    return result
+
+
+def fine_tune(ctx: JobContext, model_path: str, dataset_id: str, output_dir: str,
+              training_args: Dict[str, Any], model_name: str = "fine-tuned-model",
+              version: str = "v1") -> Dict[str, Any]:
+    from trainer.finetune_trainer.finetune_trainer import FineTuneTrainer
+
+    ctx.log(f"Fine-tuning {model_path} on dataset {dataset_id}")
+    result = FineTuneTrainer().fine_tune(
+        model_path, dataset_id, output_dir, training_args, model_name, version,
+        callbacks=[_training_callback(ctx)]
+    )
+    ctx.check_cancelled()
+    ctx.add_artifact("model", result.get("saved_path", output_dir))
+    return result
+
+
+def corpus_build(ctx: JobContext, dataset_key: str, output_name: str, text_field: str = "text",
+                 limit: Optional[int] = None, shard_lines: Optional[int] = None,
+                 dedup: Optional[str] = None) -> Dict[str, Any]:
+    from corpusmanagement.corpus_controller import build_corpus, corpus
+
+    ctx.log(f"Building corpus '{output_name}' from {dataset_key}")
+    def on_batch(lines: int):
+        ctx.progress(lines, message=f"{lines} lines written")
+        ctx.check_cancelled()
+
+    result = build_corpus(dataset_key, output_name, text_field, limit, shard_lines, dedup, on_batch=on_batch)
+    if result.get("success") is False:
+        raise ValueError(result.get("error", "Corpus build failed."))
+    if result.get("dedup"):
+        ctx.log(f"Dedup removed {result['dedup']['removed']} lines")
+    for name in result.get("files", []):
+        ctx.add_artifact(name, str(corpus.corpus_dir / name))
+    return result
+
+
+def hf_load(ctx: JobContext, name: str, subset: Optional[str] = None, split: str = "train",
+            streaming: bool = False) -> Dict[str, Any]:
+    from huggingface.huggingface_controller import hf
+
+    ctx.log(f"Loading Hugging Face dataset {name} ({subset or 'default'}/{split}){' as stream' if streaming else ''}")
+    # load_dataset cannot be interrupted, so cancellation only takes effect before or after the download.
+    ctx.check_cancelled()
+    hf.load(name, subset, split, streaming)
+    ctx.check_cancelled()
+    return {"success": True, "datasets": hf.list()}
+
+
+def scrape_reddit(ctx: JobContext, query: str, limit: int = 50, subreddits: Optional[List[str]] = None,
+                  incremental: bool = False, **integration) -> Dict[str, Any]:
+    from data_scraper.scrapper_controller import service, integrate_scraped
+
+    ctx.check_cancelled()
+    data = service.scrape_reddit(query=query, limit=limit, subreddits=subreddits, incremental=incremental)
+    ctx.log(f"Scraped {len(data)} posts for '{query}'")
+    ctx.check_cancelled()
+
+    if integration.get("auto_dataset"):
+        return integrate_scraped(data[:limit], query, **integration)
+
+    path = ctx.artifact_path("posts.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    ctx.add_artifact("posts.json", path)
+    return {"status": "success", "count": len(data)}
+
+
+def dataset_export(ctx: JobContext, dataset_id: str, export_type: str, compress: bool = False) -> Dict[str, Any]:
+    from dataset_builder.dataset_builder_controller import service
+    from dataset_builder.utils.exportstreams import EXPORT_MEDIA_TYPES
+
+    export_type = export_type.lower().strip()
+    if export_type not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Unsupported export type: {export_type}")
+
+    _, extension = EXPORT_MEDIA_TYPES[export_type]
+    name = f"{dataset_id}.{extension}" + (".gz" if compress else "")
+    def on_chunk(written: int):
+        ctx.progress(written, message=f"{written} bytes written")
+        ctx.check_cancelled()
+
+    path = service.export_to_file(dataset_id, export_type, ctx.artifact_path(name), compress=compress,
+                                  on_chunk=on_chunk)
+    if path is None:
+        raise ValueError(f"Dataset '{dataset_id}' not found.")
+
+    ctx.add_artifact(name, path)
+    return {"dataset_id": dataset_id, "export_type": export_type, "size": os.path.getsize(path)}
+
+
+JOB_HANDLERS: Dict[str, Tuple[Callable[..., Dict[str, Any]], JobPool]] = {
+    "train_model": (train_model, JobPool.PROCESS),
+    "fine_tune": (fine_tune, JobPool.PROCESS),
+    "corpus_build": (corpus_build, JobPool.THREAD),
+    "hf_load": (hf_load, JobPool.THREAD),
+    "scrape_reddit": (scrape_reddit, JobPool.THREAD),
+    "dataset_export": (dataset_export, JobPool.THREAD),
+}
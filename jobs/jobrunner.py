@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from jobs.job import JobCancelled, JobPool, JobStatus
+from jobs.jobcontext import JobContext
+from jobs.jobhandlers import JOB_HANDLERS
+from jobs.jobstore import JobStore
+
+
+def execute_job(store: JobStore, job: dict, artifact_dir: str):
+    job_id = job["id"]
+    handler, _ = JOB_HANDLERS[job["kind"]]
+    ctx = JobContext(store, job_id, artifact_dir)
+
+    try:
+        ctx.log(f"Started {job['kind']} on {job.get('worker')}")
+        result = handler(ctx, **(job.get("params") or {}))
+        ctx.check_cancelled()
+        if store.finish(job_id, JobStatus.SUCCEEDED, result=result):
+            ctx.log("Finished")
+        else:
+            ctx.log("Finished, but the job was already closed; result not stored", level="WARNING")
+    except JobCancelled:
+        store.finish(job_id, JobStatus.CANCELLED, error="Cancelled by request.")
+        ctx.log("Cancelled", level="WARNING")
+    except Exception as e:
+        store.finish(job_id, JobStatus.FAILED, error=getattr(e, "message", None) or str(e) or type(e).__name__)
+        ctx.log(traceback.format_exc(), level="ERROR")
+
+
+def _process_entry(job: dict, config_file: str, artifact_dir: str):
+    execute_job(JobStore(config_file), job, artifact_dir)
+
+
+class JobRunner:
+    def __init__(
+            self,
+            store: JobStore,
+            config_file: str = "config.json",
+            thread_workers: int = 2,
+            process_workers: int = 1,
+            poll_interval: float = 1.0,
+            artifact_dir: str = "job_artifacts",
+            heartbeat_timeout: int = 120,
+            cancel_grace: float = 30.0
+    ):
+        self.store = store
+        self.config_file = config_file
+        self.workers = {JobPool.THREAD: thread_workers, JobPool.PROCESS: process_workers}
+        self.poll_interval = poll_interval
+        self.artifact_dir = artifact_dir
+        self.heartbeat_timeout = heartbeat_timeout
+        self.cancel_grace = cancel_grace
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._stop = threading.Event()
+        self._wakeups: Dict[JobPool, threading.Condition] = {pool: threading.Condition() for pool in JobPool}
+        self._threads: List[threading.Thread] = []
+        self._processes: Dict[str, multiprocessing.Process] = {}
+        self._mp = multiprocessing.get_context("spawn")
+
+    def start(self):
+        if self._threads:
+            return
+        self.fail_orphaned()
+
+        for pool, count in self.workers.items():
+            for i in range(count):
+                thread = threading.Thread(
+                    target=self._dispatch_loop, args=(pool,), name=f"job-{pool.value}-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def fail_orphaned(self) -> int:
+        # Run at startup and on a schedule, so jobs of a worker that died while others keep running are closed too.
+        try:
+            orphaned = self.store.fail_orphaned(self.heartbeat_timeout)
+        except Exception as e:
+            print(f"[JobRunner] Failed to check for orphaned jobs: {e}")
+            return 0
+        if orphaned:
+            print(f"[JobRunner] Marked {orphaned} orphaned jobs as failed")
+        return orphaned
+
+    def stop(self):
+        self._stop.set()
+        for condition in self._wakeups.values():
+            with condition:
+                condition.notify_all()
+        for process in list(self._processes.values()):
+            if process.is_alive():
+                process.terminate()
+
+    def submit(self, kind: str, params: dict, created_by: Optional[str] = None) -> dict:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind '{kind}'. Use one of: {', '.join(JOB_HANDLERS)}.")
+        _, pool = JOB_HANDLERS[kind]
+        job = self.store.create(kind, pool.value, params, created_by)
+        condition = self._wakeups[pool]
+        with condition:
+            condition.notify()
+        return job
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        return self.store.request_cancel(job_id)
+
+    def _dispatch_loop(self, pool: JobPool):
+        worker = f"{self.worker_id}/{threading.current_thread().name}"
+        while not self._stop.is_set():
+            try:
+                job = self.store.claim_next(pool.value, worker)
+            except Exception as e:
+                print(f"[JobRunner] Failed to claim {pool.value} job: {e}")
+                job = None
+
+            if job is None:
+                condition = self._wakeups[pool]
+                with condition:
+                    condition.wait(self.poll_interval)
+                continue
+
+            if pool == JobPool.PROCESS:
+                self._run_in_process(job)
+            else:
+                self._run_in_thread(job)
+
+    def _run_in_thread(self, job: dict):
+        # Thread handlers only heartbeat through ctx.progress; tick here so long steps are not taken for orphans.
+        done = threading.Event()
+
+        def tick():
+            while not done.wait(self.poll_interval):
+                try:
+                    self.store.heartbeat(job["id"])
+                except Exception as e:
+                    print(f"[JobRunner] Heartbeat failed for {job['id']}: {e}")
+
+        ticker = threading.Thread(target=tick, name=f"job-heartbeat-{job['id']}", daemon=True)
+        ticker.start()
+        try:
+            execute_job(self.store, job, self.artifact_dir)
+        finally:
+            done.set()
+            ticker.join()
+
+    def _run_in_process(self, job: dict):
+        job_id = job["id"]
+        process = self._mp.Process(
+            target=_process_entry, args=(job, self.config_file, self.artifact_dir),
+            name=f"job-{job_id}", daemon=False
+        )
+        process.start()
+        self._processes[job_id] = process
+        cancel_seen_at = None
+
+        try:
+            while process.is_alive():
+                process.join(self.poll_interval)
+                if not process.is_alive():
+                    break
+                self.store.heartbeat(job_id)
+
+                if cancel_seen_at is None and self.store.is_cancel_requested(job_id):
+                    cancel_seen_at = time.monotonic()
+                elif cancel_seen_at is not None and time.monotonic() - cancel_seen_at > self.cancel_grace:
+                    process.terminate()
+                    process.join(self.poll_interval)
+                    self.store.finish(job_id, JobStatus.CANCELLED, error="Cancelled by request (terminated).")
+                    self.store.append_log(job_id, "Worker process terminated after cancel grace period", "WARNING")
+                    break
+        finally:
+            self._processes.pop(job_id, None)
+
+        if process.exitcode not in (0, None):
+            if self.store.finish(job_id, JobStatus.FAILED, error=f"Worker process exited with code {process.exitcode}."):
+                self.store.append_log(job_id, f"Worker process exited with code {process.exitcode}", "ERROR")
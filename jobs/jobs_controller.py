@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+
+from config_loader import ConfigLoader
+from error.errortypes import ErrorType
+from error.expectionhandler import ExpectionHandler
+from jobs.job import JobStatus
+from jobs.jobhandlers import JOB_HANDLERS
+from jobs.jobrunner import JobRunner
+from jobs.jobstore import JobStore
+from metrics.metricsregistry import metrics
+from permcontrol.permissionscontrol import require_perm
+from user.role import Role
+
+router = APIRouter()
+jobs_config = ConfigLoader("config.json").get_jobs_config()
+store = JobStore("config.json")
+runner = JobRunner(
+    store,
+    config_file="config.json",
+    thread_workers=jobs_config.get("thread_workers", 2),
+    process_workers=jobs_config.get("process_workers", 1),
+    poll_interval=jobs_config.get("poll_interval", 1.0),
+    artifact_dir=jobs_config.get("artifact_dir", "job_artifacts"),
+    heartbeat_timeout=jobs_config.get("heartbeat_timeout", 120),
+    cancel_grace=jobs_config.get("cancel_grace", 30.0)
+)
+
+metrics.register_gauge(
+    "aegis_jobs_queued",
+    "Background jobs waiting for a worker.",
+    lambda: store.count(JobStatus.QUEUED)
+)
+metrics.register_gauge(
+    "aegis_jobs_running",
+    "Background jobs currently running.",
+    lambda: store.count(JobStatus.RUNNING)
+)
+
+
+class JobSubmitRequest(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+
+
+def _get_job_or_404(job_id: str) -> dict:
+    job = store.get(job_id)
+    if not job:
+        raise ExpectionHandler(
+            message=f"Job '{job_id}' not found.",
+            error_type=ErrorType.NOT_FOUND
+        )
+    return job
+
+
+@router.post("/")
+def submit_job(req: JobSubmitRequest, current_user=Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))):
+    try:
+        job = runner.submit(req.kind, req.params, created_by=getattr(current_user, "id", None))
+        return {"success": True, "job": job}
+    except ValueError as e:
+        raise ExpectionHandler(
+            message=str(e),
+            error_type=ErrorType.VALIDATION_ERROR,
+            context={"kinds": list(JOB_HANDLERS)}
+        )
+
+
+@router.get("/", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
+def list_jobs(
+        status: Optional[JobStatus] = Query(None),
+        kind: Optional[str] = Query(None),
+        skip: int = Query(0, ge=0),
+        limit: int = Query(50, ge=1, le=500)
+):
+    return {"success": True, "jobs": store.list(status.value if status else None, kind, skip, limit)}
+
+
+@router.get("/{job_id}", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
+def get_job(job_id: str):
+    return {"success": True, "job": _get_job_or_404(job_id)}
+
+
+@router.get("/{job_id}/logs", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
+def get_job_logs(job_id: str, after: Optional[str] = Query(None), limit: int = Query(200, ge=1, le=1000)):
+    _get_job_or_404(job_id)
+    try:
+        logs = store.get_logs(job_id, after, limit)
+    except Exception as e:
+        raise ExpectionHandler(
+            message="Invalid log cursor.",
+            error_type=ErrorType.VALIDATION_ERROR,
+            detail=str(e)
+        )
+    return {"success": True, "logs": logs, "next_cursor": logs[-1]["cursor"] if logs else after}
+
+
+@router.post("/{job_id}/cancel", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
+def cancel_job(job_id: str):
+    _get_job_or_404(job_id)
+    job = runner.cancel(job_id)
+    return {"success": True, "job": job}
+
+
+@router.get("/{job_id}/artifacts", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
+def list_artifacts(job_id: str):
+    return {"success": True, "artifacts": _get_job_or_404(job_id).get("artifacts", [])}
+
+
+@router.get("/{job_id}/artifacts/{name}", dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))])
+def download_artifact(job_id: str, name: str):
+    job = _get_job_or_404(job_id)
+    artifact = next((a for a in job.get("artifacts", []) if a["name"] == name), None)
+    if not artifact or artifact["type"] != "file" or not os.path.isfile(artifact["path"]):
+        raise ExpectionHandler(
+            message=f"Artifact '{name}' is not available for download.",
+            error_type=ErrorType.NOT_FOUND,
+            context={"job_id": job_id}
+        )
+    return FileResponse(artifact["path"], filename=os.path.basename(artifact["path"]))
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from bson import ObjectId
+from pymongo import MongoClient, ASCENDING, DESCENDING, ReturnDocument
+
+from config_loader import ConfigLoader
+from jobs.job import JobStatus, TERMINAL_STATUSES
+
+JOB_PROJECTION = {"_id": 0}
+
+
+class JobStore:
+    def __init__(self, config_file: str = "config.json"):
+        cfg = ConfigLoader(config_file).get_database_config()
+        uri = f"mongodb://{cfg['username']}:{cfg['password']}@{cfg['host']}:{cfg['port']}/{cfg['authSource']}"
+
+        self.client = MongoClient(uri)
+        self.db = self.client[cfg["name"]]
+        self.collection = self.db["jobs"]
+        self.logs = self.db["job_logs"]
+        self.collection.create_index("id", unique=True)
+        self.collection.create_index([("status", ASCENDING), ("pool", ASCENDING), ("created_at", ASCENDING)])
+        self.collection.create_index([("kind", ASCENDING), ("created_at", DESCENDING)])
+        self.logs.create_index([("job_id", ASCENDING), ("_id", ASCENDING)])
+
+    def create(self, kind: str, pool: str, params: dict, created_by: Optional[str] = None) -> dict:
+        now = datetime.utcnow()
+        doc = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "pool": pool,
+            "params": params,
+            "status": JobStatus.QUEUED.value,
+            "progress": {"current": 0, "total": None, "message": None},
+            "result": None,
+            "error": None,
+            "artifacts": [],
+            "cancel_requested": False,
+            "created_by": created_by,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "heartbeat_at": None,
+            "worker": None,
+        }
+        self.collection.insert_one(dict(doc))
+        return doc
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.collection.find_one({"id": job_id}, JOB_PROJECTION)
+
+    def list(self, status: Optional[str] = None, kind: Optional[str] = None,
+             skip: int = 0, limit: int = 50) -> List[dict]:
+        query = {}
+        if status:
+            query["status"] = status
+        if kind:
+            query["kind"] = kind
+        cursor = self.collection.find(query, {"_id": 0, "params": 0, "result": 0}) \
+            .sort("created_at", DESCENDING).skip(skip).limit(limit)
+        return list(cursor)
+
+    def claim_next(self, pool: str, worker: str) -> Optional[dict]:
+        now = datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {"status": JobStatus.QUEUED.value, "pool": pool},
+            {"$set": {"status": JobStatus.RUNNING.value, "started_at": now, "heartbeat_at": now, "worker": worker}},
+            sort=[("created_at", ASCENDING)],
+            projection=JOB_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+
+    def heartbeat(self, job_id: str):
+        self.collection.update_one({"id": job_id}, {"$set": {"heartbeat_at": datetime.utcnow()}})
+
+    def set_progress(self, job_id: str, current: float, total: Optional[float] = None, message: Optional[str] = None):
+        update = {"progress.current": current, "heartbeat_at": datetime.utcnow()}
+        if total is not None:
+            update["progress.total"] = total
+        if message is not None:
+            update["progress.message"] = message
+        self.collection.update_one({"id": job_id}, {"$set": update})
+
+    def add_artifact(self, job_id: str, artifact: dict):
+        self.collection.update_one({"id": job_id}, {"$push": {"artifacts": artifact}})
+
+    def finish(self, job_id: str, status: JobStatus, result: Optional[dict] = None, error: Optional[str] = None) -> bool:
+        outcome = self.collection.update_one(
+            {"id": job_id, "status": {"$nin": list(TERMINAL_STATUSES)}},
+            {"$set": {
+                "status": status.value,
+                "result": result,
+                "error": error,
+                "finished_at": datetime.utcnow()
+            }}
+        )
+        return outcome.modified_count == 1
+
+    def request_cancel(self, job_id: str) -> Optional[dict]:
+        now = datetime.utcnow()
+        doc = self.collection.find_one_and_update(
+            {"id": job_id, "status": JobStatus.QUEUED.value},
+            {"$set": {"status": JobStatus.CANCELLED.value, "cancel_requested": True, "finished_at": now}},
+            projection=JOB_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        if doc:
+            return doc
+        return self.collection.find_one_and_update(
+            {"id": job_id, "status": JobStatus.RUNNING.value},
+            {"$set": {"cancel_requested": True, "cancel_requested_at": now}},
+            projection=JOB_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        ) or self.get(job_id)
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        doc = self.collection.find_one({"id": job_id}, {"_id": 0, "cancel_requested": 1})
+        return bool(doc and doc.get("cancel_requested"))
+
+    def append_log(self, job_id: str, message: str, level: str = "INFO"):
+        self.logs.insert_one({"job_id": job_id, "level": level, "message": message, "timestamp": datetime.utcnow()})
+
+    def get_logs(self, job_id: str, after: Optional[str] = None, limit: int = 200) -> List[dict]:
+        query = {"job_id": job_id}
+        if after:
+            query["_id"] = {"$gt": ObjectId(after)}
+        cursor = self.logs.find(query).sort("_id", ASCENDING).limit(limit)
+        return [
+            {"cursor": str(doc["_id"]), "level": doc["level"], "message": doc["message"], "timestamp": doc["timestamp"]}
+            for doc in cursor
+        ]
+
+    def count(self, status: JobStatus) -> int:
+        return self.collection.count_documents({"status": status.value})
+
+    def fail_orphaned(self, heartbeat_timeout: int) -> int:
+        cutoff = datetime.utcnow() - timedelta(seconds=heartbeat_timeout)
+        result = self.collection.update_many(
+            {"status": JobStatus.RUNNING.value, "heartbeat_at": {"$lt": cutoff}},
+            {"$set": {
+                "status": JobStatus.FAILED.value,
+                "error": "Worker stopped before the job finished.",
+                "finished_at": datetime.utcnow()
+            }}
+        )
+        return result.modified_count
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from anyio import to_thread
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from metrics.metricsregistry import metrics
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _threadpool_busy() -> int:
+    return to_thread.current_default_thread_limiter().borrowed_tokens
+
+
+def _threadpool_capacity() -> float:
+    return to_thread.current_default_thread_limiter().total_tokens
+
+
+metrics.register_gauge(
+    "aegis_threadpool_busy_threads",
+    "Worker threads currently running sync endpoints and blocking calls.",
+    _threadpool_busy
+)
+metrics.register_gauge(
+    "aegis_threadpool_capacity_threads",
+    "Maximum worker threads available to sync endpoints.",
+    _threadpool_capacity
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics.metricsregistry import metrics
+
+
+class MetricsMiddleware:
+    UNMATCHED_ROUTE = "unmatched"
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.requests = metrics.http_requests
+        self.responses = metrics.http_responses
+        self.in_flight = metrics.http_in_flight
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.in_flight.inc(-1)
+
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or self.UNMATCHED_ROUTE
+            method = scope["method"]
+            self.requests.child(route_path, method).observe(elapsed)
+            self.responses.child(route_path, method, str(status_code)).inc()
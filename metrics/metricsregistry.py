@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[idx] += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class LabeledHistogram:
+    def __init__(self, label_names: Tuple[str, str], buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.label_names = label_names
+        self.buckets = buckets
+        self.children: Dict[str, Dict[str, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def child(self, outer: str, inner: str) -> Histogram:
+        inner_map = self.children.get(outer)
+        if inner_map is not None:
+            hist = inner_map.get(inner)
+            if hist is not None:
+                return hist
+
+        with self._lock:
+            inner_map = self.children.setdefault(outer, {})
+            hist = inner_map.get(inner)
+            if hist is None:
+                hist = inner_map[inner] = Histogram(self.buckets)
+            return hist
+
+    def series(self):
+        for outer, inner_map in list(self.children.items()):
+            for inner, hist in list(inner_map.items()):
+                yield ((self.label_names[0], outer), (self.label_names[1], inner)), hist
+
+
+class LabeledCounter:
+    def __init__(self, label_names: Tuple[str, ...]):
+        self.label_names = label_names
+        self.children: Dict[Tuple[str, ...], Counter] = {}
+        self._lock = threading.Lock()
+
+    def child(self, *values: str) -> Counter:
+        counter = self.children.get(values)
+        if counter is None:
+            with self._lock:
+                counter = self.children.setdefault(values, Counter())
+        return counter
+
+    def series(self):
+        for values, counter in list(self.children.items()):
+            yield tuple(zip(self.label_names, values)), counter
+
+
+class _StaticSeries:
+    def __init__(self, label_names: Tuple[str, ...], children: Dict[Tuple[str, ...], Histogram]):
+        self.label_names = label_names
+        self.children = children
+
+    def series(self):
+        for values, hist in self.children.items():
+            yield tuple(zip(self.label_names, values)), hist
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Tuple[str, str, str, object]] = []
+        self._gauges: List[Tuple[str, str, Callable[[], float]]] = []
+
+        self.http_requests = self._add(
+            "aegis_http_request_duration_seconds", "histogram",
+            "HTTP request latency by route template and method.",
+            LabeledHistogram(("route", "method"))
+        )
+        self.http_responses = self._add(
+            "aegis_http_responses_total", "counter",
+            "HTTP responses by route template, method and status code.",
+            LabeledCounter(("route", "method", "status"))
+        )
+        self.http_in_flight = Counter()
+        self.register_gauge(
+            "aegis_http_requests_in_flight",
+            "HTTP requests currently being served.",
+            lambda: self.http_in_flight.value
+        )
+
+        self.inference_tokenization = Histogram()
+        self.inference_forward = Histogram()
+        self.inference_postprocess = Histogram()
+        self._add(
+            "aegis_inference_stage_duration_seconds", "histogram",
+            "Profanity inference time split by stage.",
+            _StaticSeries(("stage",), {
+                ("tokenization",): self.inference_tokenization,
+                ("forward",): self.inference_forward,
+                ("postprocess",): self.inference_postprocess,
+            })
+        )
+
+        self.model_cache_hits = self._add(
+            "aegis_model_cache_hits_total", "counter",
+            "Model cache lookups served from memory.", Counter()
+        )
+        self.model_cache_misses = self._add(
+            "aegis_model_cache_misses_total", "counter",
+            "Model cache lookups that loaded a model from disk.", Counter()
+        )
+        self.register_gauge(
+            "aegis_model_cache_hit_ratio",
+            "Share of model cache lookups served from memory.",
+            self._model_cache_hit_ratio
+        )
+
+        self.mongo_operations = self._add(
+            "aegis_mongo_operation_duration_seconds", "histogram",
+            "MongoDB command latency by collection and command.",
+            LabeledHistogram(("collection", "command"))
+        )
+        self.mongo_failures = self._add(
+            "aegis_mongo_operation_failures_total", "counter",
+            "Failed MongoDB commands by collection and command.",
+            LabeledCounter(("collection", "command"))
+        )
+
+        self.ratelimit_rejections = self._add(
+            "aegis_ratelimit_rejections_total", "counter",
+            "Requests rejected by the rate limiter.", Counter()
+        )
+
+    def _add(self, name: str, kind: str, help_text: str, metric):
+        self._metrics.append((name, kind, help_text, metric))
+        return metric
+
+    def register_gauge(self, name: str, help_text: str, fn: Callable[[], float]):
+        self._gauges = [g for g in self._gauges if g[0] != name]
+        self._gauges.append((name, help_text, fn))
+
+    def _model_cache_hit_ratio(self) -> float:
+        total = self.model_cache_hits.value + self.model_cache_misses.value
+        return round(self.model_cache_hits.value / total, 6) if total else 0.0
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        for name, kind, help_text, metric in self._metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if isinstance(metric, Counter):
+                lines.append(f"{name} {metric.value}")
+            elif isinstance(metric, LabeledCounter):
+                for labels, counter in metric.series():
+                    lines.append(f"{name}{_format_labels(labels)} {counter.value}")
+            else:
+                for labels, hist in metric.series():
+                    self._render_histogram(lines, name, labels, hist)
+
+        for name, help_text, fn in self._gauges:
+            try:
+                value = fn()
+            except Exception:
+                continue
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(value)}")
+
+        lines.append("")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _render_histogram(lines: List[str], name: str, labels, hist: Histogram):
+        counts, total = hist.snapshot()
+        cumulative = 0
+        for bound, count in zip(hist.buckets + (float("inf"),), counts):
+            cumulative += count
+            bucket_labels = tuple(labels) + (("le", _format_value(bound)),)
+            lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from pymongo import monitoring
+
+from metrics.metricsregistry import metrics
+
+
+class MongoMetricsListener(monitoring.CommandListener):
+    def __init__(self):
+        self.operations = metrics.mongo_operations
+        self.failures = metrics.mongo_failures
+        self._pending = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = event.command.get("collection", "-")
+        self._pending[(event.connection_id, event.request_id)] = collection
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        collection = self._pending.pop((event.connection_id, event.request_id), "-")
+        self.operations.child(collection, event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        collection = self._pending.pop((event.connection_id, event.request_id), "-")
+        self.operations.child(collection, event.command_name).observe(event.duration_micros / 1e6)
+        self.failures.child(collection, event.command_name).inc()
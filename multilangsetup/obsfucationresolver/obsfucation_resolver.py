@@ -1,5 +1,6 @@
 import re
 import unicodedata
+from typing import List, Optional, Tuple
 
 from multilangsetup.normalizers.turkish_normalizer import TurkishNormalizer
 from obsf.obfuscation_config_loader import ObfuscationConfigLoader
@@ -13,6 +14,21 @@ class ObfuscationResolver:
         if not isinstance(text, str) or not text.strip():
             return ""
 
+        lang, merged_cfg, special_rules = ObfuscationResolver._load_config(lang)
+        return ObfuscationResolver._resolve(text, lang, merged_cfg, special_rules)
+
+    @staticmethod
+    def resolve_many(texts: List[str], lang: str = None) -> List[str]:
+        lang, merged_cfg, special_rules = ObfuscationResolver._load_config(lang)
+        resolved = {}
+        for text in texts:
+            if text not in resolved:
+                valid = isinstance(text, str) and text.strip()
+                resolved[text] = ObfuscationResolver._resolve(text, lang, merged_cfg, special_rules) if valid else ""
+        return [resolved[text] for text in texts]
+
+    @staticmethod
+    def _load_config(lang: Optional[str]) -> Tuple[str, dict, dict]:
         try:
             global_cfg = ObfuscationConfigLoader.load_global()
         except FileNotFoundError:
@@ -32,8 +48,10 @@ class ObfuscationResolver:
 
         settings = lang_cfg.get("settings", {})
         special_rules = lang_cfg.get("special_rules", {})
-        merged_cfg = {**global_cfg, **settings}
+        return lang, {**global_cfg, **settings}, special_rules
 
+    @staticmethod
+    def _resolve(text: str, lang: str, merged_cfg: dict, special_rules: dict) -> str:
         if merged_cfg.get("normalize_unicode", True):
             text = ObfuscationHelper.normalize_unicode(text)
 
@@ -88,6 +88,7 @@ async def detect_bulk(payload: Dict,current_user=Depends(get_current_user)):
             try:
                 processed = profanity_service.detect(
                     text=original_text,
+                    user_id=str(current_user.id),
                     workspace_id=workspace_id,
                     pipeline=pipeline
                 )
@@ -1,8 +1,10 @@
+import time
 from typing import Dict, Optional
 import torch
 from transformers import BertTokenizerFast, BertForSequenceClassification
 
 from logs.predictionlogmanager import PredictionLogger
+from metrics.metricsregistry import metrics
 from profanity.profanityservice import ProfanityService
 from multilangsetup.multilang_step import Step
 from multilangsetup.multilang_processor import MultiLangProcessor, SUPPORTED_LANGUAGES
@@ -34,12 +36,14 @@ class ProfanityServiceImpl(ProfanityService):
         model_path = model_doc["model_path"]
 
         if model_path in self.model_cache:
+            metrics.model_cache_hits.inc()
             return (
                 self.tokenizer_cache[model_path],
                 self.model_cache[model_path],
                 model_path
             )
 
+        metrics.model_cache_misses.inc()
         tokenizer = BertTokenizerFast.from_pretrained(model_path)
         model = BertForSequenceClassification.from_pretrained(model_path)
         model.to(self.device)
@@ -83,12 +87,15 @@ class ProfanityServiceImpl(ProfanityService):
             processed = ObfuscationResolver.resolve_all(processed, lang=lang)
 
 
+        t0 = time.perf_counter()
         inputs = tokenizer(processed, return_tensors="pt")
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        t1 = time.perf_counter()
 
         with torch.no_grad():
             outputs = model(**inputs)
             probs_tensor = torch.softmax(outputs.logits, dim=-1)[0]
+        t2 = time.perf_counter()
 
         probs = probs_tensor.tolist()
         predicted_id = int(torch.argmax(probs_tensor))
@@ -96,6 +103,10 @@ class ProfanityServiceImpl(ProfanityService):
 
         PredictionLogger.log(text, predicted_label, probs[predicted_id])
 
+        metrics.inference_tokenization.observe(t1 - t0)
+        metrics.inference_forward.observe(t2 - t1)
+        metrics.inference_postprocess.observe(time.perf_counter() - t2)
+
         return {
             "raw_text": text,
             "processed_text": processed,
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from profiling.stacksampler import SAMPLE_SCOPE, Stack, StackSampler
+
+
+@dataclass
+class RequestProfile:
+    id: str
+    method: str
+    path: str
+    mode: str
+    trigger: str
+    status_code: int
+    duration: float
+    sample_count: int
+    samples: Dict[str, List[Tuple[Stack, float]]]
+    overlapping_requests: int = 0
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+    @staticmethod
+    def create(method: str, path: str, trigger: str, status_code: int, sampler: StackSampler,
+               overlapping_requests: int = 0) -> "RequestProfile":
+        return RequestProfile(
+            id=str(uuid.uuid4()),
+            method=method,
+            path=path,
+            mode=sampler.mode,
+            trigger=trigger,
+            status_code=status_code,
+            duration=sampler.duration,
+            sample_count=sampler.sample_count,
+            samples=sampler.samples,
+            overlapping_requests=overlapping_requests
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "mode": self.mode,
+            "trigger": self.trigger,
+            "status_code": self.status_code,
+            "duration_sec": round(self.duration, 6),
+            "sample_count": self.sample_count,
+            "scope": SAMPLE_SCOPE,
+            "overlapping_requests": self.overlapping_requests,
+            "threads": list(self.samples.keys()),
+            "created_at": self.created_at.isoformat()
+        }
+
+    def to_collapsed(self) -> str:
+        totals: Dict[str, int] = {}
+        for thread_name, samples in self.samples.items():
+            for stack, weight in samples:
+                key = ";".join((thread_name,) + stack)
+                totals[key] = totals.get(key, 0) + max(int(round(weight * 1e6)), 1)
+        return "\n".join(f"{stack} {weight}" for stack, weight in totals.items()) + "\n"
+
+    def to_speedscope(self) -> dict:
+        frames: List[dict] = []
+        frame_index: Dict[str, int] = {}
+        profiles = []
+
+        for thread_name, samples in self.samples.items():
+            indexed_samples = []
+            weights = []
+            for stack, weight in samples:
+                indexed = []
+                for label in stack:
+                    idx = frame_index.get(label)
+                    if idx is None:
+                        idx = frame_index[label] = len(frames)
+                        frames.append(self._speedscope_frame(label))
+                    indexed.append(idx)
+                indexed_samples.append(indexed)
+                weights.append(weight)
+
+            profiles.append({
+                "type": "sampled",
+                "name": f"{self.method} {self.path} [{thread_name}]",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": indexed_samples,
+                "weights": weights
+            })
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.path} ({self.mode}, {SAMPLE_SCOPE}-wide)",
+            "exporter": "aegisai-profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles
+        }
+
+    @staticmethod
+    def _speedscope_frame(label: str) -> dict:
+        name, _, location = label.partition(" (")
+        file, _, line = location.rstrip(")").rpartition(":")
+        frame = {"name": name}
+        if file:
+            frame["file"] = file
+        if line.isdigit():
+            frame["line"] = int(line)
+        return frame
+
+
+class ProfileStore:
+    def __init__(self, capacity: int = 32):
+        self.profiles: Deque[RequestProfile] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self.profiles.append(profile)
+
+    def list(self) -> List[RequestProfile]:
+        with self._lock:
+            return list(reversed(self.profiles))
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return next((p for p in self.profiles if p.id == profile_id), None)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self.profiles)
+            self.profiles.clear()
+            return count
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import json
+
+from fastapi import APIRouter, Depends, Response
+
+from config_loader import ConfigLoader
+from error.errortypes import ErrorType
+from error.expectionhandler import ExpectionHandler
+from permcontrol.permissionscontrol import require_perm
+from profiling.profilestore import ProfileStore
+from user.role import Role
+
+router = APIRouter()
+profiling_config = ConfigLoader("config.json").get_profiling_config()
+profile_store = ProfileStore(capacity=profiling_config.get("ring_size", 32))
+
+
+@router.get("/profiles", dependencies=[Depends(require_perm([Role.ADMIN]))])
+def list_profiles():
+    return {"success": True, "profiles": [p.to_dict() for p in profile_store.list()]}
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_perm([Role.ADMIN]))])
+def download_profile(profile_id: str, format: str = "speedscope"):
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise ExpectionHandler(
+            message=f"Profile '{profile_id}' not found.",
+            error_type=ErrorType.NOT_FOUND
+        )
+
+    export_format = format.lower()
+    if export_format == "speedscope":
+        return Response(
+            content=json.dumps(profile.to_speedscope()),
+            media_type="application/json",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'}
+        )
+    if export_format == "collapsed":
+        return Response(
+            content=profile.to_collapsed(),
+            media_type="text/plain",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.collapsed.txt"'}
+        )
+
+    raise ExpectionHandler(
+        message="Unsupported profile format. Use 'speedscope' or 'collapsed'.",
+        error_type=ErrorType.VALIDATION_ERROR
+    )
+
+
+@router.delete("/profiles", dependencies=[Depends(require_perm([Role.ADMIN]))])
+def clear_profiles():
+    return {"success": True, "deleted": profile_store.clear()}
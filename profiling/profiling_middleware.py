@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import random
+from typing import Dict, Iterable, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from auth.authcontroller import decode_token, service as user_service
+from profiling.profilestore import ProfileStore, RequestProfile
+from profiling.stacksampler import StackSampler
+from user.role import Role
+
+
+class ProfilingMiddleware:
+    def __init__(
+            self,
+            app: ASGIApp,
+            store: ProfileStore,
+            sample_rate: float = 0.0,
+            interval_ms: float = 5.0,
+            mode: str = "wall",
+            header: str = "x-aegis-profile",
+            path_prefixes: Optional[Iterable[str]] = None,
+            max_concurrent: int = 2
+    ):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000.0
+        self.mode = mode
+        self.header = header.lower().encode("latin-1")
+        self.path_prefixes = tuple(path_prefixes or ())
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self.in_flight = 0
+        self._overlaps: Dict[int, int] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Samples cover every thread, so each profile records how many other requests overlapped it.
+        self.in_flight += 1
+        for key in self._overlaps:
+            self._overlaps[key] += 1
+        try:
+            await self._dispatch(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    async def _dispatch(self, scope: Scope, receive: Receive, send: Send):
+        if self.active >= self.max_concurrent:
+            await self.app(scope, receive, send)
+            return
+
+        if self.path_prefixes and not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        # The slot is taken before the admin lookup awaits, so concurrent requests cannot all pass the check.
+        self.active += 1
+        try:
+            mode, trigger = await self._profile_mode(scope)
+        except BaseException:
+            self.active -= 1
+            raise
+
+        if mode is None:
+            self.active -= 1
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        sampler = StackSampler(interval=self.interval, mode=mode)
+        self._overlaps[id(sampler)] = self.in_flight - 1
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            self.active -= 1
+            self.store.add(RequestProfile.create(scope["method"], scope["path"], trigger, status_code, sampler,
+                                                 self._overlaps.pop(id(sampler))))
+
+    async def _profile_mode(self, scope: Scope) -> Tuple[Optional[str], Optional[str]]:
+        requested = self._header_value(scope)
+        if requested is not None and await self._is_admin(scope):
+            return (requested if requested in ("wall", "cpu") else self.mode), "header"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return self.mode, "sampled"
+        return None, None
+
+    def _header_value(self, scope: Scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == self.header:
+                return value.decode("latin-1").strip().lower()
+        return None
+
+    @staticmethod
+    async def _is_admin(scope: Scope) -> bool:
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, credentials = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer":
+                    token = credentials.strip()
+                break
+        if not token:
+            return False
+
+        def resolve_role():
+            try:
+                user = user_service.get_user(decode_token(token).user_id)
+            except Exception:
+                return None
+            return user.role if user else None
+
+        return await run_in_threadpool(resolve_role) == Role.ADMIN
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+
+Stack = Tuple[str, ...]
+
+# Every thread in the process is sampled, so concurrent requests and background work show up too.
+SAMPLE_SCOPE = "process"
+MAX_CACHED_LABELS = 50000
+
+
+class StackSampler:
+    _labels: Dict[object, Optional[str]] = {}
+
+    def __init__(self, interval: float = 0.005, mode: str = "wall", max_samples: int = 20000):
+        if mode not in ("wall", "cpu"):
+            raise ValueError("mode must be 'wall' or 'cpu'")
+        self.interval = interval
+        self.mode = mode if mode == "wall" or hasattr(time, "pthread_getcpuclockid") else "wall"
+        self.max_samples = max_samples
+        self.samples: Dict[str, List[Tuple[Stack, float]]] = {}
+        self.sample_count = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._cpu_seen: Dict[int, float] = {}
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="aegis-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(own_ident, now - last)
+            last = now
+            if self.sample_count >= self.max_samples:
+                break
+
+    def _sample(self, own_ident: int, elapsed: float):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+
+            weight = elapsed if self.mode == "wall" else self._cpu_delta(ident)
+            if weight <= 0:
+                continue
+
+            stack = self._stack(frame)
+            if stack is None:
+                continue
+
+            self.samples.setdefault(names.get(ident, str(ident)), []).append((stack, weight))
+            self.sample_count += 1
+
+    def _cpu_delta(self, ident: int) -> float:
+        try:
+            now = time.clock_gettime(time.pthread_getcpuclockid(ident))
+        except (OSError, OverflowError):
+            return 0.0
+        previous = self._cpu_seen.get(ident)
+        self._cpu_seen[ident] = now
+        return 0.0 if previous is None else now - previous
+
+    def _stack(self, frame) -> Optional[Stack]:
+        labels = []
+        in_project = False
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                if len(self._labels) >= MAX_CACHED_LABELS:
+                    self._labels.clear()
+                label = self._labels[code] = self._label(code)
+            labels.append(label)
+            if not in_project and code.co_name != "<module>" and self._is_project_file(code.co_filename):
+                in_project = True
+            frame = frame.f_back
+
+        if not in_project:
+            return None
+        labels.reverse()
+        return tuple(labels)
+
+    @staticmethod
+    def _is_project_file(filename: str) -> bool:
+        return filename.startswith(PROJECT_ROOT) and "site-packages" not in filename
+
+    @staticmethod
+    def _label(code) -> str:
+        filename = code.co_filename
+        if "site-packages" in filename:
+            filename = filename.split("site-packages", 1)[1].lstrip("/\\")
+        elif filename.startswith(PROJECT_ROOT):
+            filename = filename[len(PROJECT_ROOT):].lstrip("/\\")
+        return f"{code.co_name} ({filename}:{code.co_firstlineno})"
@@ -1,16 +1,167 @@
-from starlette.types import ASGIApp, Receive, Scope, Send
-from fastapi import Request, HTTPException
+import json
+import math
+from typing import Dict, Iterable, Optional, Union
+
+from starlette.types import ASGIApp, Receive, Scope, Send, Message
+
+from error.errorcodes import ErrorCode
+from error.errortypes import ErrorType
+from metrics.metricsregistry import metrics
 from ratelimit.ratelimitutility import RateLimitUtility
 
+RouteCost = Union[int, Dict[str, str]]
+
+DEFAULT_MAX_BODY_BYTES = 4 * 1024 * 1024
+
+
 class RateLimitMiddleware:
-    def __init__(self, app: ASGIApp, max_requests: int, window_seconds: int):
+    def __init__(
+            self,
+            app: ASGIApp,
+            max_requests: int,
+            window_seconds: int,
+            exempt_paths: Optional[Iterable[str]] = None,
+            route_costs: Optional[Dict[str, RouteCost]] = None
+    ):
         self.app = app
+        self.max_requests = max_requests
         self.rate_limiter = RateLimitUtility(max_requests, window_seconds)
+        self.exempt_paths = frozenset(exempt_paths or ())
+        self.route_costs = dict(route_costs or {})
+
+        self._limit_header = (b"x-ratelimit-limit", str(max_requests).encode("latin-1"))
+        self._rejection_body = json.dumps({
+            "success": False,
+            "error": {
+                "type": ErrorType.RATE_LIMIT_EXCEEDED.value,
+                "message": "Too Many Requests"
+            }
+        }).encode("utf-8")
+        self._rejection_headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self._rejection_body)).encode("latin-1")),
+            self._limit_header,
+        ]
+        self._rejection_body_message = {"type": "http.response.body", "body": self._rejection_body}
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send):
-        if scope["type"] == "http":
-            request = Request(scope, receive)
-            identifier = request.client.host
-            if not self.rate_limiter.allow_request(identifier):
-                raise HTTPException(status_code=429, detail="Too Many Requests")
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        identifier = client[0] if client else "unknown"
+
+        cost = 1
+        route_cost = self.route_costs.get(scope["path"])
+        if route_cost is not None:
+            if isinstance(route_cost, int):
+                cost = route_cost
+            else:
+                # Clients already out of budget are turned away before the body is read and parsed.
+                allowed, remaining, retry_after = self.rate_limiter.peek(identifier)
+                if not allowed:
+                    await self._reject(send, remaining, retry_after)
+                    return
+
+                max_bytes = int(route_cost.get("max_body_bytes", DEFAULT_MAX_BODY_BYTES))
+                body = await self._read_body(scope, receive, max_bytes)
+                if body is None:
+                    await self._reject_too_large(send, f"Request body too large, send at most {max_bytes} bytes")
+                    return
+
+                items_per_unit = max(int(route_cost.get("items_per_unit", 1)), 1)
+                items = self._item_count(body, route_cost.get("per_item"))
+                cost = max(math.ceil(items / items_per_unit), 1)
+                if cost > self.max_requests:
+                    await self._reject_too_large(
+                        send, f"Batch too large, send at most {self.max_requests * items_per_unit} items per request"
+                    )
+                    return
+                receive = self._replay(body, receive)
+
+        allowed, remaining, retry_after = self.rate_limiter.consume(identifier, cost)
+        if not allowed:
+            await self._reject(send, remaining, retry_after)
+            return
+
         await self.app(scope, receive, send)
+
+    async def _reject(self, send: Send, remaining: int, retry_after: float):
+        metrics.ratelimit_rejections.inc()
+        wait = str(max(math.ceil(retry_after), 1)).encode("latin-1")
+        await send({
+            "type": "http.response.start",
+            "status": ErrorCode.RATE_LIMIT_EXCEEDED.value,
+            "headers": self._rejection_headers + [
+                (b"retry-after", wait),
+                (b"x-ratelimit-remaining", str(remaining).encode("latin-1")),
+                (b"x-ratelimit-reset", wait),
+            ],
+        })
+        await send(self._rejection_body_message)
+
+    @staticmethod
+    async def _reject_too_large(send: Send, message: str):
+        body = json.dumps({
+            "success": False,
+            "error": {
+                "type": ErrorType.PAYLOAD_TOO_LARGE.value,
+                "message": message
+            }
+        }).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": ErrorCode.PAYLOAD_TOO_LARGE.value,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _read_body(scope: Scope, receive: Receive, max_bytes: int) -> Optional[bytes]:
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > max_bytes:
+                    return None
+                break
+
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > max_bytes:
+                return None
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    @staticmethod
+    def _item_count(body: bytes, field: Optional[str]) -> int:
+        if not field or not body:
+            return 1
+        try:
+            items = json.loads(body).get(field)
+        except (ValueError, AttributeError):
+            return 1
+        return len(items) if isinstance(items, list) else 1
+
+    @staticmethod
+    def _replay(body: bytes, receive: Receive) -> Receive:
+        replayed = False
+
+        async def replay_receive() -> Message:
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return replay_receive
@@ -1,21 +1,72 @@
 import time
-from collections import defaultdict
+from collections import deque
+from typing import Deque, Dict, Tuple
+
 
 class RateLimitUtility:
     def __init__(self, max_requests: int, window_seconds: int):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = defaultdict(list)
+        self.requests: Dict[str, Deque[Tuple[float, int]]] = {}
+        self.usage: Dict[str, int] = {}
+        self._last_sweep = time.monotonic()
 
     def allow_request(self, identifier: str) -> bool:
-        now = time.time()
+        allowed, _, _ = self.consume(identifier)
+        return allowed
+
+    def consume(self, identifier: str, cost: int = 1) -> Tuple[bool, int, float]:
+        cost = min(cost, self.max_requests)
+        now = time.monotonic()
         window_start = now - self.window_seconds
-        timestamps = self.requests[identifier]
 
-        self.requests[identifier] = [t for t in timestamps if t > window_start]
+        if now - self._last_sweep > self.window_seconds:
+            self._sweep(window_start)
+            self._last_sweep = now
+
+        timestamps = self.requests.get(identifier)
+        if timestamps is None:
+            timestamps = self.requests[identifier] = deque()
+            self.usage[identifier] = 0
+
+        used = self._expire(identifier, timestamps, window_start)
+        if used + cost > self.max_requests:
+            return False, max(self.max_requests - used, 0), self._retry_after(timestamps, used, cost, now)
+
+        timestamps.append((now, cost))
+        used += cost
+        self.usage[identifier] = used
+        return True, self.max_requests - used, 0.0
+
+    def peek(self, identifier: str, cost: int = 1) -> Tuple[bool, int, float]:
+        cost = min(cost, self.max_requests)
+        timestamps = self.requests.get(identifier)
+        if timestamps is None:
+            return True, self.max_requests, 0.0
+
+        now = time.monotonic()
+        used = self._expire(identifier, timestamps, now - self.window_seconds)
+        if used + cost > self.max_requests:
+            return False, max(self.max_requests - used, 0), self._retry_after(timestamps, used, cost, now)
+        return True, self.max_requests - used, 0.0
+
+    def _expire(self, identifier: str, timestamps: Deque[Tuple[float, int]], window_start: float) -> int:
+        used = self.usage[identifier]
+        while timestamps and timestamps[0][0] <= window_start:
+            used -= timestamps.popleft()[1]
+        self.usage[identifier] = used
+        return used
+
+    def _retry_after(self, timestamps: Deque[Tuple[float, int]], used: int, cost: int, now: float) -> float:
+        for ts, spent in timestamps:
+            used -= spent
+            if used + cost <= self.max_requests:
+                return max(ts + self.window_seconds - now, 0.0)
 
-        if len(self.requests[identifier]) >= self.max_requests:
-            return False
+        return float(self.window_seconds)
 
-        self.requests[identifier].append(now)
-        return True
+    def _sweep(self, window_start: float):
+        stale = [key for key, ts in self.requests.items() if not ts or ts[-1][0] <= window_start]
+        for key in stale:
+            del self.requests[key]
+            del self.usage[key]
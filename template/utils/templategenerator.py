@@ -1,25 +1,137 @@
+import hashlib
 import itertools
+import math
+import random
 from string import Formatter
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
 
 class TemplateGenerator:
     def __init__(self, pattern: str):
         self.pattern = pattern
+        self._parts: List[Tuple[str, Optional[str], bool]] = []
+        for literal, field_name, format_spec, conversion in Formatter().parse(pattern):
+            if literal:
+                self._parts.append((literal, None, False))
+            if field_name is not None:
+                self._parts.append((field_name, field_name, bool(format_spec or conversion)))
+        self._needs_format = any(complex_field for _, _, complex_field in self._parts)
 
     def extract_placeholders(self) -> List[str]:
         return [fname for _, fname, _, _ in Formatter().parse(self.pattern) if fname]
 
-    def generate_from_dataset_values(self, dataset_values: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+    def render(self, value_map: Dict[str, str]) -> str:
+        if self._needs_format:
+            return self.pattern.format(**value_map)
+        return "".join(value_map[name] if name is not None else text for text, name, _ in self._parts)
+
+    def _filtered_values(self, dataset_values: Dict[str, List[str]]) -> Dict[str, List[str]]:
         if "values" in dataset_values:
             dataset_values = dataset_values["values"]
 
-        placeholders = self.extract_placeholders()
-        filtered_values = {k: dataset_values[k] for k in placeholders if k in dataset_values}
-        keys, values_lists = zip(*filtered_values.items()) if filtered_values else ([], [])
-        variations = []
+        filtered = {}
+        for k in self.extract_placeholders():
+            if k in dataset_values and k not in filtered:
+                raw = dataset_values[k]
+                filtered[k] = list(dict.fromkeys([raw] if isinstance(raw, str) else raw))
+        return filtered
+
+    def count_combinations(self, dataset_values: Dict[str, List[str]]) -> int:
+        filtered_values = self._filtered_values(dataset_values)
+        return math.prod(len(v) for v in filtered_values.values()) if filtered_values else 0
+
+    def iter_from_dataset_values(self, dataset_values: Dict[str, List[str]],
+                                 dedup: bool = False) -> Iterator[Dict[str, Any]]:
+        filtered_values = self._filtered_values(dataset_values)
+        if not filtered_values:
+            return
+        keys, values_lists = zip(*filtered_values.items())
+        seen = set() if dedup else None
         for combo in itertools.product(*values_lists):
-            value_map = dict(zip(keys, combo))
-            text = self.pattern.format(**value_map)
-            variations.append({"text": text, "values": value_map})
-        return variations
+            variation = self._variation(keys, combo, seen)
+            if variation:
+                yield variation
+
+    def sample(self, dataset_values: Dict[str, List[str]], k: int, seed: Optional[int] = None,
+               dedup: bool = True) -> Iterator[Dict[str, Any]]:
+        filtered_values = self._filtered_values(dataset_values)
+        total = math.prod(len(v) for v in filtered_values.values()) if filtered_values else 0
+        if not total or k <= 0:
+            return
+
+        keys, values_lists = zip(*filtered_values.items())
+        rng = random.Random(seed)
+        seen = set() if dedup else None
+        produced = 0
+
+        for index in self._random_indices(rng, total, k):
+            variation = self._variation(keys, self._decode(index, values_lists), seen)
+            if variation:
+                yield variation
+                produced += 1
+                if produced >= k:
+                    return
+
+    def stratified_sample(self, dataset_values: Dict[str, List[str]], k: int, seed: Optional[int] = None,
+                          dedup: bool = True, max_attempts_factor: int = 10) -> Iterator[Dict[str, Any]]:
+        filtered_values = self._filtered_values(dataset_values)
+        if not filtered_values or k <= 0:
+            return
+
+        keys, values_lists = zip(*filtered_values.items())
+        rng = random.Random(seed)
+        seen = set() if dedup else None
+        strata = [(i, value) for i, values in enumerate(values_lists) for value in values]
+        produced = 0
+        attempts = 0
+
+        for i, value in itertools.cycle(strata):
+            if produced >= k or attempts >= k * max_attempts_factor:
+                return
+            attempts += 1
+            combo = [value if j == i else rng.choice(values) for j, values in enumerate(values_lists)]
+            variation = self._variation(keys, combo, seen)
+            if variation:
+                yield variation
+                produced += 1
+
+    def generate_from_dataset_values(self, dataset_values: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+        return list(self.iter_from_dataset_values(dataset_values))
+
+    def _variation(self, keys, combo, seen: Optional[set]) -> Optional[Dict[str, Any]]:
+        value_map = dict(zip(keys, combo))
+        text = self.render(value_map)
+        if seen is not None:
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+            if digest in seen:
+                return None
+            seen.add(digest)
+        return {"text": text, "values": value_map}
+
+    @staticmethod
+    def _decode(index: int, values_lists) -> List[str]:
+        combo = []
+        for values in reversed(values_lists):
+            index, offset = divmod(index, len(values))
+            combo.append(values[offset])
+        combo.reverse()
+        return combo
+
+    @staticmethod
+    def _random_indices(rng: random.Random, total: int, k: int) -> Iterator[int]:
+        if total <= 2 * k:
+            yield from rng.sample(range(total), total)
+            return
+
+        # Rejection sampling stays cheap while at most half the space is drawn; past that (only when dedup
+        # keeps rejecting renders) shuffle what is left instead of hunting for the last free indices.
+        drawn = set()
+        while len(drawn) < total // 2:
+            index = rng.randrange(total)
+            if index not in drawn:
+                drawn.add(index)
+                yield index
 
+        rest = [i for i in range(total) if i not in drawn]
+        rng.shuffle(rest)
+        yield from rest
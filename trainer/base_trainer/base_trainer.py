@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from trainer.service.trainer_service_impl import TrainerServiceImpl
 
 
@@ -7,8 +7,9 @@ class BaseTrainer:
     def __init__(self, config_file: str = "config.json"):
         self.trainer_service = TrainerServiceImpl(config_file)
 
-    def train(self, corpus_files: List[str], output_dir: str,model_size: str) -> Dict[str, Any]:
-        result = self.trainer_service.train_language_model(corpus_files, output_dir,model_size)
+    def train(self, corpus_files: List[str], output_dir: str,model_size: str,
+              callbacks: Optional[list] = None) -> Dict[str, Any]:
+        result = self.trainer_service.train_language_model(corpus_files, output_dir,model_size, callbacks=callbacks)
         return {
             "task": "base_language_model_training",
             **result
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from typing import List, Dict, Any
 from pydantic import BaseModel
 
@@ -8,6 +8,7 @@ from user.role import Role
 from permcontrol.permissionscontrol import require_perm
 from error.expectionhandler import ExpectionHandler
 from error.errortypes import ErrorType
+from jobs.jobs_controller import runner
 
 router = APIRouter()
 trainer = BaseTrainer()
@@ -24,7 +25,11 @@ class TrainRequest(BaseModel):
     response_model=Dict[str, Any],
     dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))]
 )
-async def train_language_model(request: TrainRequest):
+async def train_language_model(request: TrainRequest, background: bool = Query(False)):
+    if background:
+        job = runner.submit("train_model", request.dict())
+        return {"success": True, "task": "base_language_model_training", "status": "queued", "job_id": job["id"]}
+
     try:
         result = trainer.train(
             corpus_files=request.corpus_files,
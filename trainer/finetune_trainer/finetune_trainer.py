@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from trainer.modelregistry import ModelRegistry
 from trainer.service.trainer_service_impl import TrainerServiceImpl
 
@@ -17,14 +17,16 @@ class FineTuneTrainer:
             output_dir: str,
             training_args: Dict[str, Any],
             model_name: str,
-            version: str
+            version: str,
+            callbacks: Optional[list] = None
     ) -> Dict[str, Any]:
 
         result = self.trainer_service.fine_tune_model(
             model_path=model_path,
             dataset_id=dataset_id,
             output_dir=output_dir,
-            training_args=training_args
+            training_args=training_args,
+            callbacks=callbacks
         )
 
         saved_path = result.get("saved_path", output_dir)
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from typing import Dict, Any
 from trainer.finetune_trainer.finetune_trainer import FineTuneTrainer
 from trainer.finetune_trainer.schema.fine_tune_request import FineTuneRequest
@@ -7,6 +7,7 @@ from user.role import Role
 from permcontrol.permissionscontrol import require_perm
 from error.expectionhandler import ExpectionHandler
 from error.errortypes import ErrorType
+from jobs.jobs_controller import runner
 
 router = APIRouter()
 trainer = FineTuneTrainer()
@@ -17,7 +18,11 @@ trainer = FineTuneTrainer()
     response_model=Dict[str, Any],
     dependencies=[Depends(require_perm([Role.ADMIN, Role.DEVELOPER]))]
 )
-async def fine_tune_model(req: FineTuneRequest):
+async def fine_tune_model(req: FineTuneRequest, background: bool = Query(False)):
+    if background:
+        job = runner.submit("fine_tune", req.dict())
+        return {"success": True, "task": "fine_tuning", "status": "queued", "job_id": job["id"]}
+
     try:
         result = trainer.fine_tune(
             req.model_path,
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+META_FILE = "cache.meta.json"
+
+
+class PreprocessCache:
+    def __init__(self, cache_dir: str = "preprocess_cache"):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.digests_path = self.cache_dir / "file_digests.json"
+        self._lock = threading.Lock()
+
+    def _read_digests(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.digests_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_digests(self, digests: Dict[str, Dict[str, Any]]):
+        tmp_path = Path(str(self.digests_path) + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(digests, f, indent=4)
+        os.replace(tmp_path, self.digests_path)
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def file_digests(self, files: List[str]) -> List[str]:
+        with self._lock:
+            known = self._read_digests()
+            result = []
+            changed = False
+            for file in files:
+                path = Path(file).resolve()
+                stat = path.stat()
+                cached = known.get(str(path))
+                if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+                    result.append(cached["digest"])
+                    continue
+                digest = self._hash_file(path)
+                known[str(path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}
+                result.append(digest)
+                changed = True
+            if changed:
+                self._write_digests(known)
+            return result
+
+    def key(self, kind: str, files: List[str], **params) -> str:
+        payload = json.dumps({"kind": kind, "files": self.file_digests(files), "params": params}, sort_keys=True)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def entry_dir(self, kind: str, key: str) -> Path:
+        return self.cache_dir / kind / key
+
+    def get_meta(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        meta_path = self.entry_dir(kind, key) / META_FILE
+        if not meta_path.exists():
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def get_or_create(self, kind: str, key: str, build: Callable[[Path], Dict[str, Any]]) -> Dict[str, Any]:
+        meta = self.get_meta(kind, key)
+        if meta is not None:
+            print(f"[PreprocessCache] Hit {kind}/{key}")
+            return meta
+
+        print(f"[PreprocessCache] Miss {kind}/{key}, building")
+        target = self.entry_dir(kind, key)
+        tmp_dir = target.parent / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        try:
+            meta = build(tmp_dir) or {}
+            with open(tmp_dir / META_FILE, "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=4)
+            try:
+                os.replace(tmp_dir, target)
+            except OSError:
+                # Another run published the same entry first; its contents are identical.
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return self.get_meta(kind, key)
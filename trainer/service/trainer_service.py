@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 
 class TrainerService(ABC):
 
     @abstractmethod
-    def train_language_model(self, corpus_files: List[str], output_dir: str, model_size: str) -> Dict[str, Any]:
+    def train_language_model(self, corpus_files: List[str], output_dir: str, model_size: str,
+                             callbacks: Optional[list] = None) -> Dict[str, Any]:
         pass
 
     @abstractmethod
@@ -15,6 +16,7 @@ class TrainerService(ABC):
             model_path: str,
             dataset_id: str,
             output_dir: str,
-            training_args: Dict[str, Any]
+            training_args: Dict[str, Any],
+            callbacks: Optional[list] = None
     ) -> Dict[str, Any]:
         pass
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
-import random
-from typing import List, Dict, Any
+import tempfile
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 import shutil
 
@@ -14,13 +14,15 @@ from transformers import (
     TrainingArguments, DataCollatorWithPadding
 )
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-from datasets import Dataset, ClassLabel
+from datasets import Dataset, ClassLabel, Features, Value
+from config_loader import ConfigLoader
+from trainer.preprocesscache import PreprocessCache
 from trainer.trainer_utils import (
-    train_tokenizer,
+    P95_SAMPLE_SIZE,
+    cached_train_tokenizer,
+    cached_tokenize_dataset,
     prepare_bert_config,
     load_hf_tokenizer,
-    load_text_datasets,
-    tokenize_dataset,
     create_data_collator,
     create_training_args,
     create_trainer,
@@ -28,6 +30,7 @@ from trainer.trainer_utils import (
 )
 from trainer.service.trainer_service import TrainerService
 from dataset_builder.dataset_builder_serviceimpl import DatasetBuilderServiceImpl
+from dataset_builder.utils.exportstreams import stream_jsonl
 
 
 def compute_metrics(pred):
@@ -45,14 +48,18 @@ def compute_metrics(pred):
 class TrainerServiceImpl(TrainerService):
     def __init__(self, config_file: str = "config.json"):
         self.dataset_service = DatasetBuilderServiceImpl(config_file)
+        trainer_config = ConfigLoader(config_file).get_trainer_config()
+        self.preprocess_cache = PreprocessCache(trainer_config.get("preprocess_cache_dir", "preprocess_cache"))
+        self.p95_sample_size = trainer_config.get("p95_sample_size", P95_SAMPLE_SIZE)
 
     def train_language_model(
             self,
             corpus_files: List[str],
             output_dir: str,
-            model_size: str
+            model_size: str,
+            callbacks: Optional[list] = None
     ) -> Dict[str, Any]:
-        vocab_path = train_tokenizer(corpus_files, output_dir + "/tokenizer")
+        vocab_path = cached_train_tokenizer(self.preprocess_cache, corpus_files)
 
         hf_tokenizer = load_hf_tokenizer(vocab_path)
         config = prepare_bert_config(
@@ -61,13 +68,14 @@ class TrainerServiceImpl(TrainerService):
         )
         model = BertForMaskedLM(config)
 
-        dataset = load_text_datasets(corpus_files)
-        tokenized_ds = tokenize_dataset(dataset, hf_tokenizer,128)
+        tokenized_ds = cached_tokenize_dataset(
+            self.preprocess_cache, corpus_files, hf_tokenizer, vocab_path, 128, self.p95_sample_size
+        )
 
         data_collator = create_data_collator(hf_tokenizer)
         args = create_training_args(output_dir)
 
-        trainer = create_trainer(model, args, tokenized_ds, data_collator)
+        trainer = create_trainer(model, args, tokenized_ds, data_collator, callbacks=callbacks)
         print("IS USING CUDA?", torch.cuda.is_available())
         trainer.train()
 
@@ -87,28 +95,36 @@ class TrainerServiceImpl(TrainerService):
             model_path: str,
             dataset_id: str,
             output_dir: str,
-            training_args
+            training_args,
+            callbacks: Optional[list] = None
     ) -> Dict[str, Any]:
 
         dataset = self.dataset_service.get_dataset(dataset_id)
         if not dataset:
             raise ValueError(f"Dataset '{dataset_id}' not found in database.")
-        if not dataset.entries:
-            raise ValueError(f"Dataset '{dataset_id}' has no entries.")
-
-        valid_entries = [(e.text, e.label) for e in dataset.entries if e.text and e.label is not None]
-
-
-        random.seed(42)
-        random.shuffle(valid_entries)
-
-        texts = [t for t, l in valid_entries]
-        labels = [l for t, l in valid_entries]
-
-        unique_labels = sorted(list(set(labels)))
+        unique_labels = [label for label in self.dataset_service.distinct_labels(dataset_id) if label is not None]
         label2id = {label: i for i, label in enumerate(unique_labels)}
         id2label = {v: k for k, v in label2id.items()}
-        y = [label2id[label] for label in labels]
+
+        work_dir = tempfile.mkdtemp(prefix="aegis-finetune-")
+        try:
+            data_file = Path(work_dir) / "train.jsonl"
+            rows = 0
+            with open(data_file, "wb") as f:
+                valid_entries = (e for e in self.dataset_service.iter_entries(dataset_id) if e.text and e.label is not None)
+                for chunk in stream_jsonl(valid_entries, row=lambda e: {"text": e.text, "label": label2id[e.label]}):
+                    rows += chunk.count(b"\n")
+                    f.write(chunk)
+
+            if not rows:
+                raise ValueError(f"Dataset '{dataset_id}' has no entries.")
+
+            ds = Dataset.from_json(
+                str(data_file),
+                features=Features({"text": Value("string"), "label": ClassLabel(names=unique_labels)})
+            )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
 
         tokenizer = AutoTokenizer.from_pretrained(model_path)
         model = AutoModelForSequenceClassification.from_pretrained(
@@ -118,8 +134,7 @@ class TrainerServiceImpl(TrainerService):
             label2id=label2id
         )
 
-        ds = Dataset.from_dict({"text": texts, "label": y})
-        ds = ds.cast_column("label", ClassLabel(num_classes=len(unique_labels), names=unique_labels))
+        ds = ds.shuffle(seed=42)
 
         tokenized_ds = ds.map(
             lambda e: tokenizer(
@@ -145,12 +160,14 @@ class TrainerServiceImpl(TrainerService):
             train_dataset=tokenized_ds["train"],
             eval_dataset=tokenized_ds["test"],
             data_collator=data_collator,
-            compute_metrics=compute_metrics
+            compute_metrics=compute_metrics,
+            callbacks=callbacks
         )
 
         trainer.train()
 
         metrics = trainer.evaluate()
+
         model.save_pretrained(output_dir)
         tokenizer.save_pretrained(output_dir)
 
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import random
 from pathlib import Path
 from typing import List, Dict, Any
 from tokenizers.implementations import BertWordPieceTokenizer
@@ -10,8 +11,11 @@ from transformers import (
     TrainingArguments,
     DataCollatorForLanguageModeling,
 )
-from datasets import load_dataset
+from datasets import load_dataset, load_from_disk
 
+from trainer.preprocesscache import PreprocessCache
+
+P95_SAMPLE_SIZE = 10000
 
 MODEL_SIZES: Dict[str, Dict[str, int]] = {
     "15M":  {"hidden_size": 256,  "num_hidden_layers": 4,  "num_attention_heads": 4},
@@ -24,9 +28,9 @@ MODEL_SIZES: Dict[str, Dict[str, int]] = {
 
 def optimize_tokenizer(tokenizer: BertTokenizerFast, texts: List[str], max_length: int = None):
     if max_length is None:
-        lens = [len(tokenizer.encode(t, add_special_tokens=True)) for t in texts]
+        lens = [len(ids) for ids in tokenizer(list(texts), add_special_tokens=True)["input_ids"]]
         lens_sorted = sorted(lens)
-        p95 = lens_sorted[int(len(lens_sorted) * 0.95)]
+        p95 = lens_sorted[int(len(lens_sorted) * 0.95)] if lens_sorted else tokenizer.model_max_length
 
         max_length = min(p95, tokenizer.model_max_length)
 
@@ -66,6 +70,21 @@ def train_tokenizer(
     return str(Path(output_dir) / "vocab.txt")
 
 
+def cached_train_tokenizer(
+        cache: PreprocessCache,
+        corpus_files: List[str],
+        vocab_size: int = 40000,
+        min_frequency: int = 2,
+        lowercase: bool = True
+) -> str:
+    params = {"vocab_size": vocab_size, "min_frequency": min_frequency, "lowercase": lowercase}
+    key = cache.key("tokenizer", corpus_files, **params)
+    meta = cache.get_or_create(
+        "tokenizer", key,
+        lambda tmp_dir: {"vocab_file": Path(train_tokenizer(corpus_files, str(tmp_dir), **params)).name, **params}
+    )
+    return str(cache.entry_dir("tokenizer", key) / meta["vocab_file"])
+
 
 def prepare_bert_config(vocab_size: int, model_size: str) -> BertConfig:
     if model_size not in MODEL_SIZES:
@@ -97,8 +116,16 @@ def load_text_datasets(corpus_files: List[str]):
     return load_dataset("text", data_files={"train": corpus_files})
 
 
-def tokenize_dataset(dataset, tokenizer: BertTokenizerFast, max_length: int = None):
-    raw_texts = dataset["train"]["text"]
+def sample_texts(dataset, n: int = P95_SAMPLE_SIZE, seed: int = 42) -> List[str]:
+    if len(dataset) <= n:
+        return dataset["text"]
+    indices = sorted(random.Random(seed).sample(range(len(dataset)), n))
+    return dataset.select(indices)["text"]
+
+
+def tokenize_dataset(dataset, tokenizer: BertTokenizerFast, max_length: int = None,
+                     sample_size: int = P95_SAMPLE_SIZE):
+    raw_texts = sample_texts(dataset["train"], sample_size) if max_length is None else []
 
     tokenizer, max_length = optimize_tokenizer(tokenizer, raw_texts, max_length=max_length)
 
@@ -115,6 +142,35 @@ def tokenize_dataset(dataset, tokenizer: BertTokenizerFast, max_length: int = No
     return dataset
 
 
+def cached_tokenize_dataset(
+        cache: PreprocessCache,
+        corpus_files: List[str],
+        tokenizer: BertTokenizerFast,
+        vocab_path: str,
+        max_length: int = None,
+        sample_size: int = P95_SAMPLE_SIZE
+):
+    key = cache.key(
+        "tokenized", corpus_files,
+        vocab=cache.file_digests([vocab_path])[0],
+        lowercase=getattr(tokenizer, "do_lower_case", None),
+        max_length=max_length,
+        sample_size=sample_size if max_length is None else None,
+    )
+
+    def build(tmp_dir: Path) -> Dict[str, Any]:
+        tokenized = tokenize_dataset(load_text_datasets(corpus_files), tokenizer, max_length, sample_size)
+        tokenized.save_to_disk(str(tmp_dir / "dataset"))
+        return {"max_length": tokenizer.model_max_length, "rows": len(tokenized["train"])}
+
+    meta = cache.get_or_create("tokenized", key, build)
+    optimize_tokenizer(tokenizer, [], max_length=meta["max_length"])
+
+    dataset = load_from_disk(str(cache.entry_dir("tokenized", key) / "dataset"))
+    dataset.set_format("torch")
+    return dataset
+
+
 def create_data_collator(tokenizer):
     return DataCollatorForLanguageModeling(
         tokenizer=tokenizer,
@@ -144,12 +200,13 @@ def create_training_args(
     )
 
 
-def create_trainer(model, args, dataset, data_collator):
+def create_trainer(model, args, dataset, data_collator, callbacks=None):
     return Trainer(
         model=model,
         args=args,
         train_dataset=dataset["train"],
-        data_collator=data_collator
+        data_collator=data_collator,
+        callbacks=callbacks
     )
 
 
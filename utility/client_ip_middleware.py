@@ -1,14 +1,73 @@
-from starlette.middleware.base import BaseHTTPMiddleware
+from ipaddress import ip_address, ip_network
+from typing import Iterable, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from utility.client import ClientIPStorage
 
 
-class ClientIPMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        ip = request.headers.get("x-forwarded-for", request.client.host)
-        if ip and "," in ip:
-            ip = ip.split(",")[0].strip()
+class ClientIPMiddleware:
+    _TRUST_CACHE_SIZE = 4096
+
+    def __init__(self, app: ASGIApp, trusted_proxies: Optional[Iterable[str]] = None):
+        self.app = app
+        proxies = list(trusted_proxies if trusted_proxies is not None else ("127.0.0.1", "::1"))
+        self.trust_all = "*" in proxies
+        self.trusted_hosts = frozenset(p for p in proxies if "/" not in p and p != "*")
+        self.trusted_networks = [ip_network(p, strict=False) for p in proxies if "/" in p]
+        self._trust_cache = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        ip = client[0] if client else "0.0.0.0"
+
+        if self._is_trusted(ip):
+            forwarded = self._forwarded_for(scope["headers"])
+            if forwarded:
+                resolved = self._resolve(forwarded)
+                if resolved and resolved != ip:
+                    ip = resolved
+                    scope["client"] = (ip, client[1] if client else 0)
 
         ClientIPStorage.set(ip)
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
+
+    def _is_trusted(self, host: str) -> bool:
+        if self.trust_all or host in self.trusted_hosts:
+            return True
+        if not self.trusted_networks:
+            return False
+
+        trusted = self._trust_cache.get(host)
+        if trusted is None:
+            try:
+                addr = ip_address(host)
+                trusted = any(addr in net for net in self.trusted_networks)
+            except ValueError:
+                trusted = False
+            if len(self._trust_cache) >= self._TRUST_CACHE_SIZE:
+                self._trust_cache.clear()
+            self._trust_cache[host] = trusted
+        return trusted
+
+    @staticmethod
+    def _forwarded_for(headers) -> Optional[str]:
+        values = [value for name, value in headers if name == b"x-forwarded-for"]
+        if not values:
+            return None
+        return b",".join(values).decode("latin-1")
+
+    def _resolve(self, forwarded: str) -> Optional[str]:
+        hops = [hop.strip() for hop in forwarded.split(",")]
+        hops = [hop for hop in hops if hop]
+        if not hops:
+            return None
+
+        for hop in reversed(hops):
+            if not self._is_trusted(hop):
+                return hop
+        return hops[0]
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import random
+import struct
+from typing import List
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 64, bands: int = 8, shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = random.Random(seed)
+        self._params = [
+            (rng.randint(1, MERSENNE_PRIME - 1), rng.randint(0, MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    @property
+    def threshold(self) -> float:
+        return (1.0 / self.bands) ** (1.0 / self.rows)
+
+    def shingles(self, text: str) -> set:
+        text = " ".join(text.split())
+        if len(text) <= self.shingle_size:
+            return {text} if text else set()
+        return {text[i:i + self.shingle_size] for i in range(len(text) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> List[int]:
+        hashes = [
+            struct.unpack("<I", hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest())[0]
+            for s in self.shingles(text)
+        ]
+        if not hashes:
+            return [MAX_HASH] * self.num_perm
+        return [min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes) for a, b in self._params]
+
+    @staticmethod
+    def similarity(a: List[int], b: List[int]) -> float:
+        return sum(x == y for x, y in zip(a, b)) / len(a) if a else 0.0
+
+    def band_keys(self, signature: List[int]) -> List[str]:
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(struct.pack(f"<{self.rows}I", *chunk), digest_size=8).hexdigest()
+            keys.append(f"{band}:{digest}")
+        return keys
+
+    def bands_for(self, text: str) -> List[str]:
+        return self.band_keys(self.signature(text))
+
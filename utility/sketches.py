@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import heapq
+import math
+from array import array
+from typing import Dict, List, Tuple
+
+MASK_64 = (1 << 64) - 1
+
+
+def hash64(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+
+    def add_hash(self, h: int):
+        index = h >> (64 - self.precision)
+        rest = (h << self.precision) & MASK_64
+        rank = 64 - self.precision + 1 if rest == 0 else 65 - rest.bit_length()
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add(self, token: str):
+        self.add_hash(hash64(token))
+
+    def count(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class CountMinSketch:
+    def __init__(self, width: int = 1 << 18, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array("Q", bytes(8 * width)) for _ in range(depth)]
+        self.total = 0
+
+    def _indexes(self, h: int) -> List[int]:
+        h1 = h & 0xFFFFFFFF
+        h2 = h >> 32
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add_hash(self, h: int, count: int = 1) -> int:
+        estimate = None
+        for row, index in zip(self.rows, self._indexes(h)):
+            row[index] += count
+            value = row[index]
+            estimate = value if estimate is None else min(estimate, value)
+        self.total += count
+        return estimate
+
+    def estimate_hash(self, h: int) -> int:
+        return min(row[index] for row, index in zip(self.rows, self._indexes(h)))
+
+    def estimate(self, token: str) -> int:
+        return self.estimate_hash(hash64(token))
+
+
+class TopK:
+    def __init__(self, k: int, slack: int = 4):
+        self.k = k
+        self.limit = max(k * slack, k + 1)
+        self.candidates: Dict[str, int] = {}
+
+    def offer(self, token: str, estimate: int):
+        if token in self.candidates or len(self.candidates) < self.limit:
+            self.candidates[token] = estimate
+            return
+        self.candidates[token] = estimate
+        keep = heapq.nlargest(self.k * 2, self.candidates.items(), key=lambda kv: kv[1])
+        self.candidates = dict(keep)
+
+    def items(self) -> List[Tuple[str, int]]:
+        return heapq.nlargest(self.k, self.candidates.items(), key=lambda kv: kv[1])